@@ -1,13 +1,16 @@
 import argparse
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Tuple
+from typing import Deque, Dict, Iterator, List, Tuple
 
 import numpy as np
 import pandas as pd
 
-from analytics.indices.mold_index import mold_risk_index
-from analytics.indices.physics import dew_point_c
+from analytics.etl.dataset_io import write_dataset
+from analytics.indices.vectorized import dew_point_c_array, mold_risk_index_array
 
 
 @dataclass
@@ -18,7 +21,7 @@ class EpisodeConfig:
     episode_id: int
 
 
-def _rng(seed: int) -> np.random.Generator:
+def _rng(seed) -> np.random.Generator:
     return np.random.default_rng(seed)
 
 
@@ -100,7 +103,7 @@ def _build_episode(cfg: EpisodeConfig, freq_min: int = 1) -> pd.DataFrame:
 
     df = pd.DataFrame({"ts": ts, **sensors})
 
-    df["dew_point_c"] = df.apply(lambda r: dew_point_c(r["air_temp_c"], r["air_rh_pct"]), axis=1)
+    df["dew_point_c"] = dew_point_c_array(df["air_temp_c"].to_numpy(), df["air_rh_pct"].to_numpy())
     df["dew_margin_c"] = df["air_surface_temp_c"] - df["dew_point_c"]
     df["outdoor_dew_point_c"] = df["outdoor_temp_c"] - (100.0 - df["outdoor_rh_pct"]) / 5.0
     df["tod_sin"] = np.sin(2.0 * np.pi * df["ts"].dt.hour * 60.0 / (24 * 60))
@@ -111,12 +114,8 @@ def _build_episode(cfg: EpisodeConfig, freq_min: int = 1) -> pd.DataFrame:
 
 
 def _compute_idx(df: pd.DataFrame, window: int) -> pd.Series:
-    idx_vals: List[float] = []
-    history: List[tuple] = []
-    for _, row in df.iterrows():
-        history.append((row["air_temp_c"], row["air_rh_pct"]))
-        history = history[-window:]
-        idx_vals.append(mold_risk_index(row["air_temp_c"], row["air_rh_pct"], history))
+    # Same as calling mold_risk_index row by row with the last `window` samples as history
+    idx_vals = mold_risk_index_array(df["air_temp_c"].to_numpy(), df["air_rh_pct"].to_numpy(), window)
     return pd.Series(idx_vals, index=df.index)
 
 
@@ -170,65 +169,118 @@ def _impute(df: pd.DataFrame, window: int) -> pd.DataFrame:
     return df
 
 
-def _build_dataset(
+def _episode_configs(
     scenarios: List[str],
     hours: int,
-    horizon_min: int,
-    window_min: int,
     seed: int,
     episodes_per_scenario: int,
-    missing_rate: float,
-) -> pd.DataFrame:
-    frames = []
-    rng = _rng(seed)
+) -> List[EpisodeConfig]:
+    configs = []
     for i, scenario in enumerate(scenarios):
         for e in range(episodes_per_scenario):
-            cfg = EpisodeConfig(
-                scenario=scenario,
-                hours=hours,
-                seed=seed + i * 13 + e * 31,
-                episode_id=i * episodes_per_scenario + e,
+            configs.append(
+                EpisodeConfig(
+                    scenario=scenario,
+                    hours=hours,
+                    seed=seed + i * 13 + e * 31,
+                    episode_id=i * episodes_per_scenario + e,
+                )
             )
-            df = _build_episode(cfg)
-            df["idx_mold_now"] = _compute_idx(df, window=window_min)
-            feats = _build_features(df, window=window_min)
+    return configs
 
-            df = pd.concat([df, feats], axis=1)
-            df = _inject_missing(df, missing_rate, rng)
-            df = _impute(df, window=window_min)
-            df["target_idx_mold_h"] = df["idx_mold_now"].shift(-horizon_min)
-            df["scenario"] = scenario
-            df["episode_id"] = cfg.episode_id
-            frames.append(df)
 
-    full = pd.concat(frames, ignore_index=True)
-    full = full.dropna().reset_index(drop=True)
-    return full
+def _build_episode_frame(
+    cfg: EpisodeConfig,
+    horizon_min: int,
+    window_min: int,
+    seed: int,
+    missing_rate: float,
+) -> pd.DataFrame:
+    df = _build_episode(cfg)
+    df["idx_mold_now"] = _compute_idx(df, window=window_min)
+    feats = _build_features(df, window=window_min)
+
+    df = pd.concat([df, feats], axis=1)
+    # Missing-value RNG is keyed by episode so results do not depend on worker scheduling
+    df = _inject_missing(df, missing_rate, _rng([seed, cfg.episode_id]))
+    df = _impute(df, window=window_min)
+    df["target_idx_mold_h"] = df["idx_mold_now"].shift(-horizon_min)
+    df["scenario"] = cfg.scenario
+    df["episode_id"] = cfg.episode_id
+    return df.dropna()
+
+
+def _iter_episodes(
+    configs: List[EpisodeConfig],
+    horizon_min: int,
+    window_min: int,
+    seed: int,
+    missing_rate: float,
+    workers: int = 1,
+) -> Iterator[pd.DataFrame]:
+    """Yield finished episodes in config order, built in up to ``workers`` processes."""
+    args = (horizon_min, window_min, seed, missing_rate)
+    if workers <= 1:
+        for cfg in configs:
+            yield _build_episode_frame(cfg, *args)
+        return
+    # Keep a bounded number of episodes in flight so memory stays flat for
+    # thousands of episodes; yielding from the head of the queue keeps order.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Future] = deque()
+        todo = iter(configs)
+        for cfg in todo:
+            pending.append(pool.submit(_build_episode_frame, cfg, *args))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            df = pending.popleft().result()
+            nxt = next(todo, None)
+            if nxt is not None:
+                pending.append(pool.submit(_build_episode_frame, nxt, *args))
+            yield df
+
+
+def _build_dataset(
+    scenarios: List[str],
+    hours: int,
+    horizon_min: int,
+    window_min: int,
+    seed: int,
+    episodes_per_scenario: int,
+    missing_rate: float,
+    workers: int = 1,
+) -> pd.DataFrame:
+    configs = _episode_configs(scenarios, hours, seed, episodes_per_scenario)
+    frames = list(_iter_episodes(configs, horizon_min, window_min, seed, missing_rate, workers))
+    return pd.concat(frames, ignore_index=True)
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Build mold model dataset")
-    parser.add_argument("--out", default="/home/amrik/code/smart-campus/data/mold_dataset.csv")
+    parser.add_argument(
+        "--out",
+        default="/home/amrik/code/smart-campus/data/mold_dataset.csv",
+        help="Output path: .csv, .feather (Arrow IPC) or .parquet / directory (partitioned by scenario/episode)",
+    )
+    parser.add_argument("--format", choices=["csv", "parquet", "feather"], default=None, help="Override format from --out")
+    parser.add_argument("--overwrite", action="store_true", help="Replace a Parquet --out directory that holds other files")
     parser.add_argument("--hours", type=int, default=12)
     parser.add_argument("--horizon-min", type=int, default=60)
     parser.add_argument("--window-min", type=int, default=60)
     parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--episodes-per-scenario", type=int, default=3)
     parser.add_argument("--missing-rate", type=float, default=0.0)
+    parser.add_argument("--scenarios", default="NORMAL,MOLD_EPISODE")
+    parser.add_argument("--workers", type=int, default=1, help="Episode-building processes (0 = all cores)")
     args = parser.parse_args()
 
-    scenarios = ["NORMAL", "MOLD_EPISODE"]
-    df = _build_dataset(
-        scenarios,
-        args.hours,
-        args.horizon_min,
-        args.window_min,
-        args.seed,
-        args.episodes_per_scenario,
-        args.missing_rate,
-    )
-    df.to_csv(args.out, index=False)
-    print(f"Wrote dataset to {args.out} (rows={len(df)})")
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    configs = _episode_configs(scenarios, args.hours, args.seed, args.episodes_per_scenario)
+    frames = _iter_episodes(configs, args.horizon_min, args.window_min, args.seed, args.missing_rate, workers)
+    rows = write_dataset(args.out, frames, args.format, overwrite=args.overwrite)
+    print(f"Wrote dataset to {args.out} (rows={rows}, episodes={len(configs)}, workers={workers})")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,233 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Union
+
+import pandas as pd
+
+PathLike = Union[str, Path]
+
+# Partition columns for the Parquet layout: <out>/scenario=<s>/episode_id=<nnnnnn>/part-0.parquet
+PARTITION_COLS = ("scenario", "episode_id")
+
+
+def dataset_format(path: PathLike) -> str:
+    """csv | parquet | feather, from the file suffix (a directory is partitioned Parquet)."""
+    p = Path(path)
+    suffix = p.suffix.lower()
+    if suffix in (".feather", ".arrow", ".ipc"):
+        return "feather"
+    if suffix == ".parquet" or p.is_dir():
+        return "parquet"
+    return "csv"
+
+
+def _arrow_schema(df: pd.DataFrame):
+    import pyarrow as pa
+
+    fields = []
+    for col in df.columns:
+        if col == "ts":
+            fields.append(pa.field(col, pa.timestamp("us", tz="UTC")))
+        elif col == "scenario":
+            fields.append(pa.field(col, pa.string()))
+        elif col == "episode_id":
+            fields.append(pa.field(col, pa.int32()))
+        else:
+            fields.append(pa.field(col, pa.float64()))
+    return pa.schema(fields)
+
+
+def _episode_dir(out: Path, df: pd.DataFrame) -> Path:
+    scenario = df["scenario"].iloc[0]
+    # Zero-padded so lexicographic file order is episode order.
+    episode_id = int(df["episode_id"].iloc[0])
+    return out / f"scenario={scenario}" / f"episode_id={episode_id:06d}"
+
+
+def _clear_parquet_dir(out: Path, overwrite: bool) -> None:
+    """Remove a previous partitioned dataset at ``out``; refuse anything else."""
+    import shutil
+
+    if not out.exists():
+        return
+    if not out.is_dir():
+        raise ValueError(f"{out} is a file; a Parquet dataset is written as a directory")
+    others = [p.name for p in out.iterdir() if not (p.is_dir() and p.name.startswith("scenario="))]
+    if others and not overwrite:
+        raise ValueError(
+            f"{out} holds more than a partitioned dataset ({', '.join(sorted(others)[:3])}); "
+            "pick a new path or pass overwrite=True"
+        )
+    shutil.rmtree(out)
+
+
+def write_dataset(
+    out: PathLike, frames: Iterable[pd.DataFrame], fmt: Optional[str] = None, overwrite: bool = False
+) -> int:
+    """Stream episode frames to ``out`` as CSV, partitioned Parquet or Arrow IPC (Feather v2).
+
+    An existing Parquet directory is replaced only if it holds nothing but
+    ``scenario=*`` partitions, unless ``overwrite`` is set.
+    """
+    out = Path(out)
+    fmt = fmt or dataset_format(out)
+    rows = 0
+    if fmt == "csv":
+        with out.open("w", newline="") as f:
+            for df in frames:
+                df.to_csv(f, header=rows == 0, index=False)
+                rows += len(df)
+        return rows
+
+    import pyarrow as pa
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        _clear_parquet_dir(out, overwrite)
+        schema = None
+        for df in frames:
+            if df.empty:
+                continue
+            if schema is None:
+                schema = _arrow_schema(df.drop(columns=list(PARTITION_COLS)))
+            part = _episode_dir(out, df)
+            part.mkdir(parents=True, exist_ok=True)
+            table = pa.Table.from_pandas(df.drop(columns=list(PARTITION_COLS)), schema=schema, preserve_index=False)
+            pq.write_table(table, part / "part-0.parquet")
+            rows += len(df)
+        return rows
+
+    if fmt == "feather":
+        # Uncompressed IPC file so readers can memory-map it without copying.
+        out.parent.mkdir(parents=True, exist_ok=True)
+        writer = None
+        try:
+            for df in frames:
+                if writer is None:
+                    schema = _arrow_schema(df)
+                    writer = pa.ipc.new_file(str(out), schema)
+                writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+                rows += len(df)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    raise ValueError(f"unknown dataset format: {fmt}")
+
+
+def dataset_columns(path: PathLike) -> List[str]:
+    """Column names without loading any data."""
+    fmt = dataset_format(path)
+    if fmt == "csv":
+        return list(pd.read_csv(path, nrows=0).columns)
+    import pyarrow as pa
+
+    if fmt == "feather":
+        return pa.ipc.open_file(pa.memory_map(str(path))).schema.names
+    import pyarrow.dataset as ds
+
+    return ds.dataset(str(path), format="parquet", partitioning="hive").schema.names
+
+
+def read_dataset(path: PathLike, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Load a dataset written by ``write_dataset``, reading only ``columns`` if given.
+
+    Arrow formats are memory-mapped and only the requested columns are
+    decoded; CSV falls back to ``read_csv(usecols=...)``.
+    """
+    fmt = dataset_format(path)
+    columns = list(columns) if columns is not None else None
+    if fmt == "csv":
+        parse_dates = ["ts"] if columns is None or "ts" in columns else None
+        return pd.read_csv(path, usecols=columns, parse_dates=parse_dates)
+
+    import pyarrow as pa
+
+    if fmt == "feather":
+        table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+        if columns is not None:
+            table = table.select(columns)
+    else:
+        import pyarrow.dataset as ds
+        from pyarrow import fs
+
+        dataset = ds.dataset(
+            str(path), format="parquet", partitioning="hive", filesystem=fs.LocalFileSystem(use_mmap=True)
+        )
+        table = dataset.to_table(columns=columns)
+    df = table.to_pandas()
+    if "scenario" in df.columns:
+        df["scenario"] = df["scenario"].astype(str)
+    return df
+
+
+@dataclass
+class Fragment:
+    """One Parquet file of a partitioned dataset, described from its footer only."""
+
+    path: str
+    num_rows: int
+    ts_min: float  # epoch seconds
+    ts_max: float
+    mtime_ns: int
+
+
+def _ts_seconds(value) -> float:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return float(pd.Timestamp(value).value) / 1e9
+
+
+def scan_fragments(path: PathLike) -> List[Fragment]:
+    """Row counts and ts ranges of every Parquet file under ``path`` from footer statistics."""
+    import pyarrow.parquet as pq
+
+    root = Path(path)
+    files = [root] if root.is_file() else sorted(root.rglob("*.parquet"))
+    fragments = []
+    for f in files:
+        meta = pq.ParquetFile(f).metadata
+        if meta.num_rows == 0:
+            continue
+        ts_idx = meta.schema.names.index("ts")
+        lo, hi = None, None
+        for i in range(meta.num_row_groups):
+            stats = meta.row_group(i).column(ts_idx).statistics
+            lo = stats.min if lo is None else min(lo, stats.min)
+            hi = stats.max if hi is None else max(hi, stats.max)
+        fragments.append(Fragment(str(f), meta.num_rows, _ts_seconds(lo), _ts_seconds(hi), f.stat().st_mtime_ns))
+    return fragments
+
+
+def _rows_before(fragments: List[Fragment], t: float) -> float:
+    # Rows with ts < t, assuming rows are spread evenly over each fragment's range.
+    total = 0.0
+    for frag in fragments:
+        if t > frag.ts_max:
+            total += frag.num_rows
+        elif t > frag.ts_min:
+            total += frag.num_rows * (t - frag.ts_min) / (frag.ts_max - frag.ts_min)
+    return total
+
+
+def time_cutoffs(fragments: List[Fragment], fractions: Sequence[float]) -> List[float]:
+    """Timestamps splitting the dataset at the given cumulative row fractions (metadata only)."""
+    total = sum(f.num_rows for f in fragments)
+    lo_all = min(f.ts_min for f in fragments)
+    hi_all = max(f.ts_max for f in fragments)
+    cutoffs = []
+    for frac in fractions:
+        lo, hi = lo_all, hi_all + 1.0
+        for _ in range(60):
+            mid = (lo + hi) / 2.0
+            if _rows_before(fragments, mid) < frac * total:
+                lo = mid
+            else:
+                hi = mid
+        cutoffs.append(hi)
+    return cutoffs
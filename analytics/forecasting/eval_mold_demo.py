@@ -7,6 +7,8 @@ import numpy as np
 import pandas as pd
 from sklearn.metrics import mean_absolute_error, precision_recall_fscore_support
 
+from analytics.etl.dataset_io import dataset_columns, read_dataset
+
 try:
     import lightgbm as lgb
 except Exception as exc:  # pragma: no cover
@@ -55,14 +57,15 @@ def main() -> None:
     parser.add_argument("--out-metrics", default="/home/amrik/code/smart-campus/data/mold_metrics.json")
     args = parser.parse_args()
 
-    df = pd.read_csv(args.data, parse_dates=["ts"])
+    model = lgb.Booster(model_file=args.model)
+    features = model.feature_name()
+    meta = [c for c in ("ts", "scenario", "episode_id", "target_idx_mold_h") if c in dataset_columns(args.data)]
+    df = read_dataset(args.data, columns=list(dict.fromkeys(meta + features)))
     df = df.sort_values("ts")
 
-    drop_cols = {"ts", "scenario", "target_idx_mold_h"}
-    X = df.drop(columns=[c for c in df.columns if c in drop_cols])
+    X = df[features]
     y = df["target_idx_mold_h"].values
 
-    model = lgb.Booster(model_file=args.model)
     preds = model.predict(X)
 
     mae = mean_absolute_error(y, preds)
@@ -1,10 +1,15 @@
 import argparse
+import hashlib
+import json
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 from sklearn.metrics import mean_absolute_error
 
+from analytics.etl.dataset_io import Fragment, dataset_columns, read_dataset, scan_fragments, time_cutoffs
+
 try:
     import lightgbm as lgb
 except Exception as exc:  # pragma: no cover
@@ -25,34 +30,203 @@ def build_xy(df: pd.DataFrame):
     return X, y
 
 
+PARAMS = {
+    "objective": "regression",
+    "metric": "mae",
+    "learning_rate": 0.05,
+    "num_leaves": 31,
+    "feature_fraction": 0.9,
+    "seed": 42,
+}
+
+
+def _partition_values(path: str) -> Dict[str, float]:
+    # Hive-style key=value directories (scenario=..., episode_id=...) above the file
+    values = {}
+    for part in Path(path).parent.parts:
+        if "=" in part:
+            key, _, raw = part.partition("=")
+            try:
+                values[key] = float(raw)
+            except ValueError:
+                continue
+    return values
+
+
+class ParquetSlice(lgb.Sequence):
+    """Rows ``[start, stop)`` of one Parquet file, read lazily as a float64 feature matrix.
+
+    Only one slice is materialized at a time (shared single-entry cache), so
+    building a Dataset from hundreds of slices needs memory for one file plus
+    LightGBM's binned copy.
+    """
+
+    batch_size = 65536
+    _cache: Tuple[Optional[tuple], Optional[np.ndarray]] = (None, None)
+
+    def __init__(self, path: str, start: int, stop: int, features: List[str]) -> None:
+        self.path = path
+        self.start = start
+        self.stop = stop
+        self.features = features
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def _matrix(self) -> np.ndarray:
+        key = (self.path, self.start, self.stop)
+        cached_key, mat = ParquetSlice._cache
+        if cached_key != key:
+            mat = read_slice(self.path, self.features, self.start, self.stop)
+            ParquetSlice._cache = (key, mat)
+        return mat
+
+    def __getitem__(self, idx):
+        mat = self._matrix()
+        if isinstance(idx, slice) and idx.stop is not None and idx.stop >= len(self):
+            # Last batch of a sequential pass: release the matrix.
+            out = mat[idx]
+            ParquetSlice._cache = (None, None)
+            return out
+        return mat[idx]
+
+
+def read_slice(path: str, columns: List[str], start: int, stop: int) -> np.ndarray:
+    import pyarrow.parquet as pq
+
+    pf = pq.ParquetFile(path, memory_map=True)
+    file_cols = set(pf.schema_arrow.names)
+    table = pf.read(columns=[c for c in columns if c in file_cols]).slice(start, stop - start)
+    partitions = _partition_values(path)
+    mat = np.empty((stop - start, len(columns)), dtype=np.float64)
+    for j, col in enumerate(columns):
+        if col in file_cols:
+            mat[:, j] = table.column(col).to_numpy()
+        else:
+            mat[:, j] = partitions.get(col, np.nan)
+    return mat
+
+
+def split_fragments(
+    fragments: List[Fragment], cutoffs: List[float], features: List[str]
+) -> Tuple[List[ParquetSlice], List[ParquetSlice], List[ParquetSlice]]:
+    """Assign rows to train/val/test by ts cutoff; only straddling files have their ts column read."""
+    import pyarrow.parquet as pq
+
+    t_val, t_test = cutoffs
+    splits: Tuple[list, list, list] = ([], [], [])
+    for frag in fragments:
+        if frag.ts_max < t_val:
+            i_val = i_test = frag.num_rows
+        elif frag.ts_min >= t_test:
+            i_val = i_test = 0
+        else:
+            # Rows within a file are in ts order (one episode/node per file).
+            ts = pq.read_table(frag.path, columns=["ts"]).column("ts").cast("int64").to_numpy() / 1e6
+            i_val, i_test = int(np.searchsorted(ts, t_val)), int(np.searchsorted(ts, t_test))
+        edges = [0, i_val, i_test, frag.num_rows]
+        for k in range(3):
+            if edges[k + 1] > edges[k]:
+                splits[k].append(ParquetSlice(frag.path, edges[k], edges[k + 1], features))
+    return splits
+
+
+def _labels(slices: List[ParquetSlice]) -> np.ndarray:
+    parts = [read_slice(s.path, ["target_idx_mold_h"], s.start, s.stop)[:, 0] for s in slices]
+    return np.concatenate(parts) if parts else np.empty(0)
+
+
+def _cache_key(fragments: List[Fragment], features: List[str], cutoffs: List[float]) -> str:
+    blob = json.dumps(
+        {
+            "fragments": [(f.path, f.num_rows, f.mtime_ns) for f in fragments],
+            "features": features,
+            "cutoffs": cutoffs,
+            "params": PARAMS,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+def build_streaming_datasets(data: str, features: List[str], cache_dir: Optional[str]):
+    """Train/val Datasets built batch-by-batch from partitioned Parquet, plus the test slices.
+
+    The binned Datasets are saved with ``save_binary`` under ``cache_dir`` and
+    reused while the fragments, features and params are unchanged.
+    """
+    fragments = sorted(scan_fragments(data), key=lambda f: (f.ts_min, f.path))
+    if not fragments:
+        raise SystemExit(f"No Parquet files found under {data}")
+    cutoffs = time_cutoffs(fragments, (0.7, 0.85))
+    train_s, val_s, test_s = split_fragments(fragments, cutoffs, features)
+
+    key = _cache_key(fragments, features, cutoffs)
+    cache = Path(cache_dir) if cache_dir else None
+    if cache is not None:
+        meta_path = cache / "meta.json"
+        if meta_path.exists() and json.loads(meta_path.read_text()).get("key") == key:
+            print(f"Reusing binary Dataset cache in {cache}")
+            dtrain = lgb.Dataset(str(cache / "train.bin"), params=PARAMS)
+            dval = lgb.Dataset(str(cache / "val.bin"), reference=dtrain)
+            return dtrain, dval, test_s
+
+    print(f"Streaming {len(fragments)} files: train={sum(map(len, train_s))} val={sum(map(len, val_s))} rows")
+    dtrain = lgb.Dataset(train_s, label=_labels(train_s), feature_name=features, params=PARAMS, free_raw_data=True)
+    dval = lgb.Dataset(val_s, label=_labels(val_s), feature_name=features, reference=dtrain)
+    if cache is not None:
+        cache.mkdir(parents=True, exist_ok=True)
+        dtrain.construct().save_binary(str(cache / "train.bin"))
+        dval.construct().save_binary(str(cache / "val.bin"))
+        (cache / "meta.json").write_text(json.dumps({"key": key, "features": features}))
+    return dtrain, dval, test_s
+
+
+def streaming_mae(model, slices: List[ParquetSlice]) -> float:
+    abs_err, n = 0.0, 0
+    for s in slices:
+        X = read_slice(s.path, s.features, s.start, s.stop)
+        y = read_slice(s.path, ["target_idx_mold_h"], s.start, s.stop)[:, 0]
+        abs_err += float(np.abs(model.predict(X) - y).sum())
+        n += len(y)
+    return abs_err / n if n else float("nan")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Train LightGBM mold forecaster")
     parser.add_argument("--data", default="/home/amrik/code/smart-campus/data/mold_dataset.csv")
     parser.add_argument("--out-model", default="/home/amrik/code/smart-campus/models/mold_lgbm.txt")
+    parser.add_argument("--features", default="", help="Comma-separated feature columns (default: all)")
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Out-of-core mode for partitioned Parquet: build Datasets file by file instead of loading into pandas",
+    )
+    parser.add_argument("--cache-dir", default="", help="Save/reuse binned LightGBM Datasets here (streaming mode)")
     args = parser.parse_args()
 
-    df = pd.read_csv(args.data, parse_dates=["ts"])
-    df = df.sort_values("ts")
+    # Only load what training uses: ts for ordering, the target and the features
+    if args.features:
+        features = [c.strip() for c in args.features.split(",") if c.strip()]
+    else:
+        features = [c for c in dataset_columns(args.data) if c not in {"ts", "scenario", "target_idx_mold_h"}]
 
-    train_df, val_df, test_df = time_split(df)
-    X_train, y_train = build_xy(train_df)
-    X_val, y_val = build_xy(val_df)
-    X_test, y_test = build_xy(test_df)
+    if args.streaming:
+        dtrain, dval, test_slices = build_streaming_datasets(args.data, features, args.cache_dir or None)
+    else:
+        df = read_dataset(args.data, columns=["ts", *features, "target_idx_mold_h"])
+        df = df.sort_values("ts")
 
-    params = {
-        "objective": "regression",
-        "metric": "mae",
-        "learning_rate": 0.05,
-        "num_leaves": 31,
-        "feature_fraction": 0.9,
-        "seed": 42,
-    }
+        train_df, val_df, test_df = time_split(df)
+        X_train, y_train = build_xy(train_df)
+        X_val, y_val = build_xy(val_df)
+        X_test, y_test = build_xy(test_df)
 
-    dtrain = lgb.Dataset(X_train, label=y_train)
-    dval = lgb.Dataset(X_val, label=y_val, reference=dtrain)
+        dtrain = lgb.Dataset(X_train, label=y_train)
+        dval = lgb.Dataset(X_val, label=y_val, reference=dtrain)
 
     model = lgb.train(
-        params,
+        PARAMS,
         dtrain,
         valid_sets=[dval],
         num_boost_round=200,
@@ -62,8 +236,11 @@ def main() -> None:
         ],
     )
 
-    preds = model.predict(X_test)
-    mae = mean_absolute_error(y_test, preds)
+    if args.streaming:
+        mae = streaming_mae(model, test_slices)
+    else:
+        preds = model.predict(X_test)
+        mae = mean_absolute_error(y_test, preds)
     print(f"Test MAE: {mae:.4f}")
 
     Path(args.out_model).parent.mkdir(parents=True, exist_ok=True)
@@ -71,7 +248,7 @@ def main() -> None:
     print(f"Saved model to {args.out_model}")
 
     # Feature importance
-    imp = pd.DataFrame({"feature": X_train.columns, "importance": model.feature_importance()})
+    imp = pd.DataFrame({"feature": model.feature_name(), "importance": model.feature_importance()})
     imp = imp.sort_values("importance", ascending=False)
     print("Top features:")
     print(imp.head(10).to_string(index=False))
@@ -0,0 +1,62 @@
+# NumPy versions of physics.dew_point_c and mold_index.mold_risk_index for whole
+# series. They repeat the scalar arithmetic operation for operation, so results
+# match the scalar functions bit for bit.
+import math
+
+import numpy as np
+
+
+def dew_point_c_array(air_temp_c: np.ndarray, air_rh_pct: np.ndarray) -> np.ndarray:
+    # Magnus formula, see physics.dew_point_c
+    a = 17.62
+    b = 243.12
+    temp = np.asarray(air_temp_c, dtype=float)
+    rh = np.minimum(100.0, np.maximum(1e-6, np.asarray(air_rh_pct, dtype=float)))
+    # np.log can differ from math.log in the last ulp; sensor RH is quantized,
+    # so taking math.log over the unique values is both exact and cheap.
+    uniq, inverse = np.unique(rh / 100.0, return_inverse=True)
+    log_rh = np.array([math.log(v) for v in uniq], dtype=float)[inverse].reshape(rh.shape)
+    gamma = (a * temp) / (b + temp) + log_rh
+    return (b * gamma) / (a - gamma)
+
+
+def trailing_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Mean of the last ``window`` values at each position (expanding at the start).
+
+    Sums are accumulated left to right within each window, in the same order
+    as ``sum()`` over a Python list, using ``window`` vector adds.
+    """
+    x = np.asarray(values, dtype=float)
+    n = len(x)
+    out = np.empty(n, dtype=float)
+    head = min(window, n)
+    # The first ``window`` positions see a growing prefix: a running sum is exact.
+    out[:head] = np.cumsum(x[:head]) / np.arange(1, head + 1)
+    if n > window:
+        acc = x[: n - window + 1].copy()
+        for k in range(1, window):
+            acc += x[k : n - window + 1 + k]
+        out[window - 1 :] = acc / window
+    return out
+
+
+def mold_risk_index_array(air_temp_c: np.ndarray, air_rh_pct: np.ndarray, window: int) -> np.ndarray:
+    """Vectorized ``mold_risk_index`` with a trailing ``window``-sample RH history."""
+    temp = np.asarray(air_temp_c, dtype=float)
+    rh = np.asarray(air_rh_pct, dtype=float)
+    rh_mean = trailing_mean(rh, window)
+
+    rh_persist = np.clip((rh_mean - 60.0) / 40.0, 0.0, 1.0)
+
+    dp = dew_point_c_array(temp, rh)
+    gap = temp - dp
+    proximity = np.clip((2.0 - gap) / 2.0, 0.0, 1.0)
+
+    recovery = np.where(
+        (rh < 70.0) & (rh_mean > 75.0),
+        np.clip((75.0 - rh) / 20.0, 0.0, 1.0),
+        0.0,
+    )
+
+    risk = 0.55 * rh_persist + 0.35 * proximity - 0.2 * recovery
+    return np.clip(risk, 0.0, 1.0)
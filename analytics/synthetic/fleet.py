@@ -0,0 +1,269 @@
+import argparse
+import asyncio
+import bisect
+import json
+import random
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .demo_clock import utc_now_floor
+from .http_client import AsyncConnection
+from .scenario_generator import build_payload
+
+DEFAULT_MIX = "NORMAL:0.8,MOLD_EPISODE:0.15,WATER_EVENT:0.05"
+# Latency histogram bucket upper bounds in ms; the last bucket is open-ended.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def parse_mix(mix: str) -> List[Tuple[str, float]]:
+    """``"NORMAL:0.8,MOLD_EPISODE:0.2"`` -> [(scenario, weight), ...]."""
+    parts = []
+    for chunk in mix.split(","):
+        name, weight = chunk.split(":")
+        parts.append((name.strip().upper(), float(weight)))
+    return parts
+
+
+@dataclass
+class FleetNode:
+    """One simulated air/water node pair.
+
+    Its stream is a chain of episodes of ``episode_steps`` samples. Each
+    episode's scenario is drawn from ``mix`` by a generator seeded with
+    ``seed`` and the episode number, so every node has its own reproducible
+    scenario sequence.
+    """
+
+    air_node_id: str
+    water_node_id: str
+    building_id: str
+    site_id: str
+    building_zone: str
+    seed: int
+    mix: Sequence[Tuple[str, float]]
+    episode_steps: int = 60
+
+    def scenario_at(self, episode: int) -> str:
+        rng = random.Random(self.seed + episode)
+        names = [name for name, _ in self.mix]
+        return rng.choices(names, weights=[w for _, w in self.mix])[0]
+
+    def payload(self, step: int, ts: datetime) -> Dict[str, object]:
+        episode, offset = divmod(step, self.episode_steps)
+        scenario = self.scenario_at(episode)
+        return build_payload(
+            ts,
+            scenario,
+            offset,  # scenario ramps restart with each episode
+            self.seed + episode * self.episode_steps,
+            f"{self.air_node_id}-{scenario.lower()}-{episode}",
+            self.air_node_id,
+            self.water_node_id,
+            self.building_id,
+            self.site_id,
+            self.building_zone,
+        )
+
+
+def build_fleet(
+    nodes: int,
+    buildings: int = 10,
+    zones_per_building: int = 4,
+    mix: str = DEFAULT_MIX,
+    seed: int = 42,
+    site_id: str = "CAMPUS",
+    episode_steps: int = 60,
+) -> List[FleetNode]:
+    """``nodes`` nodes spread round-robin over buildings, then zones within each building."""
+    weights = parse_mix(mix)
+    fleet = []
+    for i in range(nodes):
+        b = i % buildings
+        z = (i // buildings) % zones_per_building
+        fleet.append(
+            FleetNode(
+                air_node_id=f"AIR-{i:05d}",
+                water_node_id=f"WATER-{i:05d}",
+                building_id=f"{site_id}-B{b:02d}",
+                site_id=site_id,
+                building_zone=f"{site_id}-B{b:02d}-Z{z:02d}",
+                # build_payload seeds per sample with seed + step; keep node streams apart
+                seed=(seed + i) * 1_000_003,
+                mix=weights,
+                episode_steps=episode_steps,
+            )
+        )
+    return fleet
+
+
+class LatencyHistogram:
+    def __init__(self, bounds_ms: Sequence[float] = LATENCY_BUCKETS_MS) -> None:
+        self.bounds_ms = tuple(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.samples: List[float] = []
+
+    def add(self, latency_s: float) -> None:
+        ms = latency_s * 1000
+        self.counts[bisect.bisect_left(self.bounds_ms, ms)] += 1
+        self.samples.append(ms)
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "p50_ms": self.percentile(0.50),
+            "p90_ms": self.percentile(0.90),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": max(self.samples, default=0.0),
+        }
+
+    def render(self, width: int = 40) -> str:
+        total = max(1, sum(self.counts))
+        labels = [f"<= {b:g} ms" for b in self.bounds_ms] + [f"> {self.bounds_ms[-1]:g} ms"]
+        lines = []
+        for label, count in zip(labels, self.counts):
+            if count:
+                bar = "#" * max(1, round(width * count / total))
+                lines.append(f"  {label:>11} {count:8d} {100 * count / total:5.1f}% {bar}")
+        return "\n".join(lines)
+
+
+@dataclass
+class FleetReport:
+    scheduled: int
+    completed: int
+    errors: int
+    status_counts: Dict[int, int]
+    elapsed_s: float
+    target_rate: float
+    service: LatencyHistogram
+    end_to_end: LatencyHistogram
+
+    @property
+    def achieved_rate(self) -> float:
+        return self.completed / self.elapsed_s if self.elapsed_s else 0.0
+
+    def render(self) -> str:
+        svc, e2e = self.service.summary(), self.end_to_end.summary()
+        lines = [
+            f"target {self.target_rate:.0f} req/s, achieved {self.achieved_rate:.0f} req/s "
+            f"({self.completed}/{self.scheduled} requests in {self.elapsed_s:.1f} s, {self.errors} errors)",
+            f"status codes: {dict(sorted(self.status_counts.items()))}",
+            "server latency (request sent -> response): "
+            + "  ".join(f"{k} {v:.1f}" for k, v in svc.items()),
+            self.service.render(),
+            "end-to-end latency (scheduled send -> response, includes client queueing): "
+            + "  ".join(f"{k} {v:.1f}" for k, v in e2e.items()),
+            self.end_to_end.render(),
+        ]
+        return "\n".join(lines)
+
+
+async def run_fleet(
+    api_url: str,
+    fleet: Sequence[FleetNode],
+    rate: float,
+    duration_s: float,
+    connections: int = 64,
+    endpoint: str = "/telemetry",
+    start_ts: Optional[datetime] = None,
+) -> FleetReport:
+    """Open-loop load: request i is due at ``i / rate`` seconds, nodes taken round-robin.
+
+    Each node therefore posts every ``len(fleet) / rate`` seconds, and its
+    samples are timestamped that far apart starting at ``start_ts``. Requests
+    go over ``connections`` keep-alive connections; a node always uses the
+    same one, so its samples arrive in order. When the server falls behind,
+    requests wait in the connection's queue. That wait shows up in end-to-end
+    latency, while server latency counts only from send to response.
+    """
+    period_s = len(fleet) / rate
+    start_ts = start_ts or utc_now_floor()
+    total = int(rate * duration_s)
+    lanes: List["asyncio.Queue[Optional[Tuple[float, bytes]]]"] = [asyncio.Queue() for _ in range(connections)]
+    lane_of = [zlib.crc32(node.air_node_id.encode()) % connections for node in fleet]
+    service, end_to_end = LatencyHistogram(), LatencyHistogram()
+    status_counts: Dict[int, int] = {}
+    completed = errors = 0
+
+    async def lane_worker(q: "asyncio.Queue[Optional[Tuple[float, bytes]]]") -> None:
+        nonlocal completed, errors
+        conn = AsyncConnection(api_url)
+        try:
+            while True:
+                item = await q.get()
+                if item is None:
+                    return
+                due, body = item
+                sent = time.perf_counter()
+                try:
+                    status = await conn.request("POST", endpoint, body)
+                except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+                    conn.close()
+                    status = 0
+                done = time.perf_counter()
+                service.add(done - sent)
+                end_to_end.add(done - due)
+                status_counts[status] = status_counts.get(status, 0) + 1
+                completed += 1
+                errors += status != 200
+        finally:
+            conn.close()
+
+    workers = [asyncio.create_task(lane_worker(q)) for q in lanes]
+    t0 = time.perf_counter()
+    for i in range(total):
+        due = t0 + i / rate
+        # sleep(0) still yields to the connections when running behind schedule
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        n = i % len(fleet)
+        step = i // len(fleet)
+        payload = fleet[n].payload(step, start_ts + timedelta(seconds=step * period_s))
+        lanes[lane_of[n]].put_nowait((due, json.dumps(payload).encode()))
+    for q in lanes:
+        q.put_nowait(None)
+    await asyncio.gather(*workers)
+    return FleetReport(
+        scheduled=total,
+        completed=completed,
+        errors=errors,
+        status_counts=status_counts,
+        elapsed_s=time.perf_counter() - t0,
+        target_rate=rate,
+        service=service,
+        end_to_end=end_to_end,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulate a fleet of nodes posting telemetry at a target aggregate rate")
+    parser.add_argument("--api-url", required=True)
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--buildings", type=int, default=10)
+    parser.add_argument("--zones-per-building", type=int, default=4)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario weights per episode")
+    parser.add_argument("--episode-steps", type=int, default=60, help="samples per scenario episode")
+    parser.add_argument("--rate", type=float, default=400.0, help="aggregate requests/s across the fleet")
+    parser.add_argument("--duration-s", type=float, default=60.0)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    fleet = build_fleet(args.nodes, args.buildings, args.zones_per_building, args.mix, args.seed, episode_steps=args.episode_steps)
+    print(
+        f"{args.nodes} nodes in {args.buildings} buildings, one sample per node every "
+        f"{args.nodes / args.rate:.1f} s ({args.rate:.0f} req/s) for {args.duration_s:.0f} s"
+    )
+    report = asyncio.run(run_fleet(args.api_url, fleet, args.rate, args.duration_s, args.connections))
+    print(report.render())
+
+
+if __name__ == "__main__":
+    main()
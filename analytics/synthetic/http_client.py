@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import asyncio
+import queue
+import time
+import zlib
+from threading import Lock, Thread
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Worth retrying: the server restarted, is overloaded, or a proxy gave up.
+RETRY_STATUS = {429, 502, 503, 504}
+
+
+class TelemetryClient:
+    """Pooled, pipelined sender for ingest payloads.
+
+    ``send`` enqueues a payload and returns; ``lanes`` worker threads POST
+    them over keep-alive sessions, so up to ``lanes`` requests are in flight
+    while the caller generates the next samples. A node always maps to the
+    same lane (``crc32(air_node_id)``), so its samples reach the API in the
+    order they were sent, as the lag buffers require. Each lane queue holds
+    at most ``queue_max`` payloads and ``send`` blocks when it is full.
+
+    Connection errors, timeouts and 429/5xx responses are retried up to
+    ``retries`` times with exponential backoff from ``backoff_s``. With
+    ``batch_size`` > 1 a lane groups up to that many queued payloads (waiting
+    at most ``batch_flush_s`` for more) into one ``/telemetry/batch`` call.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        lanes: int = 4,
+        batch_size: int = 1,
+        batch_flush_s: float = 0.2,
+        retries: int = 3,
+        backoff_s: float = 0.2,
+        timeout_s: float = 5.0,
+        queue_max: int = 1000,
+    ) -> None:
+        self.api_url = api_url.rstrip("/")
+        self.batch_size = max(1, batch_size)
+        self.batch_flush_s = batch_flush_s
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.timeout_s = timeout_s
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.requests = 0
+        self.last_error: Optional[str] = None
+        self._stats_lock = Lock()
+        self._queues: List["queue.Queue[Optional[Dict[str, Any]]]"] = [
+            queue.Queue(maxsize=queue_max) for _ in range(max(1, lanes))
+        ]
+        self._threads = [
+            Thread(target=self._run, args=(q,), name=f"telemetry-lane-{i}", daemon=True)
+            for i, q in enumerate(self._queues)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self) -> "TelemetryClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def send(self, payload: Dict[str, Any]) -> None:
+        lane = zlib.crc32(str(payload.get("air_node_id", "")).encode()) % len(self._queues)
+        self._queues[lane].put(payload)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every payload sent so far has been delivered or given up on.
+
+        With ``timeout``, give up after that many seconds and return False.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for q in self._queues:
+            # Queue.join() with a deadline
+            with q.all_tasks_done:
+                while q.unfinished_tasks:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    q.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 60.0) -> None:
+        """Flush, then stop the lanes; waits at most about ``timeout`` seconds in total."""
+        deadline = time.monotonic() + timeout
+        self.flush(timeout)
+        for q in self._queues:
+            try:
+                q.put_nowait(None)
+            except queue.Full:
+                pass  # still backed up after the timeout; the daemon threads go with the process
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "sent": self.sent,
+                "failed": self.failed,
+                "retried": self.retried,
+                "requests": self.requests,
+                "last_error": self.last_error,
+            }
+
+    def _session(self) -> requests.Session:
+        session = requests.Session()
+        session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        return session
+
+    def _run(self, q: "queue.Queue[Optional[Dict[str, Any]]]") -> None:
+        session = self._session()
+        while True:
+            first = q.get()
+            if first is None:
+                q.task_done()
+                session.close()
+                return
+            batch = [first]
+            stop = False
+            deadline = time.monotonic() + self.batch_flush_s
+            while len(batch) < self.batch_size:
+                try:
+                    item = q.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                self._deliver(session, batch)
+            except Exception as exc:
+                # Never let a lane die: send() and flush() would block on its queue forever.
+                with self._stats_lock:
+                    self.failed += len(batch)
+                    self.last_error = f"{type(exc).__name__}: {exc}"
+            finally:
+                for _ in range(len(batch) + stop):
+                    q.task_done()
+            if stop:
+                session.close()
+                return
+
+    def _deliver(self, session: requests.Session, batch: List[Dict[str, Any]]) -> None:
+        if len(batch) == 1:
+            url, body = f"{self.api_url}/telemetry", batch[0]
+        else:
+            url, body = f"{self.api_url}/telemetry/batch?results=summary", batch
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                with self._stats_lock:
+                    self.retried += 1
+                time.sleep(self.backoff_s * 2 ** (attempt - 1))
+            try:
+                resp = session.post(url, json=body, timeout=self.timeout_s)
+            except requests.RequestException as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                continue
+            finally:
+                with self._stats_lock:
+                    self.requests += 1
+            if resp.status_code in RETRY_STATUS:
+                error = f"HTTP {resp.status_code}"
+                continue
+            if resp.status_code >= 400:
+                error = f"HTTP {resp.status_code}: {resp.text[:200]}"
+                break
+            # The batch endpoint accepts valid samples and lists the rejected ones.
+            try:
+                rejected = resp.json().get("rejected", []) if len(batch) > 1 else []
+            except ValueError:
+                error = f"HTTP {resp.status_code}: response is not JSON: {resp.text[:200]}"
+                break
+            with self._stats_lock:
+                self.sent += len(batch) - len(rejected)
+                self.failed += len(rejected)
+                if rejected:
+                    self.last_error = f"rejected: {rejected[0].get('error', '')[:200]}"
+            return
+        with self._stats_lock:
+            self.failed += len(batch)
+            self.last_error = error
+
+
+class AsyncConnection:
+    """Minimal keep-alive HTTP/1.1 connection for asyncio load generators.
+
+    One request at a time per connection. A request on a reused connection
+    that the server has meanwhile closed is resent once on a new one, and a
+    ``Connection: close`` reply ends the connection. A general-purpose client
+    (httpx) costs more CPU per request than the API's handler does, so on a
+    small box a load test would mostly measure the client.
+    """
+
+    def __init__(self, url: str) -> None:
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self._reader = self._writer = None
+
+    async def request(self, method: str, path: str, body: bytes = b"") -> int:
+        reused = self._writer is not None
+        try:
+            return await self._exchange(method, path, body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            self.close()
+            if not reused:
+                raise
+        # The server dropped the idle keep-alive connection before reading the
+        # request; resend once on a fresh one.
+        return await self._exchange(method, path, body)
+
+    async def _exchange(self, method: str, path: str, body: bytes) -> int:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        head = (
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        )
+        self._writer.write(head.encode() + body)
+        await self._writer.drain()
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed before the response")
+        status = int(status_line.split()[1])
+        length = 0
+        keep_alive = True
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.partition(b":")
+            name = name.strip().lower()
+            if name == b"content-length":
+                length = int(value)
+            elif name == b"connection" and value.strip().lower() == b"close":
+                keep_alive = False
+        await self._reader.readexactly(length)
+        if not keep_alive:
+            self.close()
+        return status
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
@@ -0,0 +1,268 @@
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+
+from .demo_clock import utc_now_floor
+from .fleet import DEFAULT_MIX, FleetNode, build_fleet
+from .scenario_generator import _tod_features
+
+# NumPy version of scenario_generator.build_payload for K steps x N fleet nodes
+# at once. Each noise term has the same uniform range and each sensor the same
+# quantization and clip as the scalar generator. The values come from one
+# Philox stream per seed rather than random.Random(seed + step), so they match
+# build_payload in distribution, not sample for sample.
+
+Block = Dict[str, np.ndarray]
+
+# Payload keys in build_payload order.
+COLUMNS = (
+    "ts",
+    "building_id",
+    "site_id",
+    "building_zone",
+    "air_node_id",
+    "water_node_id",
+    "air_temp_c",
+    "air_rh_pct",
+    "water_temp_c",
+    "water_turbidity_ntu",
+    "water_free_chlorine_mgL",
+    "water_tds_ppm",
+    "scenario",
+    "episode_id",
+    "data_source",
+    "seq_water",
+    "rssi_ble",
+    "battery_mv",
+    "flags",
+    "outdoor_temp_c",
+    "outdoor_rh_pct",
+    "outdoor_dew_point_c",
+    "tod_sin",
+    "tod_cos",
+    "dow_sin",
+    "dow_cos",
+    "air_co2_ppm",
+    "air_voc_index",
+    "air_surface_temp_c",
+)
+
+# Uniform draws per sample: 18 noise terms, padded to a multiple of Philox's
+# 4-word output block so a sample's draws start at a fixed counter.
+DRAWS_PER_SAMPLE = 20
+
+
+def quantize_array(values: np.ndarray, step: float) -> np.ndarray:
+    # np.round rounds half to even like round(), and the product is the same
+    # float, so this matches scenario_generator._quantize bit for bit.
+    return np.round(values / step) * step
+
+
+def _uniforms(seed: int, nodes: int, start_step: int, steps: int) -> np.ndarray:
+    """Draws for samples ``start_step`` .. ``start_step + steps - 1``, shape (steps, nodes, DRAWS_PER_SAMPLE).
+
+    Sample (step, node) always reads the same slice of the seed's stream, so
+    the output does not depend on how a run is split into blocks.
+    """
+    bit_gen = np.random.Philox(key=seed)
+    bit_gen.advance(start_step * nodes * DRAWS_PER_SAMPLE // 4)
+    return np.random.Generator(bit_gen).random((steps, nodes, DRAWS_PER_SAMPLE))
+
+
+def payload_block(
+    fleet: Sequence[FleetNode],
+    start_step: int,
+    steps: int,
+    start_ts: datetime,
+    period_s: float,
+    seed: int = 42,
+) -> Block:
+    """Columnar payloads for ``steps`` steps of every node in ``fleet``.
+
+    Rows are step-major (every node at one step, then the next), as
+    ``run_fleet`` sends them, and step ``s`` is timestamped
+    ``start_ts + s * period_s``. Each column is a 1-D array of
+    ``steps * len(fleet)`` values; ``iter_payloads`` turns rows into dicts.
+    Episodes and scenarios follow ``FleetNode.payload``.
+    """
+    n = len(fleet)
+    step = start_step + np.arange(steps)
+    episode_steps = np.array([node.episode_steps for node in fleet])
+    episode = step[:, None] // episode_steps
+    offset = step[:, None] - episode * episode_steps
+
+    # Scenario per (node, episode) from the node's own mix, once per episode in the block
+    names = sorted({name for node in fleet for name, _ in node.mix})
+    code = np.empty((steps, n), dtype=np.int64)
+    episode_id = np.empty((steps, n), dtype=object)
+    for i, node in enumerate(fleet):
+        first, last = episode[0, i], episode[-1, i]
+        scenarios = [node.scenario_at(e) for e in range(first, last + 1)]
+        codes = np.array([names.index(s) for s in scenarios])
+        ids = np.array([f"{node.air_node_id}-{s.lower()}-{first + j}" for j, s in enumerate(scenarios)], dtype=object)
+        code[:, i] = codes[episode[:, i] - first]
+        episode_id[:, i] = ids[episode[:, i] - first]
+    mold = code == names.index("MOLD_EPISODE") if "MOLD_EPISODE" in names else np.zeros_like(code, dtype=bool)
+    water = code == names.index("WATER_EVENT") if "WATER_EVENT" in names else np.zeros_like(code, dtype=bool)
+
+    u = _uniforms(seed, n, start_step, steps)
+
+    def uniform(k: int, lo: float, hi: float) -> np.ndarray:
+        # random.uniform(lo, hi) is lo + (hi - lo) * random()
+        return lo + (hi - lo) * u[..., k]
+
+    ramp = np.clip((offset - 3) / 24.0, 0.0, 1.0)
+    air_temp = np.where(mold, 23.0 + uniform(6, -0.15, 0.15), 22.0 + uniform(0, -0.3, 0.3))
+    air_rh = np.where(mold, 62.0 + 36.0 * ramp + uniform(7, -0.4, 0.4), 45.0 + uniform(1, -2.0, 2.0))
+    water_temp = 18.5 + uniform(2, -0.2, 0.2)
+    turb = np.where(water, 5.0 + 1.2 * offset + uniform(8, -2.0, 2.0), 0.8 + uniform(3, -0.1, 0.1))
+    chlorine = np.where(
+        water,
+        np.maximum(0.1, 0.6 - 0.02 * offset + uniform(9, -0.05, 0.05)),
+        1.2 + uniform(4, -0.1, 0.1),
+    )
+    tds = np.where(water, 500.0 + 15.0 * offset + uniform(10, -20.0, 20.0), 350.0 + uniform(5, -20.0, 20.0))
+
+    air_temp = np.clip(quantize_array(air_temp, 0.1), 15.0, 30.0)
+    air_rh = np.clip(quantize_array(air_rh, 0.1), 20.0, 98.0)
+    water_temp = np.clip(quantize_array(water_temp, 0.1), 5.0, 30.0)
+    turb = np.clip(quantize_array(turb, 0.1), 0.0, 1000.0)
+    chlorine = np.clip(quantize_array(chlorine, 0.01), 0.0, 5.0)
+    tds = np.clip(quantize_array(tds, 1.0), 0.0, 5000.0)
+
+    air_co2 = np.clip(quantize_array(620.0 + uniform(11, -40.0, 40.0), 1.0), 400.0, 2000.0)
+    air_voc_index = np.clip(quantize_array(120.0 + uniform(12, -30.0, 30.0), 1.0), 0.0, 500.0)
+    surface_delta = -0.6 - np.where(mold, 0.01 * offset, 0.0)
+    air_surface_temp = np.clip(quantize_array(air_temp + surface_delta + uniform(13, -0.1, 0.1), 0.1), -20.0, 80.0)
+
+    outdoor_temp = quantize_array(10.0 + 5.0 * np.sin(offset / 30.0) + uniform(14, -0.5, 0.5), 0.1)
+    outdoor_rh = np.clip(quantize_array(65.0 + 10.0 * np.cos(offset / 40.0) + uniform(15, -1.5, 1.5), 0.1), 20.0, 100.0)
+    outdoor_dp = quantize_array(outdoor_temp - (100.0 - outdoor_rh) / 5.0, 0.1)
+    # int() truncates toward zero, as does astype
+    rssi = (-60 + uniform(16, -5.0, 5.0)).astype(np.int64)
+    battery = (3850 + uniform(17, -30.0, 30.0)).astype(np.int64)
+
+    # Timestamps and calendar features vary by step only: compute them K times, not K * N
+    stamps = [start_ts + timedelta(seconds=int(s) * period_s) for s in step]
+    tod = np.array([_tod_features(ts) for ts in stamps]).reshape(steps, 1, 4)
+    ts = np.array([ts.isoformat().replace("+00:00", "Z") for ts in stamps], dtype=object)
+
+    def per_node(values: Iterable[str]) -> np.ndarray:
+        return np.tile(np.array(list(values), dtype=object), steps)
+
+    columns = {
+        "ts": np.repeat(ts, n),
+        "building_id": per_node(node.building_id for node in fleet),
+        "site_id": per_node(node.site_id for node in fleet),
+        "building_zone": per_node(node.building_zone for node in fleet),
+        "air_node_id": per_node(node.air_node_id for node in fleet),
+        "water_node_id": per_node(node.water_node_id for node in fleet),
+        "air_temp_c": air_temp,
+        "air_rh_pct": air_rh,
+        "water_temp_c": water_temp,
+        "water_turbidity_ntu": turb,
+        "water_free_chlorine_mgL": chlorine,
+        "water_tds_ppm": tds,
+        "scenario": np.array(names, dtype=object)[code],
+        "episode_id": episode_id,
+        "data_source": np.full(steps * n, "EMULATED", dtype=object),
+        "seq_water": offset,
+        "rssi_ble": rssi,
+        "battery_mv": battery,
+        "flags": np.zeros(steps * n, dtype=np.int64),
+        "outdoor_temp_c": outdoor_temp,
+        "outdoor_rh_pct": outdoor_rh,
+        "outdoor_dew_point_c": outdoor_dp,
+        "tod_sin": np.broadcast_to(tod[..., 0], (steps, n)),
+        "tod_cos": np.broadcast_to(tod[..., 1], (steps, n)),
+        "dow_sin": np.broadcast_to(tod[..., 2], (steps, n)),
+        "dow_cos": np.broadcast_to(tod[..., 3], (steps, n)),
+        "air_co2_ppm": air_co2,
+        "air_voc_index": air_voc_index,
+        "air_surface_temp_c": air_surface_temp,
+    }
+    return {key: np.ravel(columns[key]) for key in COLUMNS}
+
+
+def iter_blocks(
+    fleet: Sequence[FleetNode],
+    total_steps: int,
+    block_steps: int = 256,
+    start_ts: Optional[datetime] = None,
+    period_s: float = 60.0,
+    seed: int = 42,
+) -> Iterator[Block]:
+    """``payload_block`` over ``total_steps`` steps, ``block_steps`` at a time."""
+    start_ts = start_ts or utc_now_floor()
+    for start in range(0, total_steps, block_steps):
+        yield payload_block(fleet, start, min(block_steps, total_steps - start), start_ts, period_s, seed)
+
+
+def iter_payloads(blocks: Iterable[Block]) -> Iterator[Dict[str, object]]:
+    """Row dicts shaped like build_payload's, one block converted at a time."""
+    for block in blocks:
+        # tolist() yields plain Python floats/ints, so the dicts serialize with json
+        columns = [block[key].tolist() for key in COLUMNS]
+        for row in zip(*columns):
+            yield dict(zip(COLUMNS, row))
+
+
+def write_replay(out: Path, blocks: Iterable[Block]) -> int:
+    """Write blocks as NDJSON (the /telemetry/batch body format) or, for ``.parquet``, one Parquet file."""
+    rows = 0
+    if out.suffix.lower() == ".parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for block in blocks:
+                table = pa.Table.from_pydict(block)
+                if writer is None:
+                    writer = pq.ParquetWriter(str(out), table.schema)
+                writer.write_table(table)
+                rows += table.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    with out.open("w") as f:
+        for payload in iter_payloads(blocks):
+            f.write(json.dumps(payload))
+            f.write("\n")
+            rows += 1
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a fleet replay file with the vectorized payload generator")
+    parser.add_argument("--out", required=True, help=".ndjson (POST to /telemetry/batch) or .parquet")
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--steps", type=int, default=1000, help="samples per node")
+    parser.add_argument("--buildings", type=int, default=10)
+    parser.add_argument("--zones-per-building", type=int, default=4)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario weights per episode")
+    parser.add_argument("--episode-steps", type=int, default=60, help="samples per scenario episode")
+    parser.add_argument("--period-s", type=float, default=60.0, help="seconds between a node's samples")
+    parser.add_argument("--block-steps", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    fleet = build_fleet(args.nodes, args.buildings, args.zones_per_building, args.mix, args.seed, episode_steps=args.episode_steps)
+    # End at the current time, like a fast demo replay
+    start_ts = utc_now_floor() - timedelta(seconds=(args.steps - 1) * args.period_s)
+    t0 = time.perf_counter()
+    blocks = iter_blocks(fleet, args.steps, args.block_steps, start_ts, args.period_s, args.seed)
+    rows = write_replay(Path(args.out), blocks)
+    elapsed = time.perf_counter() - t0
+    print(f"wrote {rows} samples to {args.out} in {elapsed:.1f} s ({rows / max(elapsed, 1e-9):,.0f} samples/s)")
+
+
+if __name__ == "__main__":
+    main()
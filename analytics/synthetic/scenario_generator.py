@@ -5,9 +5,8 @@ import time
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple
 
-import requests
-
 from .demo_clock import DemoClock, utc_now_floor
+from .http_client import TelemetryClient
 
 
 def _quantize(value: float, step: float) -> float:
@@ -126,7 +125,10 @@ def run_generator(
     building_id: str,
     site_id: str,
     building_zone: str,
+    client: Optional[TelemetryClient] = None,
 ) -> None:
+    owned = client is None
+    client = client or TelemetryClient(api_url, lanes=1)
     start_ts = utc_now_floor()
     clock = DemoClock(start_ts, speed=60.0)
 
@@ -146,9 +148,12 @@ def run_generator(
             site_id,
             building_zone,
         )
-        requests.post(f"{api_url}/telemetry", json=payload, timeout=5)
-        time.sleep(rate_sec)
+        client.send(payload)
+        if rate_sec > 0:
+            time.sleep(rate_sec)
         step += 1
+    if owned:
+        client.close()
 
 
 def run_sequence(
@@ -161,7 +166,10 @@ def run_sequence(
     building_id: str,
     site_id: str,
     building_zone: str,
+    client: Optional[TelemetryClient] = None,
 ) -> None:
+    owned = client is None
+    client = client or TelemetryClient(api_url, lanes=1)
     start_ts = utc_now_floor()
     clock = DemoClock(start_ts, speed=60.0)
     step = 0
@@ -182,9 +190,12 @@ def run_sequence(
                 site_id,
                 building_zone,
             )
-            requests.post(f"{api_url}/telemetry", json=payload, timeout=5)
-            time.sleep(rate_sec)
+            client.send(payload)
+            if rate_sec > 0:
+                time.sleep(rate_sec)
             step += 1
+    if owned:
+        client.close()
 
 
 def main() -> None:
@@ -201,7 +212,11 @@ def main() -> None:
     parser.add_argument("--building-id", default="RUTGERS-ENG-1")
     parser.add_argument("--site-id", default="RUTGERS")
     parser.add_argument("--building-zone", default="ENG-1-BASEMENT")
+    parser.add_argument("--lanes", type=int, default=1, help="concurrent keep-alive connections (one node stays on one lane)")
+    parser.add_argument("--batch-size", type=int, default=1, help="group up to N samples per /telemetry/batch call")
+    parser.add_argument("--retries", type=int, default=3)
     args = parser.parse_args()
+    client = TelemetryClient(args.api_url, lanes=args.lanes, batch_size=args.batch_size, retries=args.retries)
 
     if args.sequence:
         parts = []
@@ -218,6 +233,7 @@ def main() -> None:
             args.building_id,
             args.site_id,
             args.building_zone,
+            client,
         )
     else:
         scenario = args.scenario.upper()
@@ -233,7 +249,10 @@ def main() -> None:
             args.building_id,
             args.site_id,
             args.building_zone,
+            client,
         )
+    client.close()
+    print(client.stats())
 
 
 if __name__ == "__main__":
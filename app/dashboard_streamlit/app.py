@@ -33,15 +33,24 @@ def fetch_latest(air_node_id: str = "", base: str = "") -> dict:
         return {"status": "error", "error": str(exc)}
 
 
+HISTORY_FIELDS = "ts,air_rh_pct,idx_mold_now,pred_idx_mold_h"
+
+
 def fetch_history(air_node_id: str, base: str = "") -> dict:
     try:
         root = base or API_URL
         return requests.get(
-            f"{root}/history?air_node_id={air_node_id}&minutes=60",
+            f"{root}/history",
+            params={
+                "air_node_id": air_node_id,
+                "minutes": 60,
+                "format": "columnar",
+                "fields": HISTORY_FIELDS,
+            },
             timeout=3,
         ).json()
     except Exception as exc:
-        return {"rows": [], "error": str(exc)}
+        return {"columns": {}, "error": str(exc)}
 
 
 def fetch_live_nodes() -> dict:
@@ -103,7 +112,7 @@ def render_view(title: str, air_node_id: str, base: str = "") -> None:
     meta_c.caption(f"Updated: {latest_local['normalized']['ts']}")
 
     history = fetch_history(air_node_id, base=base)
-    plot_df = pd.DataFrame(history.get("rows", []))
+    plot_df = pd.DataFrame(history.get("columns") or {})
     st.markdown("**Live Trends**")
     if plot_df.empty:
         st.info("Waiting for data stream...")
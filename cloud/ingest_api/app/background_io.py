@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import atexit
+import os
+import queue
+import time
+from threading import Lock, Thread
+from typing import Any, Callable, Optional, Tuple
+
+
+class BackgroundIO:
+    """Runs blocking file writes (CSV appends, JSONL logs) off the request path.
+
+    ``submit`` enqueues ``fn(*args)`` and returns immediately; one daemon
+    thread runs jobs in submission order, so appends to a file keep their
+    order. When the queue is full the job is dropped and counted in
+    ``dropped`` rather than blocking ingest. Failed jobs are counted in
+    ``failed``.
+    """
+
+    def __init__(self, maxsize: int = 10000) -> None:
+        self.dropped = 0
+        self.failed = 0
+        self._queue: "queue.Queue[Optional[Tuple[Callable[..., Any], tuple]]]" = queue.Queue(maxsize=maxsize)
+        self._lock = Lock()
+        self._thread: Optional[Thread] = None
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> None:
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait((fn, args))
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name="background-io", daemon=True)
+                self._thread.start()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every job submitted so far has run, or ``timeout`` seconds pass.
+
+        Returns False if jobs were still pending at the timeout.
+        """
+        if self._thread is None:
+            return True
+        if timeout is None:
+            self._queue.join()
+            return True
+        deadline = time.monotonic() + timeout
+        # Queue.join() without its unbounded wait
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def stop(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=10)
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                fn, args = job
+                try:
+                    fn(*args)
+                except Exception:
+                    self.failed += 1
+            finally:
+                self._queue.task_done()
+
+
+background_io = BackgroundIO(int(os.getenv("BACKGROUND_IO_QUEUE_MAX", "10000")))
+atexit.register(background_io.flush)
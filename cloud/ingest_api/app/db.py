@@ -1,4 +1,6 @@
-from sqlalchemy import create_engine
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from .settings import settings
@@ -6,9 +8,34 @@ from .settings import settings
 
 connect_args = {}
 if settings.database_url.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+    connect_args = {"check_same_thread": False, "timeout": 30}
 
 engine = create_engine(settings.database_url, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
+
+
+if settings.database_url.startswith("sqlite"):
+
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_conn, _record) -> None:
+        # WAL lets readers (dashboard, live_monitor) run alongside the writer thread.
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+        cur.execute("PRAGMA temp_store=MEMORY")
+        cur.execute("PRAGMA cache_size=-16000")
+        cur.execute("PRAGMA busy_timeout=30000")
+        # Off by default in SQLite; keeps feature/prediction rows from pointing at pruned samples.
+        cur.execute("PRAGMA foreign_keys=ON")
+        cur.close()
+
+
+def init_db(bind=None) -> None:
+    from . import models  # noqa: F401  (register tables on Base.metadata)
+
+    bind = bind or engine
+    if bind.url.get_backend_name() == "sqlite" and bind.url.database not in (None, "", ":memory:"):
+        Path(bind.url.database).parent.mkdir(parents=True, exist_ok=True)
+    Base.metadata.create_all(bind=bind)
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from threading import Lock
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# Column name -> (response section, key) for the per-node history columns.
+HISTORY_FIELDS: Dict[str, Tuple[str, str]] = {
+    "ts": ("normalized", "ts"),
+    "scenario": ("normalized", "scenario"),
+    "episode_id": ("normalized", "episode_id"),
+    "air_temp_c": ("normalized", "air_temp_c"),
+    "air_rh_pct": ("normalized", "air_rh_pct"),
+    "air_surface_temp_c": ("normalized", "air_surface_temp_c"),
+    "air_co2_ppm": ("normalized", "air_co2_ppm"),
+    "air_voc_index": ("normalized", "air_voc_index"),
+    "air_pm25_ugm3": ("normalized", "air_pm25_ugm3"),
+    "air_tvoc": ("normalized", "air_tvoc"),
+    "air_material_moisture": ("normalized", "air_material_moisture"),
+    "outdoor_temp_c": ("normalized", "outdoor_temp_c"),
+    "outdoor_rh_pct": ("normalized", "outdoor_rh_pct"),
+    "outdoor_dew_point_c": ("normalized", "outdoor_dew_point_c"),
+    "tod_sin": ("normalized", "tod_sin"),
+    "tod_cos": ("normalized", "tod_cos"),
+    "dow_sin": ("normalized", "dow_sin"),
+    "dow_cos": ("normalized", "dow_cos"),
+    "water_temp_c": ("normalized", "water_temp_c"),
+    "water_turbidity_ntu": ("normalized", "water_turbidity_ntu"),
+    "water_tds_ppm": ("normalized", "water_tds_ppm"),
+    "water_free_chlorine_mgL": ("normalized", "water_free_chlorine_mgL"),
+    "dew_point_c": ("features", "dew_point_c"),
+    "dew_margin_c": ("features", "dew_margin_c"),
+    "rh_mean_w": ("features", "rh_mean_w"),
+    "rh_std_w": ("features", "rh_std_w"),
+    "rh_slope_w": ("features", "rh_slope_w"),
+    "temp_slope_w": ("features", "temp_slope_w"),
+    "dew_point_slope_w": ("features", "dew_point_slope_w"),
+    "dew_margin_slope_w": ("features", "dew_margin_slope_w"),
+    "rh_time_above_70_w": ("features", "rh_time_above_70_w"),
+    "dew_margin_time_below_0_w": ("features", "dew_margin_time_below_0_w"),
+    "idx_mold_now": ("features", "idx_mold_now"),
+    "idx_water_event_now": ("features", "idx_water_event_now"),
+    "pred_idx_mold_h": ("prediction", "yhat"),
+    "prediction_model": ("prediction", "model_name"),
+}
+
+
+def unknown_fields(fields: Sequence[str]) -> List[str]:
+    return [name for name in fields if name not in HISTORY_FIELDS]
+
+
+class NodeHistory:
+    """Time-ordered, columnar history for one node.
+
+    Each history field is its own list, parallel to ``_ts``. The lists are
+    used as a ring: the live region starts at ``_start`` and is compacted
+    once the dead prefix reaches ``maxlen``, so appends are amortized O(1)
+    and range queries bisect on ``_ts``. Only the newest full response is
+    kept (for /latest). A per-node lock makes appends and reads atomic, so
+    readers never see columns of different lengths.
+    """
+
+    def __init__(self, maxlen: int) -> None:
+        self.maxlen = maxlen
+        self._ts: List[float] = []
+        self._cols: Dict[str, list] = {name: [] for name in HISTORY_FIELDS}
+        self._start = 0
+        self.latest: Optional[dict] = None
+        self.latest_ts_s: Optional[float] = None
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._ts) - self._start
+
+    def append(self, ts_s: float, item: dict) -> int:
+        """Add one response; returns the change in length (0 once the node is at ``maxlen``)."""
+        with self._lock:
+            before = len(self)
+            self._append(ts_s, item)
+            return len(self) - before
+
+    def _append(self, ts_s: float, item: dict) -> None:
+        if self._ts and ts_s < self._ts[-1]:
+            i = max(self._start, bisect_right(self._ts, ts_s, lo=self._start))
+            self._ts.insert(i, ts_s)
+            for name, (section, key) in HISTORY_FIELDS.items():
+                self._cols[name].insert(i, item[section].get(key))
+        else:
+            self._ts.append(ts_s)
+            for name, (section, key) in HISTORY_FIELDS.items():
+                self._cols[name].append(item[section].get(key))
+        self.latest = item
+        self.latest_ts_s = ts_s
+        if len(self) > self.maxlen:
+            self._start += 1
+            if self._start >= self.maxlen:
+                del self._ts[: self._start]
+                for col in self._cols.values():
+                    del col[: self._start]
+                self._start = 0
+
+    def _bounds(self, start_ts_s: float, end_ts_s: Optional[float] = None) -> Tuple[int, int]:
+        lo = bisect_left(self._ts, start_ts_s, lo=self._start)
+        hi = len(self._ts) if end_ts_s is None else bisect_right(self._ts, end_ts_s, lo=lo)
+        return lo, hi
+
+    def _since_ts_s(self, minutes: float) -> float:
+        return self._ts[-1] - minutes * 60.0
+
+    def _columns(self, start_ts_s: float, end_ts_s: Optional[float], fields: Optional[Sequence[str]]) -> Dict[str, list]:
+        lo, hi = self._bounds(start_ts_s, end_ts_s)
+        names = fields or HISTORY_FIELDS
+        return {name: self._cols[name][lo:hi] for name in names}
+
+    def columns(
+        self,
+        start_ts_s: float,
+        end_ts_s: Optional[float] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict[str, list]:
+        with self._lock:
+            return self._columns(start_ts_s, end_ts_s, fields)
+
+    @staticmethod
+    def _rows(cols: Dict[str, list]) -> List[Dict[str, object]]:
+        names = list(cols)
+        return [dict(zip(names, values)) for values in zip(*cols.values())]
+
+    def rows(
+        self,
+        start_ts_s: float,
+        end_ts_s: Optional[float] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, object]]:
+        return self._rows(self.columns(start_ts_s, end_ts_s, fields))
+
+    def columns_since(self, minutes: float, fields: Optional[Sequence[str]] = None) -> Dict[str, list]:
+        with self._lock:
+            if not len(self):
+                return {name: [] for name in (fields or HISTORY_FIELDS)}
+            return self._columns(self._since_ts_s(minutes), None, fields)
+
+    def rows_since(self, minutes: float, fields: Optional[Sequence[str]] = None) -> List[Dict[str, object]]:
+        return self._rows(self.columns_since(minutes, fields))
+
+
+class HistoryStore:
+    """Per-node history index: node_id -> NodeHistory with an O(1) latest pointer.
+
+    The store lock only guards the node map and row count; appends and reads
+    lock the individual node.
+    """
+
+    def __init__(self, maxlen_per_node: int = 2000) -> None:
+        self.maxlen_per_node = maxlen_per_node
+        self._nodes: Dict[str, NodeHistory] = {}
+        self._rows = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._nodes))
+
+    def append(self, air_node_id: str, ts_s: float, item: dict) -> None:
+        node = self._nodes.get(air_node_id)
+        if node is None:
+            with self._lock:
+                node = self._nodes.get(air_node_id)
+                if node is None:
+                    node = self._nodes[air_node_id] = NodeHistory(self.maxlen_per_node)
+        added = node.append(ts_s, item)
+        if added:
+            with self._lock:
+                self._rows += added
+
+    def node(self, air_node_id: str) -> Optional[NodeHistory]:
+        return self._nodes.get(air_node_id)
+
+    def latest(self, air_node_id: str) -> Optional[dict]:
+        node = self._nodes.get(air_node_id)
+        return node.latest if node else None
+
+    # Windows are relative to the node's newest sample, not the global one.
+    def columns_since(
+        self, air_node_id: str, minutes: float, fields: Optional[Sequence[str]] = None
+    ) -> Dict[str, list]:
+        node = self._nodes.get(air_node_id)
+        if node is None:
+            return {name: [] for name in (fields or HISTORY_FIELDS)}
+        return node.columns_since(minutes, fields)
+
+    def rows_since(
+        self, air_node_id: str, minutes: float, fields: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, object]]:
+        node = self._nodes.get(air_node_id)
+        return node.rows_since(minutes, fields) if node else []
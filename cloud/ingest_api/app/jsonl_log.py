@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import IO, Any, List, Optional, Union
+
+
+def tail_lines(path: Path, n: int, block_size: int = 64 * 1024) -> List[bytes]:
+    """Return the last ``n`` non-empty lines of ``path`` reading backwards in blocks."""
+    if n <= 0 or not path.exists():
+        return []
+    with path.open("rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b""
+        while pos > 0 and buf.count(b"\n") <= n:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    lines = [line for line in buf.split(b"\n") if line.strip()]
+    return lines[-n:]
+
+
+class JsonlLog:
+    """Append-only JSON Lines log that keeps roughly the last ``keep_last`` records.
+
+    Each record is one compact line appended to the file. Once the file holds
+    ``keep_last * compact_factor`` lines it is rewritten (temp file + rename)
+    down to the newest ``keep_last``, so the amortized cost per append is O(1).
+    """
+
+    def __init__(self, path: Union[str, Path], keep_last: int = 500, compact_factor: int = 2) -> None:
+        self.path = Path(path)
+        self.keep_last = keep_last
+        self.compact_factor = max(2, compact_factor)
+        self._lock = Lock()
+        self._fh: Optional[IO[str]] = None
+        self._lines: Optional[int] = None
+
+    def append(self, record: Any) -> None:
+        line = json.dumps(record, default=str, separators=(",", ":"))
+        with self._lock:
+            if self._fh is None:
+                self._open()
+            self._fh.write(line + "\n")
+            self._fh.flush()
+            self._lines += 1
+            if self._lines >= self.keep_last * self.compact_factor:
+                self._compact()
+
+    def tail(self, n: Optional[int] = None) -> List[Any]:
+        n = self.keep_last if n is None else n
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+            lines = tail_lines(self.path, n)
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        return records
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lines = 0
+        if self.path.exists():
+            with self.path.open("rb") as f:
+                for _ in f:
+                    lines += 1
+        self._lines = lines
+        self._fh = self.path.open("a", encoding="utf-8")
+
+    def _compact(self) -> None:
+        keep = tail_lines(self.path, self.keep_last)
+        self._fh.close()
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        with tmp.open("wb") as f:
+            for line in keep:
+                f.write(line + b"\n")
+        os.replace(tmp, self.path)
+        self._lines = len(keep)
+        self._fh = self.path.open("a", encoding="utf-8")
@@ -1,6 +1,21 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from .routes import router
+from .ml_model import get_registry
+from .routes import _sharded, router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load models before the first request instead of on it
+    if os.getenv("MODEL_MODE", "baseline") == "lgbm":
+        get_registry()
+    # Spawn ingest shards (INGEST_SHARDS) here rather than on the event loop mid-request
+    _sharded()
+    yield
+
 
-app = FastAPI(title="Smart Campus Ingest API")
+app = FastAPI(title="Smart Campus Ingest API", lifespan=lifespan)
 app.include_router(router)
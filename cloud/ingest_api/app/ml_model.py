@@ -1,17 +1,29 @@
 from __future__ import annotations
 
+import hashlib
 import os
-from typing import Dict, List, Optional
+import queue
+import time
+import weakref
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 from analytics.indices.physics import clamp
 
+from .tree_model import TreeEnsemble
+
 try:
     import lightgbm as lgb
 except Exception:
     lgb = None  # type: ignore
 
-
-_MODEL = None
+try:
+    import numpy as np
+except Exception:
+    np = None  # type: ignore
 
 
 def _episode_id_to_num(episode_id: Optional[str]) -> float:
@@ -20,20 +32,233 @@ def _episode_id_to_num(episode_id: Optional[str]) -> float:
     return float(abs(hash(episode_id)) % 1000)
 
 
-def load_model(model_path: str) -> Optional["lgb.Booster"]:
+def _resolve_engine(engine: Optional[str]) -> str:
+    engine = engine or os.getenv("MODEL_ENGINE", "auto")
+    if engine == "auto":
+        engine = "lightgbm" if lgb is not None else "native"
+    return engine
+
+
+def model_from_string(text: str, engine: Optional[str] = None):
+    engine = _resolve_engine(engine)
+    if engine == "native":
+        return TreeEnsemble.from_string(text)
     if lgb is None:
         return None
+    return lgb.Booster(model_str=text)
+
+
+def load_model(model_path: str, engine: Optional[str] = None):
+    """Load the model with ``engine``: lightgbm | native | auto (lightgbm if importable).
+
+    ``native`` evaluates the text model with ``TreeEnsemble`` and needs no
+    LightGBM runtime; predictions are identical.
+    """
     if not os.path.exists(model_path):
         return None
-    return lgb.Booster(model_file=model_path)
+    return model_from_string(Path(model_path).read_text(), engine)
+
+
+@dataclass
+class LoadedModel:
+    key: str
+    path: str
+    model: object
+    version: str  # short content hash of the artifact
+    sha256: str
+    mtime_ns: int
+
+
+def model_keys(building_id: Optional[str] = None, horizon_min: Optional[int] = None) -> List[str]:
+    """Registry keys to try, most specific first."""
+    keys = []
+    if building_id and horizon_min is not None:
+        keys.append(f"{building_id}/h{horizon_min}")
+    if building_id:
+        keys.append(str(building_id))
+    if horizon_min is not None:
+        keys.append(f"h{horizon_min}")
+    keys.append("default")
+    return keys
+
+
+class ModelRegistry:
+    """Models keyed by ``default``, ``h<horizon>``, ``<building>`` or ``<building>/h<horizon>``.
+
+    ``preload`` loads every configured file up front. A watcher thread polls
+    file mtimes every ``poll_s`` seconds; when one changes and the content
+    hash differs, the new model is loaded on the watcher thread and swapped
+    in with a single dict assignment. Requests never wait on a load and keep
+    using the model they already resolved. A file that fails to load (e.g.
+    half written) leaves the current model in place and is retried on the
+    next change.
+    """
+
+    def __init__(self, paths: Dict[str, str], engine: Optional[str] = None, poll_s: float = 5.0) -> None:
+        self.paths = dict(paths)
+        self.engine = engine
+        self.poll_s = poll_s
+        self.reloads = 0
+        self._models: Dict[str, LoadedModel] = {}
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    def _load(self, key: str, path: str) -> Optional[LoadedModel]:
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            # Hash and parse the same bytes so the version always matches the model.
+            data = Path(path).read_bytes()
+            model = model_from_string(data.decode(), self.engine)
+        except Exception:
+            return None
+        if model is None:
+            return None
+        sha = hashlib.sha256(data).hexdigest()
+        return LoadedModel(key, path, model, sha[:12], sha, mtime_ns)
+
+    def preload(self) -> None:
+        for key, path in self.paths.items():
+            loaded = self._load(key, path)
+            if loaded is not None:
+                self._models[key] = loaded
+
+    def check(self) -> int:
+        """Reload models whose file changed since the last check; returns the number swapped."""
+        swapped = 0
+        for key, path in self.paths.items():
+            current = self._models.get(key)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            if current is not None and mtime_ns == current.mtime_ns:
+                continue
+            loaded = self._load(key, path)
+            if loaded is None:
+                continue
+            if current is not None and loaded.sha256 == current.sha256:
+                current.mtime_ns = loaded.mtime_ns  # touched, same content
+                continue
+            self._models[key] = loaded
+            swapped += 1
+        self.reloads += swapped
+        return swapped
+
+    def resolve(self, building_id: Optional[str] = None, horizon_min: Optional[int] = None) -> Optional[LoadedModel]:
+        models = self._models
+        for key in model_keys(building_id, horizon_min):
+            loaded = models.get(key)
+            if loaded is not None:
+                return loaded
+        return None
+
+    def start(self) -> None:
+        if self.poll_s > 0 and self._thread is None:
+            self._thread = Thread(target=self._watch, name="model-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_s):
+            self.check()
+
+
+def _model_paths() -> Dict[str, str]:
+    # MODEL_PATH is the default model; MODEL_PATHS adds keyed ones: "h60=models/a.txt,ENG-1=models/b.txt"
+    paths = {"default": os.getenv("MODEL_PATH", "models/mold_lgbm.txt")}
+    for item in os.getenv("MODEL_PATHS", "").split(","):
+        key, sep, path = item.partition("=")
+        if sep and key.strip() and path.strip():
+            paths[key.strip()] = path.strip()
+    return paths
+
+
+_REGISTRY: Optional[ModelRegistry] = None
+_REGISTRY_LOCK = Lock()
+
+
+def get_registry() -> ModelRegistry:
+    global _REGISTRY
+    if _REGISTRY is None:
+        with _REGISTRY_LOCK:
+            if _REGISTRY is None:
+                registry = ModelRegistry(_model_paths(), poll_s=float(os.getenv("MODEL_RELOAD_S", "5")))
+                registry.preload()
+                registry.start()
+                _REGISTRY = registry
+    return _REGISTRY
+
+
+def get_model():
+    loaded = get_registry().resolve()
+    return loaded.model if loaded is not None else None
+
+
+FeatureGetter = Callable[[Dict[str, object], Dict[str, float], float], float]
 
 
-def get_model() -> Optional["lgb.Booster"]:
-    global _MODEL
-    if _MODEL is None:
-        model_path = os.getenv("MODEL_PATH", "models/mold_lgbm.txt")
-        _MODEL = load_model(model_path)
-    return _MODEL
+def _feature(key: str) -> FeatureGetter:
+    return lambda normalized, features, idx: float(features[key])
+
+
+# Map current schema to model feature names
+_FEATURE_GETTERS: Dict[str, FeatureGetter] = {
+    "air_temp_c": lambda n, f, idx: float(n["air_temp_c"]),
+    "air_rh_pct": lambda n, f, idx: float(n["air_rh_pct"]),
+    "air_co2_ppm": lambda n, f, idx: float(n.get("air_co2_ppm") or 600.0),
+    "air_pm25_ugm3": lambda n, f, idx: 8.0,
+    "air_tvoc": lambda n, f, idx: float(n.get("air_voc_index") or 150.0) * 1.0,
+    "air_surface_temp_c": lambda n, f, idx: float(n["air_surface_temp_c"]),
+    "air_material_moisture": lambda n, f, idx: 0.08 + (float(n["air_rh_pct"]) - 45.0) / 500.0,
+    "idx_mold_now": lambda n, f, idx: float(idx),
+    "outdoor_temp_c": lambda n, f, idx: float(n.get("outdoor_temp_c") or 10.0),
+    "outdoor_rh_pct": lambda n, f, idx: float(n.get("outdoor_rh_pct") or 60.0),
+    "outdoor_dew_point_c": lambda n, f, idx: float(n.get("outdoor_dew_point_c") or 5.0),
+    "tod_sin": lambda n, f, idx: float(n.get("tod_sin") or 0.0),
+    "tod_cos": lambda n, f, idx: float(n.get("tod_cos") or 1.0),
+    "dow_sin": lambda n, f, idx: float(n.get("dow_sin") or 0.0),
+    "dow_cos": lambda n, f, idx: float(n.get("dow_cos") or 1.0),
+    "episode_id": lambda n, f, idx: _episode_id_to_num(n.get("episode_id")),
+}
+for _key in (
+    "dew_point_c",
+    "dew_margin_c",
+    "rh_mean_w",
+    "rh_std_w",
+    "rh_slope_w",
+    "temp_slope_w",
+    "dew_point_slope_w",
+    "dew_margin_slope_w",
+    "rh_time_above_70_w",
+    "dew_margin_time_below_0_w",
+    "air_rh_pct_t_minus_1",
+    "air_rh_pct_t_minus_5",
+    "dew_margin_c_t_minus_5",
+    "idx_mold_now_t_minus_5",
+):
+    _FEATURE_GETTERS[_key] = _feature(_key)
+
+
+def _missing(normalized: Dict[str, object], features: Dict[str, float], idx: float) -> float:
+    return 0.0
+
+
+# Per-model getters in model.feature_name() order (fetched once per model, not per call).
+# Weak keys so models replaced by a reload are not kept alive here.
+_LAYOUTS: "weakref.WeakKeyDictionary[object, List[FeatureGetter]]" = weakref.WeakKeyDictionary()
+
+
+def feature_layout(model: "lgb.Booster") -> List[FeatureGetter]:
+    layout = _LAYOUTS.get(model)
+    if layout is None:
+        layout = [_FEATURE_GETTERS.get(name, _missing) for name in model.feature_name()]
+        _LAYOUTS[model] = layout
+    return layout
 
 
 def build_feature_vector(
@@ -42,52 +267,168 @@ def build_feature_vector(
     features: Dict[str, float],
     idx_mold_now: float,
 ) -> List[float]:
-    # Map current schema to model feature names
-    values = {
-        "air_temp_c": float(normalized["air_temp_c"]),
-        "air_rh_pct": float(normalized["air_rh_pct"]),
-        "air_co2_ppm": float(normalized.get("air_co2_ppm") or 600.0),
-        "air_pm25_ugm3": 8.0,
-        "air_tvoc": float(normalized.get("air_voc_index") or 150.0) * 1.0,
-        "air_surface_temp_c": float(normalized["air_surface_temp_c"]),
-        "air_material_moisture": 0.08 + (float(normalized["air_rh_pct"]) - 45.0) / 500.0,
-        "dew_point_c": float(features["dew_point_c"]),
-        "dew_margin_c": float(features["dew_margin_c"]),
-        "idx_mold_now": float(idx_mold_now),
-        "rh_mean_w": float(features["rh_mean_w"]),
-        "rh_std_w": float(features["rh_std_w"]),
-        "rh_slope_w": float(features["rh_slope_w"]),
-        "temp_slope_w": float(features["temp_slope_w"]),
-        "dew_point_slope_w": float(features["dew_point_slope_w"]),
-        "dew_margin_slope_w": float(features["dew_margin_slope_w"]),
-        "rh_time_above_70_w": float(features["rh_time_above_70_w"]),
-        "dew_margin_time_below_0_w": float(features["dew_margin_time_below_0_w"]),
-        "air_rh_pct_t_minus_1": float(features["air_rh_pct_t_minus_1"]),
-        "air_rh_pct_t_minus_5": float(features["air_rh_pct_t_minus_5"]),
-        "dew_margin_c_t_minus_5": float(features["dew_margin_c_t_minus_5"]),
-        "idx_mold_now_t_minus_5": float(features["idx_mold_now_t_minus_5"]),
-        "outdoor_temp_c": float(normalized.get("outdoor_temp_c") or 10.0),
-        "outdoor_rh_pct": float(normalized.get("outdoor_rh_pct") or 60.0),
-        "outdoor_dew_point_c": float(normalized.get("outdoor_dew_point_c") or 5.0),
-        "tod_sin": float(normalized.get("tod_sin") or 0.0),
-        "tod_cos": float(normalized.get("tod_cos") or 1.0),
-        "dow_sin": float(normalized.get("dow_sin") or 0.0),
-        "dow_cos": float(normalized.get("dow_cos") or 1.0),
-        "episode_id": _episode_id_to_num(normalized.get("episode_id")),
-    }
-
-    order = model.feature_name()
-    return [float(values.get(name, 0.0)) for name in order]
+    return [get(normalized, features, idx_mold_now) for get in feature_layout(model)]
+
+
+class MicroBatcher:
+    """Coalesces single-row predictions from concurrent requests into batched ``predict`` calls.
+
+    Callers enqueue a request and wait on a Future. A worker thread takes the
+    first queued request, keeps collecting until ``max_batch`` rows or
+    ``max_wait_s`` has passed (0 = take whatever is already queued), writes the
+    rows into a preallocated matrix in the model's feature order and runs one
+    ``model.predict`` for the batch.
+    """
+
+    def __init__(self, max_batch: int = 256, max_wait_s: float = 0.0) -> None:
+        self.max_batch = max(1, max_batch)
+        self.max_wait_s = max_wait_s
+        self.batches = 0
+        self.rows = 0
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._lock = Lock()
+        self._thread: Optional[Thread] = None
+        self._matrix = None
+
+    def submit(
+        self,
+        model: "lgb.Booster",
+        normalized: Dict[str, object],
+        features: Dict[str, float],
+        idx_mold_now: float,
+    ) -> Future:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = Thread(target=self._run, name="lgbm-batcher", daemon=True)
+                    self._thread.start()
+        fut: Future = Future()
+        self._queue.put((model, normalized, features, idx_mold_now, fut))
+        return fut
+
+    def predict(
+        self,
+        model: "lgb.Booster",
+        normalized: Dict[str, object],
+        features: Dict[str, float],
+        idx_mold_now: float,
+    ) -> float:
+        return self.submit(model, normalized, features, idx_mold_now).result()
+
+    def _collect(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_s
+        while len(batch) < self.max_batch:
+            try:
+                timeout = deadline - time.monotonic()
+                if timeout > 0:
+                    batch.append(self._queue.get(timeout=timeout))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            # A model swap can leave requests for two models in one batch; predict per model.
+            by_model: Dict[int, List[tuple]] = {}
+            for item in batch:
+                by_model.setdefault(id(item[0]), []).append(item)
+            for items in by_model.values():
+                self._predict(items)
+
+    def _predict(self, items: List[tuple]) -> None:
+        model = items[0][0]
+        try:
+            layout = feature_layout(model)
+            n = len(items)
+            if self._matrix is None or self._matrix.shape[1] != len(layout) or self._matrix.shape[0] < n:
+                self._matrix = np.empty((self.max_batch, len(layout)), dtype=np.float64)
+            mat = self._matrix
+            for i, (_, normalized, features, idx, _) in enumerate(items):
+                row = mat[i]
+                for j, get in enumerate(layout):
+                    row[j] = get(normalized, features, idx)
+            preds = model.predict(mat[:n])
+            self.batches += 1
+            self.rows += n
+            for (_, _, _, _, fut), pred in zip(items, preds):
+                fut.set_result(float(pred))
+        except Exception as exc:
+            if len(items) == 1:
+                items[0][4].set_exception(exc)
+                return
+            # One bad row must not fail the whole batch: retry the rows one at a time.
+            for item in items:
+                if not item[4].done():
+                    self._predict([item])
+
+
+_BATCHER: Optional[MicroBatcher] = None
+
+
+def get_batcher() -> Optional[MicroBatcher]:
+    global _BATCHER
+    if np is None or os.getenv("INFER_BATCHING", "1") != "1":
+        return None
+    if _BATCHER is None:
+        _BATCHER = MicroBatcher(
+            max_batch=int(os.getenv("INFER_BATCH_MAX", "256")),
+            max_wait_s=float(os.getenv("INFER_BATCH_WAIT_MS", "0")) / 1000.0,
+        )
+    return _BATCHER
+
+
+def _predict_row(model, normalized: Dict[str, object], features: Dict[str, float], idx_mold_now: float) -> float:
+    vec = build_feature_vector(model, normalized, features, idx_mold_now)
+    if isinstance(model, TreeEnsemble):
+        return model.predict_row(vec)
+    return float(model.predict([vec])[0])
+
+
+def predict_mold_horizons(
+    normalized: Dict[str, object],
+    features: Dict[str, float],
+    idx_mold_now: float,
+    horizons: Sequence[Optional[int]],
+) -> Dict[Optional[int], Tuple[float, str]]:
+    """(prediction, model version) per horizon; horizons without a model are left out.
+
+    Horizons that resolve to the same model share one evaluation. With the
+    micro-batcher, every distinct model's row is queued before waiting, so
+    they can land in the same batch.
+    """
+    registry = get_registry()
+    groups: Dict[int, Tuple[LoadedModel, List[Optional[int]]]] = {}
+    for h in horizons:
+        loaded = registry.resolve(normalized.get("building_id"), h)
+        if loaded is not None:
+            groups.setdefault(id(loaded), (loaded, []))[1].append(h)
+
+    batcher = get_batcher()
+    pending = []
+    for loaded, hs in groups.values():
+        if batcher is not None:
+            pending.append((loaded, hs, batcher.submit(loaded.model, normalized, features, idx_mold_now)))
+        else:
+            pending.append((loaded, hs, _predict_row(loaded.model, normalized, features, idx_mold_now)))
+
+    out: Dict[Optional[int], Tuple[float, str]] = {}
+    for loaded, hs, pred in pending:
+        if isinstance(pred, Future):
+            pred = pred.result()
+        for h in hs:
+            out[h] = (clamp(pred, 0.0, 1.0), loaded.version)
+    return out
 
 
 def predict_mold_index(
     normalized: Dict[str, object],
     features: Dict[str, float],
     idx_mold_now: float,
-) -> Optional[float]:
-    model = get_model()
-    if model is None:
-        return None
-    vec = build_feature_vector(model, normalized, features, idx_mold_now)
-    pred = float(model.predict([vec])[0])
-    return clamp(pred, 0.0, 1.0)
+    horizon_min: Optional[int] = None,
+) -> Optional[Tuple[float, str]]:
+    """Prediction and the version of the model artifact that produced it, or None without a model."""
+    return predict_mold_horizons(normalized, features, idx_mold_now, [horizon_min]).get(horizon_min)
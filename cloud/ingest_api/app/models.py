@@ -1,15 +1,18 @@
-from sqlalchemy import Column, DateTime, Float, Integer, String, Text
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, Text
 
 from .db import Base
 
 
 class RawTelemetry(Base):
     __tablename__ = "raw_telemetry"
+    __table_args__ = (Index("ix_raw_telemetry_node_ts", "air_node_id", "ts"),)
 
     id = Column(Integer, primary_key=True, index=True)
+    # App-generated id shared by the raw, feature and prediction rows of one sample.
+    sample_id = Column(String(32), unique=True, nullable=False)
     ts = Column(DateTime, index=True, nullable=False)
     building_id = Column(String, index=True, nullable=False)
-    air_node_id = Column(String, index=True, nullable=False)
+    air_node_id = Column(String, nullable=False)
     water_node_id = Column(String, index=True, nullable=False)
 
     air_temp_c = Column(Float, nullable=False)
@@ -17,13 +20,15 @@ class RawTelemetry(Base):
     water_temp_c = Column(Float, nullable=False)
     water_turbidity_ntu = Column(Float, nullable=False)
     water_free_chlorine_mgL = Column(Float, nullable=False)
-    water_ph = Column(Float, nullable=False)
-    water_conductivity_uScm = Column(Float, nullable=False)
-    water_pressure_kpa = Column(Float, nullable=False)
+    water_tds_ppm = Column(Float, nullable=True)
+    water_ph = Column(Float, nullable=True)
+    water_conductivity_uScm = Column(Float, nullable=True)
+    water_pressure_kpa = Column(Float, nullable=True)
 
     air_co2_ppm = Column(Float, nullable=True)
     air_pm25_ugm3 = Column(Float, nullable=True)
     air_tvoc = Column(Float, nullable=True)
+    air_voc_index = Column(Float, nullable=True)
     air_surface_temp_c = Column(Float, nullable=True)
     air_material_moisture = Column(Float, nullable=True)
 
@@ -33,10 +38,12 @@ class RawTelemetry(Base):
 
 class Feature(Base):
     __tablename__ = "features"
+    __table_args__ = (Index("ix_features_node_ts", "air_node_id", "ts"),)
 
     id = Column(Integer, primary_key=True, index=True)
+    sample_id = Column(String(32), ForeignKey("raw_telemetry.sample_id"), unique=True, nullable=False)
     ts = Column(DateTime, index=True, nullable=False)
-    air_node_id = Column(String, index=True, nullable=False)
+    air_node_id = Column(String, nullable=False)
     water_node_id = Column(String, index=True, nullable=False)
 
     qc_flags_json = Column(Text, nullable=False)
@@ -48,11 +55,13 @@ class Feature(Base):
 
 class Prediction(Base):
     __tablename__ = "predictions"
+    __table_args__ = (Index("ix_predictions_node_ts", "air_node_id", "ts"),)
 
     id = Column(Integer, primary_key=True, index=True)
+    sample_id = Column(String(32), ForeignKey("raw_telemetry.sample_id"), index=True, nullable=False)
     ts = Column(DateTime, index=True, nullable=False)
     ts_target = Column(DateTime, index=True, nullable=False)
-    air_node_id = Column(String, index=True, nullable=False)
+    air_node_id = Column(String, nullable=False)
 
     horizon_min = Column(Integer, nullable=False)
     pred_idx_mold_h = Column(Float, nullable=False)
@@ -60,10 +69,11 @@ class Prediction(Base):
 
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (Index("ix_alerts_node_ts", "air_node_id", "ts"),)
 
     id = Column(Integer, primary_key=True, index=True)
     ts = Column(DateTime, index=True, nullable=False)
-    air_node_id = Column(String, index=True, nullable=False)
+    air_node_id = Column(String, nullable=False)
     severity = Column(String, nullable=False)
     message = Column(String, nullable=False)
     reason_codes_json = Column(Text, nullable=False)
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import atexit
+import json
+import queue
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from threading import Event, Lock, Thread
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.engine import Engine
+
+from .models import Alert, Feature, Prediction, RawTelemetry
+from .settings import Settings, settings
+
+
+def _naive_utc(ts: datetime) -> datetime:
+    # SQLite DateTime columns are naive; store everything as UTC.
+    if ts.tzinfo is None:
+        return ts
+    return ts.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def result_to_rows(result: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Map one run_pipeline response onto rows for the SQLAlchemy tables."""
+    normalized = result["normalized"]
+    features = result["features"]
+    prediction = result["prediction"]
+    ts = _naive_utc(normalized["ts"])
+    sample_id = uuid.uuid4().hex
+
+    raw = {
+        "sample_id": sample_id,
+        "ts": ts,
+        "building_id": normalized["building_id"],
+        "air_node_id": normalized["air_node_id"],
+        "water_node_id": normalized["water_node_id"],
+        "air_temp_c": normalized["air_temp_c"],
+        "air_rh_pct": normalized["air_rh_pct"],
+        "water_temp_c": normalized["water_temp_c"],
+        "water_turbidity_ntu": normalized["water_turbidity_ntu"],
+        "water_free_chlorine_mgL": normalized["water_free_chlorine_mgL"],
+        "water_tds_ppm": normalized.get("water_tds_ppm"),
+        "air_co2_ppm": normalized.get("air_co2_ppm"),
+        "air_pm25_ugm3": normalized.get("air_pm25_ugm3"),
+        "air_tvoc": normalized.get("air_tvoc"),
+        "air_voc_index": normalized.get("air_voc_index"),
+        "air_surface_temp_c": normalized.get("air_surface_temp_c"),
+        "air_material_moisture": normalized.get("air_material_moisture"),
+        "scenario": str(getattr(normalized["scenario"], "value", normalized["scenario"])),
+        "data_source": str(getattr(normalized["data_source"], "value", normalized["data_source"])),
+    }
+    feature = {
+        "sample_id": sample_id,
+        "ts": ts,
+        "air_node_id": normalized["air_node_id"],
+        "water_node_id": normalized["water_node_id"],
+        "qc_flags_json": json.dumps(result.get("warnings") or []),
+        "sensor_health_score": result["health"]["score"],
+        "idx_mold_now": features["idx_mold_now"],
+        "idx_water_event_now": features["idx_water_event_now"],
+    }
+    # One predictions row per forecast horizon
+    preds = [
+        {
+            "sample_id": sample_id,
+            "ts": ts,
+            "ts_target": ts + timedelta(minutes=h["horizon_min"]),
+            "air_node_id": normalized["air_node_id"],
+            "horizon_min": h["horizon_min"],
+            "pred_idx_mold_h": h["yhat"],
+        }
+        for h in prediction.get("horizons") or [prediction]
+    ]
+    rows: Dict[str, List[Dict[str, Any]]] = {
+        "raw": [raw],
+        "features": [feature],
+        "predictions": preds,
+        "alerts": [],
+    }
+    alert = result.get("alert")
+    if alert:
+        rows["alerts"].append(
+            {
+                "ts": _naive_utc(alert["created_ts"]),
+                "air_node_id": normalized["air_node_id"],
+                "severity": "WARNING" if alert["status"] == "OPEN" else "INFO",
+                "message": alert["message"],
+                "reason_codes_json": json.dumps(
+                    {
+                        "status": alert["status"],
+                        "target": alert["target"],
+                        "threshold": alert["threshold"],
+                        "horizon_min": alert["horizon_min"],
+                        "persistence_n": alert["persistence_n"],
+                        "episode_id": alert.get("episode_id"),
+                    }
+                ),
+            }
+        )
+    return rows
+
+
+TABLES = {
+    "raw": RawTelemetry,
+    "features": Feature,
+    "predictions": Prediction,
+    "alerts": Alert,
+}
+
+
+def write_results(engine: Engine, results: List[Dict[str, Any]]) -> int:
+    """Bulk insert pipeline responses in one transaction; returns rows written."""
+    batched: Dict[str, List[Dict[str, Any]]] = {key: [] for key in TABLES}
+    for result in results:
+        for key, rows in result_to_rows(result).items():
+            batched[key].extend(rows)
+    written = 0
+    with engine.begin() as conn:
+        for key, model in TABLES.items():
+            if batched[key]:
+                # executemany on a Core insert: one prepared statement per table.
+                conn.execute(insert(model), batched[key])
+                written += len(batched[key])
+    return written
+
+
+def _delete_samples(conn, sample_ids) -> int:
+    """Delete the samples selected by ``sample_ids``: feature and prediction rows first, then raw."""
+    deleted = 0
+    for model in (Feature, Prediction, RawTelemetry):
+        res = conn.execute(delete(model).where(model.sample_id.in_(sample_ids)))
+        deleted += res.rowcount or 0
+    return deleted
+
+
+def prune(engine: Engine, cfg: Settings, now: Optional[datetime] = None) -> int:
+    """Delete at most ``prune_chunk_rows`` expired samples (and as many alerts).
+
+    Samples are pruned as a unit, keyed on ``raw_telemetry`` rows, so feature
+    and prediction rows never outlive the raw row they reference. Samples
+    older than ``retention_days`` go first, then the oldest samples beyond
+    ``retention_max_rows`` raw rows. Alerts expire by age only. Called
+    repeatedly, this catches up incrementally without holding a long write
+    lock.
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = _naive_utc(now) - timedelta(days=cfg.retention_days)
+    deleted = 0
+    with engine.begin() as conn:
+        budget = cfg.prune_chunk_rows
+        # The subquery selects the same rows for each delete: raw rows go last.
+        old = select(RawTelemetry.sample_id).where(RawTelemetry.ts < cutoff).order_by(RawTelemetry.id).limit(budget)
+        expired = conn.execute(select(func.count()).select_from(old.subquery())).scalar_one()
+        if expired:
+            deleted += _delete_samples(conn, old)
+        budget -= expired
+        if budget > 0 and cfg.retention_max_rows > 0:
+            count = conn.execute(select(func.count()).select_from(RawTelemetry)).scalar_one()
+            excess = min(budget, count - cfg.retention_max_rows)
+            if excess > 0:
+                oldest = select(RawTelemetry.sample_id).order_by(RawTelemetry.id).limit(excess)
+                deleted += _delete_samples(conn, oldest)
+
+        old_alerts = select(Alert.id).where(Alert.ts < cutoff).order_by(Alert.id).limit(cfg.prune_chunk_rows)
+        res = conn.execute(delete(Alert).where(Alert.id.in_(old_alerts)))
+        deleted += res.rowcount or 0
+    return deleted
+
+
+class PersistenceWriter:
+    """Background writer that batches pipeline responses into the database.
+
+    ``submit`` only enqueues; a daemon thread drains the queue in batches of
+    ``persist_batch_size`` (or every ``persist_flush_s``) and runs ``prune``
+    every ``prune_interval_s``. When the queue is full new results are
+    dropped and counted in ``dropped`` rather than blocking ingest.
+    """
+
+    def __init__(self, engine: Engine, cfg: Settings = settings) -> None:
+        self.engine = engine
+        self.cfg = cfg
+        self.dropped = 0
+        self.written = 0
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=cfg.persist_queue_max)
+        self._stop = Event()
+        self._lock = Lock()
+        self._thread: Optional[Thread] = None
+        self._last_prune = 0.0
+
+    def submit(self, result: Dict[str, Any]) -> None:
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait(result)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            from .db import init_db
+
+            init_db(self.engine)
+            # First prune one interval after start (monotonic time counts from boot, not 0)
+            self._last_prune = time.monotonic()
+            self._thread = Thread(target=self._run, name="persistence-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        self._stop.clear()
+        self.flush()
+
+    def flush(self) -> None:
+        while True:
+            batch = self._drain(block=False)
+            if not batch:
+                return
+            self._write(batch)
+
+    def _drain(self, block: bool) -> List[Dict[str, Any]]:
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.cfg.persist_flush_s
+        while len(batch) < self.cfg.persist_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if block and timeout > 0:
+                    batch.append(self._queue.get(timeout=timeout))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            self.written += write_results(self.engine, batch)
+        except Exception as exc:
+            print(f"[PERSIST] failed to write {len(batch)} results: {exc}")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._drain(block=True)
+            if batch:
+                self._write(batch)
+            if time.monotonic() - self._last_prune >= self.cfg.prune_interval_s:
+                self._last_prune = time.monotonic()
+                try:
+                    prune(self.engine, self.cfg)
+                except Exception as exc:
+                    print(f"[PERSIST] prune failed: {exc}")
+
+
+_writer: Optional[PersistenceWriter] = None
+
+
+def get_writer() -> Optional[PersistenceWriter]:
+    global _writer
+    if not settings.persist_enabled:
+        return None
+    if _writer is None:
+        from .db import engine
+
+        _writer = PersistenceWriter(engine)
+        atexit.register(_writer.stop)
+    return _writer
+
+
+def persist_result(result: Dict[str, Any]) -> None:
+    writer = get_writer()
+    if writer is not None:
+        writer.submit(result)
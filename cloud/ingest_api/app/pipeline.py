@@ -2,12 +2,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from analytics.indices.physics import clamp, dew_point_c
 
-from .ml_model import predict_mold_index
-from .state import GlobalState, NodeCache, get_lag_value
+from .ml_model import predict_mold_horizons
+from .state import DEW_MARGIN_LOW_C, RH_HIGH_PCT, GlobalState, NodeCache, get_lag_value
 
 
 RANGES = {
@@ -35,6 +35,15 @@ class AlertConfig:
 class ForecastConfig:
     horizon_min: int = 30
     model_mode: str = "baseline"
+    # Extra horizons forecast in the same pass; horizon_min stays the primary (alerts, top-level yhat)
+    horizons: Tuple[int, ...] = ()
+
+    def all_horizons(self) -> List[int]:
+        out = [self.horizon_min]
+        for h in self.horizons:
+            if h not in out:
+                out.append(h)
+        return out
 
 
 def _utc_now() -> datetime:
@@ -164,10 +173,9 @@ def compute_features(
     temp_slope = node.temp_window.slope_per_min()
     dew_point_slope = node.dew_point_window.slope_per_min()
     dew_margin_slope = node.dew_margin_window.slope_per_min()
-    rh_vals = node.rh_window.values()
-    dew_vals = node.dew_margin_window.values()
-    rh_time_above_70 = sum(1 for v in rh_vals if v >= 70.0) / max(1, len(rh_vals))
-    dew_time_below_0 = sum(1 for v in dew_vals if v <= 0.0) / max(1, len(dew_vals))
+    n_air = max(1, len(node.rh_window))
+    rh_time_above_70 = node.rh_window.count_at_least(RH_HIGH_PCT) / n_air
+    dew_time_below_0 = node.dew_margin_window.count_at_most(DEW_MARGIN_LOW_C) / n_air
 
     rh_lag_1 = get_lag_value(node, "air_rh_pct", 1)
     rh_lag_5 = get_lag_value(node, "air_rh_pct", 5)
@@ -221,35 +229,52 @@ def forecast_mold_index(
     normalized: Dict[str, object],
     features: Dict[str, float],
     alert_threshold: float,
-) -> Tuple[float, str]:
+) -> Dict[int, Tuple[float, str, str]]:
+    """(yhat, model_name, model_version) for every horizon in ``cfg``, primary first.
+
+    The window slope and lead boost are computed once and the model is
+    evaluated once per distinct model, whatever the number of horizons.
+    """
     lead_boost = clamp((features["rh_mean_w"] - 70.0) / 20.0, 0.0, 1.0) * clamp(
         (2.0 - features["dew_margin_c"]) / 3.0, 0.0, 1.0
     )
     lead_boost *= 0.3
 
     trend_up = features["rh_slope_w"] > 0.2 or features["dew_margin_slope_w"] < -0.05
+    slope = node.mold_idx_window.slope_per_min()
+    horizons = cfg.all_horizons()
 
+    ml: Dict[Optional[int], Tuple[float, str]] = {}
     if cfg.model_mode == "lgbm":
-        pred = predict_mold_index(normalized, features, idx_now)
-        if pred is not None:
+        ml = predict_mold_horizons(normalized, features, idx_now, horizons)
+
+    out: Dict[int, Tuple[float, str, str]] = {}
+    for h in horizons:
+        if h in ml:
+            pred, model_version = ml[h]
             # Blend with short-term trend to keep demo intuitive
-            slope = node.mold_idx_window.slope_per_min()
-            trend = idx_now + max(0.0, slope) * cfg.horizon_min
-            blended = clamp(0.7 * pred + 0.3 * trend, 0.0, 1.0)
-            boosted = blended
-            if trend_up and idx_now < (alert_threshold - 0.05):
-                boosted = max(boosted, idx_now + lead_boost + 0.12)
-            boosted = clamp(boosted, 0.0, 1.0)
-            return boosted, "lgbm_mold_v1"
-
-    # Use recent slope for extrapolation
-    slope = node.mold_idx_window.slope_per_min()
-    pred = idx_now + slope * cfg.horizon_min
-    boosted = pred
-    if trend_up and idx_now < (alert_threshold - 0.05):
-        boosted = max(boosted, idx_now + lead_boost + 0.12)
-    boosted = clamp(boosted, 0.0, 1.0)
-    return boosted, "trend_extrap_v1"
+            trend = idx_now + max(0.0, slope) * h
+            boosted = clamp(0.7 * pred + 0.3 * trend, 0.0, 1.0)
+            model_name = "lgbm_mold_v1"
+        else:
+            # Use recent slope for extrapolation
+            boosted = idx_now + slope * h
+            model_name, model_version = "trend_extrap_v1", "1.0"
+        if trend_up and idx_now < (alert_threshold - 0.05):
+            boosted = max(boosted, idx_now + lead_boost + 0.12)
+        out[h] = (clamp(boosted, 0.0, 1.0), model_name, model_version)
+    return out
+
+
+def _smooth_prediction(prev: Optional[float], pred: float, idx_mold_now: float, normalized: Dict[str, object]) -> float:
+    # Smooth prediction to avoid bouncing
+    if prev is None:
+        return pred
+    pred = clamp(0.8 * prev + 0.2 * pred, 0.0, 1.0)
+    # Demo-only: keep prediction from collapsing far below current during mold episode
+    if normalized.get("scenario") == "MOLD_EPISODE" and normalized.get("data_source") == "EMULATED":
+        pred = max(pred, idx_mold_now - 0.05)
+    return pred
 
 
 def update_alerts(
@@ -304,19 +329,50 @@ def run_pipeline(
     state: GlobalState,
     forecast_cfg: ForecastConfig,
     alert_cfg: AlertConfig,
+) -> Dict[str, object]:
+    # Samples of one node are serialized on its lock; other nodes run in parallel.
+    with state.get_node(payload["air_node_id"]).lock:
+        return _run_pipeline_locked(payload, state, forecast_cfg, alert_cfg)
+
+
+def try_run_pipeline(
+    payload: Dict[str, object],
+    state: GlobalState,
+    forecast_cfg: ForecastConfig,
+    alert_cfg: AlertConfig,
+) -> Optional[Dict[str, object]]:
+    """``run_pipeline`` without waiting: None if the node's lock is held elsewhere.
+
+    Lets the event loop run a sample inline when it can and hand it to a
+    worker thread only when another thread is busy with the same node.
+    """
+    lock = state.get_node(payload["air_node_id"]).lock
+    if not lock.acquire(blocking=False):
+        return None
+    try:
+        return _run_pipeline_locked(payload, state, forecast_cfg, alert_cfg)
+    finally:
+        lock.release()
+
+
+def _run_pipeline_locked(
+    payload: Dict[str, object],
+    state: GlobalState,
+    forecast_cfg: ForecastConfig,
+    alert_cfg: AlertConfig,
 ) -> Dict[str, object]:
     normalized, warnings = normalize_payload(payload, state)
     node = state.get_node(normalized["air_node_id"])
 
     features = compute_features(normalized, state)
-    prev_idx = node.mold_idx_window.values()[-1] if node.mold_idx_window.values() else None
+    prev_idx = node.mold_idx_window.last()
     idx_mold_now = compute_mold_index(features, prev_idx)
     idx_water_now = compute_water_index(normalized)
 
     # Update rolling for mold index after computing
     state.add_mold_rolling(node, normalized["ts"], idx_mold_now)
 
-    pred, model_name = forecast_mold_index(
+    forecasts = forecast_mold_index(
         node,
         idx_mold_now,
         forecast_cfg,
@@ -324,16 +380,17 @@ def run_pipeline(
         features,
         alert_cfg.threshold,
     )
-
-    # Smooth prediction to avoid bouncing
-    if node.last_pred is None:
-        node.last_pred = pred
-    else:
-        pred = clamp(0.8 * node.last_pred + 0.2 * pred, 0.0, 1.0)
-        # Demo-only: keep prediction from collapsing far below current during mold episode
-        if normalized.get("scenario") == "MOLD_EPISODE" and normalized.get("data_source") == "EMULATED":
-            pred = max(pred, idx_mold_now - 0.05)
-        node.last_pred = pred
+    horizon_preds = []
+    for h, (yhat, name, version) in forecasts.items():
+        if h == forecast_cfg.horizon_min:
+            yhat = _smooth_prediction(node.last_pred, yhat, idx_mold_now, normalized)
+            node.last_pred = yhat
+        else:
+            yhat = _smooth_prediction(node.last_preds.get(h), yhat, idx_mold_now, normalized)
+            node.last_preds[h] = yhat
+        horizon_preds.append({"horizon_min": h, "yhat": yhat, "model_name": name, "model_version": version})
+    primary = horizon_preds[0]
+    pred = primary["yhat"]
     alert_event = update_alerts(
         node,
         pred,
@@ -377,8 +434,9 @@ def run_pipeline(
             "target": "idx_mold",
             "horizon_min": forecast_cfg.horizon_min,
             "yhat": pred,
-            "model_name": model_name,
-            "model_version": "1.0",
+            "model_name": primary["model_name"],
+            "model_version": primary["model_version"],
+            "horizons": horizon_preds,
         },
         "health": {
             "score": health_score,
@@ -401,3 +459,29 @@ def run_pipeline(
     }
     state.add_history(response)
     return response
+
+
+def run_pipeline_batch(
+    payloads: List[Dict[str, object]],
+    state: GlobalState,
+    forecast_cfg: ForecastConfig,
+    alert_cfg: AlertConfig,
+) -> List[Dict[str, object]]:
+    """Run a batch of payloads, returning responses in input order.
+
+    Samples are grouped by air_node_id and each node's samples are fed through
+    the pipeline in timestamp order, so replayed gateway buffers update the
+    rolling windows, lags and alert counters as if they had arrived live.
+    """
+    by_node: Dict[str, List[Tuple[datetime, int]]] = {}
+    for i, payload in enumerate(payloads):
+        by_node.setdefault(str(payload["air_node_id"]), []).append((_normalize_ts(payload["ts"]), i))
+
+    results: List[Optional[Dict[str, object]]] = [None] * len(payloads)
+    for air_node_id, samples in by_node.items():
+        samples.sort(key=lambda item: item[0])
+        # Hold the node for its whole run so live samples cannot interleave with the replay.
+        with state.get_node(air_node_id).lock:
+            for _, i in samples:
+                results[i] = _run_pipeline_locked(payloads[i], state, forecast_cfg, alert_cfg)
+    return results  # type: ignore[return-value]
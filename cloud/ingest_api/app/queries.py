@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection
+
+from .models import Feature, Prediction, RawTelemetry
+
+# The pipeline's primary forecast horizon (routes.forecast_cfg.horizon_min)
+PRIMARY_HORIZON_MIN = int(os.getenv("FORECAST_HORIZON_MIN", "30"))
+
+
+def node_window_stmt(
+    air_node_id: str,
+    start_ts: datetime,
+    end_ts: Optional[datetime] = None,
+    horizon_min: Optional[int] = None,
+    all_horizons: bool = False,
+):
+    """Rows for one node in ``[start_ts, end_ts]``, oldest first.
+
+    The ``air_node_id = ? AND ts >= ?`` predicate is a range scan on the
+    ``(air_node_id, ts)`` index of raw_telemetry; features and predictions are
+    joined on ``sample_id`` rather than on ts. Each sample carries the
+    prediction for ``horizon_min`` (default: the primary horizon). With
+    ``all_horizons`` a sample gets one row per stored horizon, with a
+    ``horizon_min`` column.
+    """
+    pred_on = Prediction.sample_id == RawTelemetry.sample_id
+    columns = [
+        RawTelemetry.ts,
+        RawTelemetry.air_rh_pct,
+        RawTelemetry.air_temp_c,
+        Feature.idx_mold_now,
+        Prediction.pred_idx_mold_h,
+    ]
+    if all_horizons:
+        columns.append(Prediction.horizon_min)
+    else:
+        horizon = PRIMARY_HORIZON_MIN if horizon_min is None else horizon_min
+        pred_on = pred_on & (Prediction.horizon_min == horizon)
+    stmt = (
+        select(*columns)
+        .outerjoin(Feature, Feature.sample_id == RawTelemetry.sample_id)
+        .outerjoin(Prediction, pred_on)
+        .where(RawTelemetry.air_node_id == air_node_id, RawTelemetry.ts >= start_ts)
+        .order_by(RawTelemetry.ts)
+    )
+    if all_horizons:
+        stmt = stmt.order_by(Prediction.horizon_min)
+    if end_ts is not None:
+        stmt = stmt.where(RawTelemetry.ts <= end_ts)
+    return stmt
+
+
+def latest_ts_for_node(conn: Connection, air_node_id: str) -> Optional[datetime]:
+    # max(ts) with an equality on the index prefix is a single index seek.
+    stmt = select(func.max(RawTelemetry.ts)).where(RawTelemetry.air_node_id == air_node_id)
+    return conn.execute(stmt).scalar_one_or_none()
+
+
+def node_last_minutes(
+    conn: Connection,
+    air_node_id: str,
+    minutes: float,
+    horizon_min: Optional[int] = None,
+    all_horizons: bool = False,
+) -> List[Dict[str, Any]]:
+    """Last ``minutes`` of samples for one node, relative to that node's newest row."""
+    end_ts = latest_ts_for_node(conn, air_node_id)
+    if end_ts is None:
+        return []
+    stmt = node_window_stmt(air_node_id, end_ts - timedelta(minutes=minutes), end_ts, horizon_min, all_horizons)
+    return [dict(row._mapping) for row in conn.execute(stmt)]
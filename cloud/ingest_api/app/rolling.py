@@ -1,51 +1,322 @@
 from __future__ import annotations
 
+from array import array
 from collections import deque
-from dataclasses import dataclass, field
-from typing import Deque, List, Tuple
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+# Rebuild the running sums from the stored points after this many evictions so
+# floating point drift from add/remove pairs never accumulates.
+REANCHOR_EVERY = 1024
 
 
 @dataclass
-class RollingWindow:
-    window_s: int
-    _points: Deque[Tuple[float, float]] = field(default_factory=deque)
+class RunningStats:
+    # Sums are kept relative to an anchor (x0, y0) so the squared terms stay
+    # small and the variance/covariance subtractions do not cancel badly.
+    n: int = 0
+    x0: float = 0.0
+    y0: float = 0.0
+    sx: float = 0.0
+    sy: float = 0.0
+    sxx: float = 0.0
+    sxy: float = 0.0
+    syy: float = 0.0
 
-    def add(self, ts_s: float, value: float) -> None:
-        self._points.append((ts_s, value))
+    def reset(self, x0: float = 0.0, y0: float = 0.0) -> None:
+        self.n = 0
+        self.x0 = x0
+        self.y0 = y0
+        self.sx = self.sy = self.sxx = self.sxy = self.syy = 0.0
+
+    def add(self, x: float, y: float) -> None:
+        if self.n == 0:
+            self.reset(x, y)
+        dx = x - self.x0
+        dy = y - self.y0
+        self.n += 1
+        self.sx += dx
+        self.sy += dy
+        self.sxx += dx * dx
+        self.sxy += dx * dy
+        self.syy += dy * dy
+
+    def remove(self, x: float, y: float) -> None:
+        if self.n <= 1:
+            self.reset()
+            return
+        dx = x - self.x0
+        dy = y - self.y0
+        self.n -= 1
+        self.sx -= dx
+        self.sy -= dy
+        self.sxx -= dx * dx
+        self.sxy -= dx * dy
+        self.syy -= dy * dy
+
+    def mean_y(self) -> float:
+        if self.n == 0:
+            return 0.0
+        return self.y0 + self.sy / self.n
+
+    def var_y(self) -> float:
+        if self.n < 2:
+            return 0.0
+        var = (self.syy - self.sy * self.sy / self.n) / (self.n - 1)
+        return max(0.0, var)
+
+    def slope(self) -> float:
+        if self.n < 2:
+            return 0.0
+        denom = self.sxx - self.sx * self.sx / self.n
+        if denom <= 1e-9:
+            return 0.0
+        numer = self.sxy - self.sx * self.sy / self.n
+        return numer / denom
+
+
+class RingBuffer:
+    """Rows of floats stored column-wise in growable ``array('d')`` rings.
+
+    With ``maxlen`` set, appending to a full buffer overwrites the oldest row.
+    ``dropped`` counts rows removed from the front, so ``dropped + i`` is a
+    stable absolute position for logical index ``i``.
+    """
+
+    def __init__(self, columns: int, capacity: int = 64, maxlen: Optional[int] = None) -> None:
+        if maxlen is not None:
+            capacity = min(capacity, maxlen)
+        self.maxlen = maxlen
+        self._cols = [array("d", bytes(8 * capacity)) for _ in range(columns)]
+        self._cap = capacity
+        self._head = 0
+        self._size = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Tuple[float, ...]]:
+        for i in range(self._size):
+            yield self[i]
+
+    def __getitem__(self, i: int) -> Tuple[float, ...]:
+        pos = self._pos(i)
+        return tuple(col[pos] for col in self._cols)
+
+    def _pos(self, i: int) -> int:
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("ring buffer index out of range")
+        return (self._head + i) % self._cap
+
+    def get(self, i: int, col: int) -> float:
+        return self._cols[col][self._pos(i)]
+
+    def append(self, row: Sequence[float]) -> None:
+        if self._size == self._cap:
+            if self.maxlen is not None and self._size >= self.maxlen:
+                self._head = (self._head + 1) % self._cap
+                self._size -= 1
+                self.dropped += 1
+            else:
+                self._grow()
+        pos = (self._head + self._size) % self._cap
+        for col, value in zip(self._cols, row):
+            col[pos] = value
+        self._size += 1
+
+    def popleft(self) -> Tuple[float, ...]:
+        row = self[0]
+        self._head = (self._head + 1) % self._cap
+        self._size -= 1
+        self.dropped += 1
+        return row
+
+    def pop(self) -> Tuple[float, ...]:
+        row = self[-1]
+        self._size -= 1
+        return row
+
+    def column(self, col: int) -> List[float]:
+        data = self._cols[col]
+        end = self._head + self._size
+        if end <= self._cap:
+            return data[self._head : end].tolist()
+        return data[self._head :].tolist() + data[: end - self._cap].tolist()
+
+    def _grow(self) -> None:
+        new_cap = self._cap * 2
+        if self.maxlen is not None:
+            new_cap = min(new_cap, self.maxlen)
+        pad = array("d", bytes(8 * (new_cap - self._size)))
+        self._cols = [array("d", self.column(i)) + pad for i in range(len(self._cols))]
+        self._cap = new_cap
+        self._head = 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(col.itemsize * len(col) for col in self._cols)
+
+
+def _matches(value: float, threshold: float, at_least: bool) -> bool:
+    return value >= threshold if at_least else value <= threshold
+
+
+PointStore = Union[Deque[Tuple[float, ...]], RingBuffer]
+
+
+def make_store(columns: int, compact: bool, maxlen: Optional[int] = None) -> PointStore:
+    if compact:
+        return RingBuffer(columns, maxlen=maxlen)
+    return deque(maxlen=maxlen)
+
+
+def store_column(store: PointStore, col: int) -> List[float]:
+    if isinstance(store, RingBuffer):
+        return store.column(col)
+    return [row[col] for row in store]
+
+
+class RollingFrame:
+    """Time window over several value columns sharing one timestamp column.
+
+    Rows are ``(ts_s, v0, v1, ...)``; each value column keeps its own running
+    sums so mean/std/slope stay O(1) per call. Thresholds registered with
+    ``track_threshold`` keep a running count of matching rows the same way.
+    """
+
+    def __init__(self, window_s: int, columns: int = 1, compact: bool = False) -> None:
+        self.window_s = window_s
+        self.columns = columns
+        self._points = make_store(columns + 1, compact)
+        self._stats = [RunningStats() for _ in range(columns)]
+        self._evictions = 0
+        # (col, threshold, at_least) -> rows in the window on that side of threshold
+        self._counts: Dict[Tuple[int, float, bool], int] = {}
+
+    def track_threshold(self, threshold: float, col: int = 0, at_least: bool = True) -> None:
+        """Keep a running count of rows with value >= threshold (or <= if not at_least)."""
+        key = (col, threshold, at_least)
+        if key not in self._counts:
+            self._counts[key] = sum(1 for v in self.values(col) if _matches(v, threshold, at_least))
+
+    def add_row(self, ts_s: float, values: Sequence[float]) -> None:
+        self._points.append((ts_s, *values))
+        # x is tracked in minutes so slope_per_min needs no rescaling.
+        x = ts_s / 60.0
+        for stats, value in zip(self._stats, values):
+            stats.add(x, value)
+        for key in self._counts:
+            col, threshold, at_least = key
+            if _matches(values[col], threshold, at_least):
+                self._counts[key] += 1
         self._trim(ts_s)
 
     def _trim(self, now_s: float) -> None:
         cutoff = now_s - self.window_s
         while self._points and self._points[0][0] < cutoff:
-            self._points.popleft()
+            row = self._points.popleft()
+            x = row[0] / 60.0
+            for stats, value in zip(self._stats, row[1:]):
+                stats.remove(x, value)
+            for key in self._counts:
+                col, threshold, at_least = key
+                if _matches(row[col + 1], threshold, at_least):
+                    self._counts[key] -= 1
+            self._evictions += 1
+        if self._evictions >= REANCHOR_EVERY:
+            self._reanchor()
+
+    def _reanchor(self) -> None:
+        self._evictions = 0
+        for stats in self._stats:
+            stats.reset()
+        for row in self._points:
+            x = row[0] / 60.0
+            for stats, value in zip(self._stats, row[1:]):
+                stats.add(x, value)
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def column(self, col: int) -> "FrameColumn":
+        return FrameColumn(self, col)
+
+    def timestamps(self) -> List[float]:
+        return store_column(self._points, 0)
+
+    def values(self, col: int = 0) -> List[float]:
+        return store_column(self._points, col + 1)
+
+    def last(self, col: int = 0) -> Optional[float]:
+        if not self._points:
+            return None
+        return self._points[-1][col + 1]
+
+    def mean(self, col: int = 0) -> float:
+        return self._stats[col].mean_y()
+
+    def std(self, col: int = 0) -> float:
+        return self._stats[col].var_y() ** 0.5
+
+    def slope_per_min(self, col: int = 0) -> float:
+        # Least-squares slope vs time (minutes) from the running sums.
+        return self._stats[col].slope()
+
+    def count_at_least(self, threshold: float, col: int = 0) -> int:
+        return self._counts[(col, threshold, True)]
+
+    def count_at_most(self, threshold: float, col: int = 0) -> int:
+        return self._counts[(col, threshold, False)]
+
+    @property
+    def nbytes(self) -> int:
+        if isinstance(self._points, RingBuffer):
+            return self._points.nbytes
+        return 0
+
+
+class FrameColumn:
+    """Single-column view of a RollingFrame with the RollingWindow read API."""
+
+    def __init__(self, frame: RollingFrame, col: int) -> None:
+        self.frame = frame
+        self.col = col
+
+    def __len__(self) -> int:
+        return len(self.frame)
 
     def values(self) -> List[float]:
-        return [v for _, v in self._points]
+        return self.frame.values(self.col)
+
+    def last(self) -> Optional[float]:
+        return self.frame.last(self.col)
 
     def mean(self) -> float:
-        vals = self.values()
-        if not vals:
-            return 0.0
-        return sum(vals) / len(vals)
+        return self.frame.mean(self.col)
 
     def std(self) -> float:
-        vals = self.values()
-        if len(vals) < 2:
-            return 0.0
-        mu = sum(vals) / len(vals)
-        var = sum((v - mu) ** 2 for v in vals) / (len(vals) - 1)
-        return var**0.5
+        return self.frame.std(self.col)
 
     def slope_per_min(self) -> float:
-        # Simple linear regression slope vs time (minutes).
-        if len(self._points) < 2:
-            return 0.0
-        xs = [(t - self._points[0][0]) / 60.0 for t, _ in self._points]
-        ys = [v for _, v in self._points]
-        x_mean = sum(xs) / len(xs)
-        y_mean = sum(ys) / len(ys)
-        denom = sum((x - x_mean) ** 2 for x in xs)
-        if denom <= 1e-9:
-            return 0.0
-        numer = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
-        return numer / denom
+        return self.frame.slope_per_min(self.col)
+
+    def track_threshold(self, threshold: float, at_least: bool = True) -> None:
+        self.frame.track_threshold(threshold, self.col, at_least)
+
+    def count_at_least(self, threshold: float) -> int:
+        return self.frame.count_at_least(threshold, self.col)
+
+    def count_at_most(self, threshold: float) -> int:
+        return self.frame.count_at_most(threshold, self.col)
+
+
+class RollingWindow(RollingFrame):
+    def __init__(self, window_s: int, compact: bool = False) -> None:
+        super().__init__(window_s, columns=1, compact=compact)
+
+    def add(self, ts_s: float, value: float) -> None:
+        self.add_row(ts_s, (value,))
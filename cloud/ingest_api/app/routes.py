@@ -1,39 +1,122 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any
 
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
 
 from . import schemas
 import os
-from datetime import datetime, timezone
 import json
 from pathlib import Path
 from threading import Lock, Thread, Event
 import time
 import csv
 
-from .pipeline import AlertConfig, ForecastConfig, run_pipeline
+from .background_io import background_io
+from .pipeline import AlertConfig, ForecastConfig, run_pipeline, run_pipeline_batch, try_run_pipeline
+from .history import HistoryStore, unknown_fields
+from .jsonl_log import JsonlLog
+from .persistence import persist_result
+from .sharding import get_sharded
+from .snapshots import snapshot_writer
 from .state import GlobalState
 from analytics.synthetic.scenario_generator import build_payload
 import requests
 from analytics.synthetic.demo_clock import DemoClock, utc_now_floor
 
 router = APIRouter()
-state = GlobalState()
-demo_state = GlobalState()
+# Array-backed per-node windows; set COMPACT_STATE=0 for the deque layout.
+COMPACT_STATE = os.getenv("COMPACT_STATE", "1") == "1"
+HISTORY_PER_NODE = int(os.getenv("HISTORY_PER_NODE", "2000"))
+state = GlobalState(compact=COMPACT_STATE, history=HistoryStore(HISTORY_PER_NODE))
+demo_state = GlobalState(compact=COMPACT_STATE, history=HistoryStore(HISTORY_PER_NODE))
 # Keep merged output separate from raw live nodes
 state.latest_live_path = os.getenv("LATEST_LIVE_PATH", "data/latest_merged.json")
 
+
+def _horizons(name: str) -> tuple:
+    # Extra forecast horizons in minutes, e.g. FORECAST_HORIZONS=15,60
+    return tuple(int(h) for h in os.getenv(name, "").split(",") if h.strip())
+
+
 forecast_cfg = ForecastConfig(
     horizon_min=int(os.getenv("FORECAST_HORIZON_MIN", "30")),
     model_mode=os.getenv("MODEL_MODE", "baseline"),
+    horizons=_horizons("FORECAST_HORIZONS"),
 )
 demo_forecast_cfg = ForecastConfig(
     horizon_min=int(os.getenv("DEMO_FORECAST_HORIZON_MIN", "30")),
     model_mode=os.getenv("MODEL_MODE", "baseline"),
+    horizons=_horizons("DEMO_FORECAST_HORIZONS"),
 )
 alert_cfg = AlertConfig(threshold=0.8, hysteresis=0.05, persistence_n=3, interval_s=10)
 
+# INGEST_SHARDS=N runs the live pipeline in N worker processes with node state
+# partitioned by air_node_id; 0 keeps it in this process. Demo state stays local.
+INGEST_SHARDS = int(os.getenv("INGEST_SHARDS", "0"))
+# Async handlers run a sample on the event loop (~0.1 ms) when its node is idle;
+# INGEST_INLINE=0 always hands it to the threadpool, as does MODEL_MODE=lgbm.
+INGEST_INLINE = os.getenv("INGEST_INLINE", "1") == "1"
+
+
+def _sharded():
+    return get_sharded(INGEST_SHARDS, forecast_cfg, alert_cfg, COMPACT_STATE, HISTORY_PER_NODE)
+
+
+def _record_latest(result: Dict[str, Any]) -> None:
+    # Shards own node state; the dispatcher keeps the global latest response.
+    state.latest_response = result
+    if state.latest_live_path:
+        snapshot_writer.submit(state.latest_live_path, result)
+
+
+def _run_live_batch(payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    sharded = _sharded()
+    if sharded is None:
+        return run_pipeline_batch(payloads, state, forecast_cfg, alert_cfg)
+    results = sharded.run_batch(payloads)
+    if results:
+        _record_latest(results[-1])
+    return results
+
+
+# Per node, the last sample handed to the threadpool (event loop only). Later
+# samples of that node wait for it, since the node lock does not queue fairly.
+_threadpool_tails: Dict[tuple, "asyncio.Future[None]"] = {}
+
+
+def _inline_ok(fc: ForecastConfig) -> bool:
+    # lgbm predictions wait on the micro-batcher's Future: never on the event loop.
+    return INGEST_INLINE and fc.model_mode != "lgbm"
+
+
+async def _run_async(payload: Dict[str, Any], st: GlobalState, fc: ForecastConfig) -> Dict[str, Any]:
+    sharded = _sharded() if st is state else None
+    if sharded is not None:
+        result = await asyncio.wrap_future(sharded.submit(payload))
+        _record_latest(result)
+        return result
+    key = (id(st), payload["air_node_id"])
+    prev = _threadpool_tails.get(key)
+    if prev is None and _inline_ok(fc):
+        result = try_run_pipeline(payload, st, fc, alert_cfg)
+        if result is not None:
+            return result
+    # Node busy in a worker thread (batch ingest) or queued there: wait off the
+    # loop, behind the node's earlier samples.
+    done = asyncio.get_running_loop().create_future()
+    _threadpool_tails[key] = done
+    try:
+        if prev is not None:
+            await asyncio.shield(prev)
+        return await run_in_threadpool(run_pipeline, payload, st, fc, alert_cfg)
+    finally:
+        done.set_result(None)
+        if _threadpool_tails.get(key) is done:
+            del _threadpool_tails[key]
+
+
 # Raw ingest defaults for ESP32 bridge
 DEFAULT_BUILDING_ID = os.getenv("BUILDING_ID", "RUTGERS-ENG-1")
 DEFAULT_SITE_ID = os.getenv("SITE_ID", "RUTGERS")
@@ -89,7 +172,7 @@ def _merge_if_ready() -> dict | None:
 
 
 @router.post("/telemetry/air")
-def ingest_air_raw(payload: dict):
+async def ingest_air_raw(payload: dict):
     _ensure_summary_thread()
     ts = _now_utc()
     if "ts" in payload:
@@ -102,12 +185,33 @@ def ingest_air_raw(payload: dict):
     _update_live_nodes("air", payload, "/telemetry/air")
     merged = _merge_if_ready()
     if merged:
-        return run_pipeline(merged, state, forecast_cfg, alert_cfg)
+        result = await _run_async(merged, state, forecast_cfg)
+        persist_result(result)
+        return result
     return {"status": "ok", "detail": "air cached"}
 
 
+def _append_water_log(row: list) -> None:
+    WATER_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    write_header = not WATER_LOG_PATH.exists()
+    with WATER_LOG_PATH.open("a", newline="") as f:
+        writer = csv.writer(f)
+        if write_header:
+            writer.writerow(
+                [
+                    "ts",
+                    "surface_temp_c",
+                    "turbidity_raw",
+                    "tds_raw",
+                    "turbidity_v",
+                    "tds_v",
+                ]
+            )
+        writer.writerow(row)
+
+
 @router.post("/telemetry/water")
-def ingest_water_raw(payload: dict):
+async def ingest_water_raw(payload: dict):
     _ensure_summary_thread()
     ts = _now_utc()
     if "ts" in payload:
@@ -119,53 +223,43 @@ def ingest_water_raw(payload: dict):
     state.latest_water_raw = payload
     _update_live_nodes("water", payload, "/telemetry/water")
     # Append to CSV log for training
-    try:
-        WATER_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
-        write_header = not WATER_LOG_PATH.exists()
-        with WATER_LOG_PATH.open("a", newline="") as f:
-            writer = csv.writer(f)
-            if write_header:
-                writer.writerow(
-                    [
-                        "ts",
-                        "surface_temp_c",
-                        "turbidity_raw",
-                        "tds_raw",
-                        "turbidity_v",
-                        "tds_v",
-                    ]
-                )
-            writer.writerow(
-                [
-                    ts.isoformat(),
-                    payload.get("surface_temp_c"),
-                    payload.get("turbidity_raw"),
-                    payload.get("tds_raw"),
-                    payload.get("turbidity_v"),
-                    payload.get("tds_v"),
-                ]
-            )
-    except Exception:
-        pass
+    background_io.submit(
+        _append_water_log,
+        [
+            ts.isoformat(),
+            payload.get("surface_temp_c"),
+            payload.get("turbidity_raw"),
+            payload.get("tds_raw"),
+            payload.get("turbidity_v"),
+            payload.get("tds_v"),
+        ],
+    )
     merged = _merge_if_ready()
     if merged:
-        return run_pipeline(merged, state, forecast_cfg, alert_cfg)
+        result = await _run_async(merged, state, forecast_cfg)
+        persist_result(result)
+        return result
     return {"status": "ok", "detail": "water cached"}
 
 
 # Backward-compatible paths from ESP firmware
 @router.post("/telemetry/air/raw")
-def ingest_air_raw_compat(payload: dict):
-    return ingest_air_raw(payload)
+async def ingest_air_raw_compat(payload: dict):
+    return await ingest_air_raw(payload)
 
 
 @router.post("/telemetry/water/raw")
-def ingest_water_raw_compat(payload: dict):
-    return ingest_water_raw(payload)
+async def ingest_water_raw_compat(payload: dict):
+    return await ingest_water_raw(payload)
 latest_json_path = Path(os.getenv("LATEST_JSON_PATH", "data/latest_telemetry.json"))
 live_nodes_json_path = Path(os.getenv("LIVE_NODES_JSON_PATH", "data/latest_live_nodes.json"))
 demo_latest_json_path = Path(os.getenv("DEMO_LATEST_JSON_PATH", "data/demo_latest.json"))
-demo_history_json_path = Path(os.getenv("DEMO_HISTORY_JSON_PATH", "data/demo_history.json"))
+demo_history_log = JsonlLog(
+    os.getenv("DEMO_HISTORY_LOG_PATH", "data/demo_history.jsonl"),
+    keep_last=int(os.getenv("DEMO_HISTORY_KEEP", "500")),
+)
+# Longest /demo/history/log waits for queued appends before reading the file
+DEMO_LOG_FLUSH_S = float(os.getenv("DEMO_LOG_FLUSH_S", "0.2"))
 _live_nodes_lock = Lock()
 _live_nodes_state: Dict[str, Any] = {
     "saved_ts": None,
@@ -181,6 +275,8 @@ _demo_stop = Event()
 _demo_running = False
 
 DEMO_API_URL = os.getenv("DEMO_API_URL", "http://127.0.0.1:8001")
+# "direct" feeds the demo pipeline in-process; "http" POSTs to /demo/telemetry.
+DEMO_TRANSPORT = os.getenv("DEMO_TRANSPORT", "direct")
 
 
 def _live_summary_loop(interval_s: int = 5) -> None:
@@ -202,49 +298,91 @@ def _ensure_summary_thread() -> None:
     t.start()
 
 
-def _run_demo_sequence(sequence: list[tuple[str, int]], rate_sec: float, seed: int, speed: float) -> None:
+def _demo_sink(transport: str):
+    """Where demo samples go: straight into the demo pipeline, or POSTed to the API."""
+    if transport == "http":
+        # One keep-alive session for the whole run (end-to-end testing of the HTTP path)
+        session = requests.Session()
+
+        def post(payload: Dict[str, Any]) -> None:
+            session.post(f"{DEMO_API_URL}/demo/telemetry", json=payload, timeout=3)
+
+        return post
+
+    def run(payload: Dict[str, Any]) -> None:
+        result = run_pipeline(payload, demo_state, demo_forecast_cfg, alert_cfg)
+        snapshot_writer.submit(demo_latest_json_path, result)
+        # Already off the event loop; append here so nothing queues up behind a fast replay.
+        demo_history_log.append(result)
+
+    return run
+
+
+def _run_demo_sequence(
+    sequence: list[tuple[str, int]],
+    rate_sec: float,
+    seed: int,
+    speed: float,
+    transport: str = "direct",
+    fast: bool = False,
+) -> None:
+    """Generate the demo scenario sequence for SIM-001.
+
+    Each step advances the demo clock by ``speed`` seconds. Normally steps are
+    paced ``rate_sec`` apart in wall time; ``fast`` replays them back to back,
+    with the clock started early enough that the last sample lands at now.
+    """
     global _demo_running
     _demo_running = True
-    start_ts = utc_now_floor()
-    clock = DemoClock(start_ts, speed=speed)
-    step = 0
-    for scenario, duration_s in sequence:
-        episode_id = f"{scenario.lower()}_{int(time.time())}"
-        steps = max(1, int(duration_s / rate_sec))
-        for _ in range(steps):
-            if _demo_stop.is_set():
-                _demo_running = False
-                return
-            ts = clock.tick()
-            payload = build_payload(
-                ts,
-                scenario,
-                step,
-                seed,
-                episode_id,
-                "SIM-001",
-                "WATER-001",
-                "RUTGERS-ENG-1",
-                "RUTGERS",
-                "ENG-1-BASEMENT",
-            )
-            try:
-                requests.post(f"{DEMO_API_URL}/demo/telemetry", json=payload, timeout=3)
-            except Exception:
-                pass
-            time.sleep(rate_sec)
-            step += 1
-    _demo_running = False
+    try:
+        sink = _demo_sink(transport)
+        total_steps = sum(max(1, int(duration_s / rate_sec)) for _, duration_s in sequence)
+        start_ts = utc_now_floor()
+        if fast:
+            start_ts -= timedelta(seconds=total_steps * speed)
+        clock = DemoClock(start_ts, speed=speed)
+        step = 0
+        for scenario, duration_s in sequence:
+            episode_id = f"{scenario.lower()}_{int(time.time())}"
+            steps = max(1, int(duration_s / rate_sec))
+            for _ in range(steps):
+                if _demo_stop.is_set():
+                    return
+                ts = clock.tick()
+                payload = build_payload(
+                    ts,
+                    scenario,
+                    step,
+                    seed,
+                    episode_id,
+                    "SIM-001",
+                    "WATER-001",
+                    "RUTGERS-ENG-1",
+                    "RUTGERS",
+                    "ENG-1-BASEMENT",
+                )
+                try:
+                    sink(payload)
+                except Exception as exc:
+                    # One bad sample must not end the demo
+                    print(f"[DEMO] sample {step} failed: {exc}")
+                if not fast:
+                    time.sleep(rate_sec)
+                step += 1
+    finally:
+        _demo_running = False
 
 
 @router.post("/demo/start")
 def demo_start(
     sequence: str = "NORMAL:30,MOLD_EPISODE:90",
-    rate_sec: float = 1.0,
+    rate_sec: float = Query(default=1.0, gt=0),
     seed: int = 42,
     speed: float = 60.0,
+    transport: str = Query(default=DEMO_TRANSPORT, regex="^(direct|http)$"),
+    fast: bool = False,
 ):
-    global _demo_thread
+    global _demo_thread, _demo_running
     if _demo_running:
         return {"status": "already_running"}
     _demo_stop.clear()
@@ -252,9 +390,14 @@ def demo_start(
     for chunk in sequence.split(","):
         name, dur = chunk.split(":")
         parts.append((name.upper(), int(dur)))
-    _demo_thread = Thread(target=_run_demo_sequence, args=(parts, rate_sec, seed, speed), daemon=True)
+    _demo_running = True  # before the thread starts, so /demo/status never reads a stale False
+    _demo_thread = Thread(
+        target=_run_demo_sequence,
+        args=(parts, rate_sec, seed, speed, transport, fast),
+        daemon=True,
+    )
     _demo_thread.start()
-    return {"status": "started", "sequence": sequence}
+    return {"status": "started", "sequence": sequence, "transport": transport, "fast": fast}
 
 
 @router.post("/demo/stop")
@@ -269,23 +412,11 @@ def demo_status():
 
 
 @router.post("/demo/telemetry", response_model=schemas.IngestResponse)
-def ingest_demo_telemetry(payload: schemas.TelemetryIn):
-    result = run_pipeline(payload.dict(), demo_state, demo_forecast_cfg, alert_cfg)
+async def ingest_demo_telemetry(payload: schemas.TelemetryIn):
+    result = await _run_async(payload.dict(), demo_state, demo_forecast_cfg)
     # Persist latest + rolling demo history for tuning
-    try:
-        demo_latest_json_path.parent.mkdir(parents=True, exist_ok=True)
-        demo_latest_json_path.write_text(json.dumps(result, indent=2, default=str))
-        history_blob = []
-        if demo_history_json_path.exists():
-            try:
-                history_blob = json.loads(demo_history_json_path.read_text())
-            except Exception:
-                history_blob = []
-        history_blob.append(result)
-        history_blob = history_blob[-500:]
-        demo_history_json_path.write_text(json.dumps(history_blob, indent=2, default=str))
-    except Exception:
-        pass
+    snapshot_writer.submit(demo_latest_json_path, result)
+    background_io.submit(demo_history_log.append, result)
     return result
 
 
@@ -296,39 +427,52 @@ def demo_latest():
     return demo_state.latest_response
 
 
+@router.get("/demo/history/log")
+def demo_history_log_tail(limit: int = Query(default=100, ge=1, le=5000)):
+    # Include appends still queued, but never wait out a whole ingest backlog
+    background_io.flush(timeout=DEMO_LOG_FLUSH_S)
+    return {"records": demo_history_log.tail(limit)}
+
+
+DEMO_HISTORY_FIELDS = ["ts", "air_rh_pct", "idx_mold_now", "pred_idx_mold_h"]
+
+
+def _parse_fields(fields: str, default: List[str] | None = None) -> List[str] | None:
+    if not fields:
+        return default
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = unknown_fields(names)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown history fields: {', '.join(unknown)}")
+    return names
+
+
+def _history_response(store: HistoryStore, air_node_id: str, minutes: int, fmt: str, fields: List[str] | None):
+    # Columnar format skips per-row dict construction and repeated keys.
+    if fmt == "columnar":
+        return {"columns": store.columns_since(air_node_id, minutes, fields)}
+    return {"rows": store.rows_since(air_node_id, minutes, fields)}
+
+
 @router.get("/demo/history")
 def demo_history(
     air_node_id: str = Query(default="SIM-001"),
     minutes: int = Query(default=30, ge=1, le=43200),
+    format: str = Query(default="rows", regex="^(rows|columnar)$"),
+    fields: str = Query(default=""),
 ):
-    if not demo_state.history:
-        return {"rows": []}
-    latest_ts = demo_state.history[-1]["normalized"]["ts"]
-    cutoff = latest_ts - timedelta(minutes=minutes)
-    rows: List[Dict[str, object]] = []
-    for item in list(demo_state.history):
-        ts = item["normalized"]["ts"]
-        if ts >= cutoff and item["normalized"]["air_node_id"] == air_node_id:
-            rows.append(
-                {
-                    "ts": ts,
-                    "air_rh_pct": item["normalized"]["air_rh_pct"],
-                    "idx_mold_now": item["features"]["idx_mold_now"],
-                    "pred_idx_mold_h": item["prediction"]["yhat"],
-                }
-            )
-    return {"rows": rows}
+    names = _parse_fields(fields, DEMO_HISTORY_FIELDS)
+    return _history_response(demo_state.history, air_node_id, minutes, format, names)
 
 
 def _write_latest_json(endpoint: str, payload: Dict[str, Any], response: Dict[str, Any] | None = None) -> None:
-    latest_json_path.parent.mkdir(parents=True, exist_ok=True)
     blob = {
         "saved_ts": datetime.now(timezone.utc).isoformat(),
         "endpoint": endpoint,
         "payload": payload,
         "response": response,
     }
-    latest_json_path.write_text(json.dumps(blob, indent=2, default=str))
+    snapshot_writer.submit(latest_json_path, blob)
 
 
 def _update_live_nodes(section: str, payload: Dict[str, Any], endpoint: str) -> Dict[str, Any]:
@@ -340,30 +484,34 @@ def _update_live_nodes(section: str, payload: Dict[str, Any], endpoint: str) ->
             "ts": now,
             "payload": payload,
         }
-        live_nodes_json_path.parent.mkdir(parents=True, exist_ok=True)
-        live_nodes_json_path.write_text(json.dumps(_live_nodes_state, indent=2, default=str))
-        return _live_nodes_state
+        # Section entries are replaced, never mutated, so a two-level copy is a stable snapshot.
+        snapshot = {**_live_nodes_state, "live_sensor_data": dict(_live_nodes_state["live_sensor_data"])}
+    snapshot_writer.submit(live_nodes_json_path, snapshot)
+    return _live_nodes_state
 
 
 @router.get("/health")
 def health():
+    sharded = _sharded()
+    stats = sharded.stats() if sharded else {"nodes_seen": len(state.nodes), "history_rows": len(state.history)}
     return {
         "status": "ok",
         "server_ts": datetime.now(timezone.utc),
-        "nodes_seen": len(state.nodes),
-        "history_rows": len(state.history),
+        **stats,
     }
 
 
 @router.get("/telemetry/live")
 def telemetry_live():
+    # Copy under the lock; serialization happens after it is released.
     with _live_nodes_lock:
-        return _live_nodes_state
+        return {**_live_nodes_state, "live_sensor_data": dict(_live_nodes_state["live_sensor_data"])}
 
 
 @router.post("/telemetry", response_model=schemas.IngestResponse)
-def ingest_telemetry(payload: schemas.TelemetryIn):
-    result = run_pipeline(payload.dict(), state, forecast_cfg, alert_cfg)
+async def ingest_telemetry(payload: schemas.TelemetryIn):
+    result = await _run_async(payload.dict(), state, forecast_cfg)
+    persist_result(result)
     _write_latest_json("/telemetry", payload.dict(), result)
     # Do not overwrite live sensor stream with EMULATED demo data
     if payload.data_source != schemas.DataSourceEnum.EMULATED and payload.air_node_id != "SIM-001":
@@ -390,12 +538,80 @@ def ingest_telemetry(payload: schemas.TelemetryIn):
     return result
 
 
+def _parse_batch_body(body: bytes, content_type: str) -> List[Any]:
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return [json.loads(line) for line in body.splitlines() if line.strip()]
+    items = json.loads(body or b"[]")
+    if isinstance(items, dict):
+        items = items.get("samples", [])
+    if not isinstance(items, list):
+        raise ValueError("batch body must be a JSON array or NDJSON")
+    return items
+
+
+def _ingest_batch(items: List[Any], results_mode: str) -> Dict[str, Any]:
+    payloads: List[Dict[str, Any]] = []
+    indices: List[int] = []
+    rejected: List[Dict[str, Any]] = []
+    for i, item in enumerate(items):
+        try:
+            payloads.append(schemas.TelemetryIn.parse_obj(item).dict())
+            indices.append(i)
+        except Exception as exc:
+            rejected.append({"index": i, "error": str(exc)})
+
+    results = _run_live_batch(payloads)
+    for result in results:
+        persist_result(result)
+    if payloads:
+        _write_latest_json("/telemetry/batch", payloads[-1], results[-1])
+
+    summary: Dict[str, Any] = {
+        "accepted": len(payloads),
+        "rejected": rejected,
+        "nodes": len({p["air_node_id"] for p in payloads}),
+        "alerts_opened": sum(1 for r in results if r["alert"] and r["alert"]["status"] == "OPEN"),
+        "alerts_resolved": sum(1 for r in results if r["alert"] and r["alert"]["status"] == "RESOLVED"),
+        "first_ts": min((r["normalized"]["ts"] for r in results), default=None),
+        "last_ts": max((r["normalized"]["ts"] for r in results), default=None),
+    }
+    if results_mode == "compact":
+        summary["results"] = [
+            {
+                "index": i,
+                "air_node_id": r["normalized"]["air_node_id"],
+                "ts": r["normalized"]["ts"],
+                "idx_mold_now": r["features"]["idx_mold_now"],
+                "yhat": r["prediction"]["yhat"],
+                "alert_open": r["alert_state"]["open"],
+                "alert_status": r["alert"]["status"] if r["alert"] else None,
+            }
+            for i, r in zip(indices, results)
+        ]
+    return summary
+
+
+@router.post("/telemetry/batch", response_model=schemas.BatchIngestResponse, response_model_exclude_none=True)
+async def ingest_telemetry_batch(
+    request: Request,
+    results: str = Query(default="compact", regex="^(compact|summary)$"),
+):
+    # Accepts a JSON array (or {"samples": [...]}) or an NDJSON stream of TelemetryIn.
+    body = await request.body()
+    try:
+        items = _parse_batch_body(body, request.headers.get("content-type", ""))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid batch body: {exc}") from exc
+    return await run_in_threadpool(_ingest_batch, items, results)
+
+
 @router.get("/latest")
 def latest(air_node_id: str = ""):
     if not state.latest_response:
         return {"status": "empty"}
     if air_node_id:
-        node_latest = state.get_latest_for_node(air_node_id)
+        sharded = _sharded()
+        node_latest = sharded.latest(air_node_id) if sharded else state.get_latest_for_node(air_node_id)
         return node_latest or {"status": "empty"}
     return state.latest_response
 
@@ -404,53 +620,12 @@ def latest(air_node_id: str = ""):
 def history(
     air_node_id: str = Query(default="air_01"),
     minutes: int = Query(default=30, ge=1, le=43200),
+    format: str = Query(default="rows", regex="^(rows|columnar)$"),
+    fields: str = Query(default=""),
 ):
-    if not state.history:
-        return {"rows": []}
-    latest_ts = state.history[-1]["normalized"]["ts"]
-    cutoff = latest_ts - timedelta(minutes=minutes)
-    rows: List[Dict[str, object]] = []
-    for item in list(state.history):
-        ts = item["normalized"]["ts"]
-        if ts >= cutoff and item["normalized"]["air_node_id"] == air_node_id:
-            rows.append(
-                {
-                    "ts": ts,
-                    "scenario": item["normalized"].get("scenario"),
-                    "episode_id": item["normalized"].get("episode_id"),
-                    "air_temp_c": item["normalized"].get("air_temp_c"),
-                    "air_rh_pct": item["normalized"]["air_rh_pct"],
-                    "air_surface_temp_c": item["normalized"].get("air_surface_temp_c"),
-                    "air_co2_ppm": item["normalized"].get("air_co2_ppm"),
-                    "air_voc_index": item["normalized"].get("air_voc_index"),
-                    "air_pm25_ugm3": item["normalized"].get("air_pm25_ugm3"),
-                    "air_tvoc": item["normalized"].get("air_tvoc"),
-                    "air_material_moisture": item["normalized"].get("air_material_moisture"),
-                    "outdoor_temp_c": item["normalized"].get("outdoor_temp_c"),
-                    "outdoor_rh_pct": item["normalized"].get("outdoor_rh_pct"),
-                    "outdoor_dew_point_c": item["normalized"].get("outdoor_dew_point_c"),
-                    "tod_sin": item["normalized"].get("tod_sin"),
-                    "tod_cos": item["normalized"].get("tod_cos"),
-                    "dow_sin": item["normalized"].get("dow_sin"),
-                    "dow_cos": item["normalized"].get("dow_cos"),
-                    "water_temp_c": item["normalized"].get("water_temp_c"),
-                    "water_turbidity_ntu": item["normalized"].get("water_turbidity_ntu"),
-                    "water_tds_ppm": item["normalized"].get("water_tds_ppm"),
-                    "water_free_chlorine_mgL": item["normalized"].get("water_free_chlorine_mgL"),
-                    "dew_point_c": item["features"].get("dew_point_c"),
-                    "dew_margin_c": item["features"].get("dew_margin_c"),
-                    "rh_mean_w": item["features"].get("rh_mean_w"),
-                    "rh_std_w": item["features"].get("rh_std_w"),
-                    "rh_slope_w": item["features"].get("rh_slope_w"),
-                    "temp_slope_w": item["features"].get("temp_slope_w"),
-                    "dew_point_slope_w": item["features"].get("dew_point_slope_w"),
-                    "dew_margin_slope_w": item["features"].get("dew_margin_slope_w"),
-                    "rh_time_above_70_w": item["features"].get("rh_time_above_70_w"),
-                    "dew_margin_time_below_0_w": item["features"].get("dew_margin_time_below_0_w"),
-                    "idx_mold_now": item["features"]["idx_mold_now"],
-                    "idx_water_event_now": item["features"].get("idx_water_event_now"),
-                    "pred_idx_mold_h": item["prediction"]["yhat"],
-                    "prediction_model": item["prediction"].get("model_name"),
-                }
-            )
-    return {"rows": rows}
+    names = _parse_fields(fields)
+    sharded = _sharded()
+    if sharded is not None:
+        data = sharded.history(air_node_id, minutes, format, names)
+        return {"columns": data} if format == "columnar" else {"rows": data}
+    return _history_response(state.history, air_node_id, minutes, format, names)
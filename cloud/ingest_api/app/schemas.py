@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -163,12 +163,20 @@ class FeaturesOut(BaseModel):
     idx_water_event_now: float
 
 
+class HorizonPredictionOut(BaseModel):
+    horizon_min: int
+    yhat: float
+    model_name: str
+    model_version: str
+
+
 class PredictionOut(BaseModel):
     target: str
     horizon_min: int
     yhat: float
     model_name: str
     model_version: str
+    horizons: List[HorizonPredictionOut] = []
 
 
 class AlertOut(BaseModel):
@@ -210,3 +218,29 @@ class IngestResponse(BaseModel):
     event_times: EventTimesOut
     alert: Optional[AlertOut]
     warnings: Dict[str, str]
+
+
+class BatchSampleOut(BaseModel):
+    index: int
+    air_node_id: str
+    ts: datetime
+    idx_mold_now: float
+    yhat: float
+    alert_open: bool
+    alert_status: Optional[str] = None
+
+
+class BatchRejectOut(BaseModel):
+    index: int
+    error: str
+
+
+class BatchIngestResponse(BaseModel):
+    accepted: int
+    rejected: List[BatchRejectOut]
+    nodes: int
+    alerts_opened: int
+    alerts_resolved: int
+    first_ts: Optional[datetime] = None
+    last_ts: Optional[datetime] = None
+    results: Optional[List[BatchSampleOut]] = None
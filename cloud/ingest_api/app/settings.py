@@ -11,6 +11,13 @@ class Settings:
         # Retention controls to prevent SQLite growth in demos
         self.retention_days = int(os.getenv("RETENTION_DAYS", "7"))
         self.retention_max_rows = int(os.getenv("RETENTION_MAX_ROWS", "50000"))
+        # Background persistence of pipeline outputs
+        self.persist_enabled = os.getenv("PERSIST_ENABLED", "1") == "1"
+        self.persist_batch_size = int(os.getenv("PERSIST_BATCH_SIZE", "500"))
+        self.persist_flush_s = float(os.getenv("PERSIST_FLUSH_S", "1.0"))
+        self.persist_queue_max = int(os.getenv("PERSIST_QUEUE_MAX", "50000"))
+        self.prune_interval_s = float(os.getenv("PRUNE_INTERVAL_S", "60"))
+        self.prune_chunk_rows = int(os.getenv("PRUNE_CHUNK_ROWS", "5000"))
         self.qc_ranges = {
             "air_temp_c": (0.0, 50.0),
             "air_rh_pct": (0.0, 100.0),
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import atexit
+import itertools
+import multiprocessing as mp
+import queue
+import time
+import zlib
+from concurrent.futures import Future
+from threading import Event, Lock, Thread
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from .history import HistoryStore
+from .pipeline import AlertConfig, ForecastConfig, run_pipeline, run_pipeline_batch
+from .state import GlobalState
+
+# How often the collector checks for exited worker processes.
+REAP_INTERVAL_S = 1.0
+
+
+def shard_for(air_node_id: str, shards: int) -> int:
+    # crc32 rather than hash(): str hashes are salted per process.
+    return zlib.crc32(str(air_node_id).encode()) % shards
+
+
+def _op_run(state: GlobalState, fc: ForecastConfig, ac: AlertConfig, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return run_pipeline(payload, state, fc, ac)
+
+
+def _op_batch(state: GlobalState, fc: ForecastConfig, ac: AlertConfig, payloads: List[Dict[str, Any]]) -> List[dict]:
+    return run_pipeline_batch(payloads, state, fc, ac)
+
+
+def _op_latest(state: GlobalState, fc: ForecastConfig, ac: AlertConfig, air_node_id: str) -> Optional[dict]:
+    return state.get_latest_for_node(air_node_id)
+
+
+def _op_history(
+    state: GlobalState,
+    fc: ForecastConfig,
+    ac: AlertConfig,
+    air_node_id: str,
+    minutes: float,
+    fmt: str,
+    fields: Optional[List[str]],
+) -> Any:
+    if fmt == "columnar":
+        return state.history.columns_since(air_node_id, minutes, fields)
+    return state.history.rows_since(air_node_id, minutes, fields)
+
+
+def _op_stats(state: GlobalState, fc: ForecastConfig, ac: AlertConfig) -> Dict[str, int]:
+    return {"nodes_seen": len(state.nodes), "history_rows": len(state.history)}
+
+
+_OPS = {
+    "run": _op_run,
+    "batch": _op_batch,
+    "latest": _op_latest,
+    "history": _op_history,
+    "stats": _op_stats,
+}
+
+
+def _worker_main(
+    requests: "mp.Queue",
+    responses: "mp.Queue",
+    forecast_cfg: ForecastConfig,
+    alert_cfg: AlertConfig,
+    compact: bool,
+    history_per_node: int,
+) -> None:
+    # One shard: owns the state of its nodes and applies requests strictly in queue order.
+    state = GlobalState(compact=compact, history=HistoryStore(history_per_node))
+    while True:
+        msg = requests.get()
+        if msg is None:
+            break
+        req_id, op, args = msg
+        try:
+            responses.put((req_id, True, _OPS[op](state, forecast_cfg, alert_cfg, *args)))
+        except Exception as exc:
+            # Exceptions may not pickle; send the text.
+            responses.put((req_id, False, f"{type(exc).__name__}: {exc}"))
+
+
+class ShardedPipeline:
+    """``run_pipeline`` across N worker processes, node state partitioned by ``crc32(air_node_id)``.
+
+    The API process is the dispatcher: each request goes to its node's shard
+    over that shard's request queue, so all samples of a node are handled by
+    one process in submission order. Results come back on the shard's
+    response queue and are matched to callers by request id. Batches are
+    split per shard, run concurrently and reassembled in input order. If a
+    worker process dies, its pending and future calls fail instead of hanging.
+    """
+
+    def __init__(
+        self,
+        shards: int,
+        forecast_cfg: ForecastConfig,
+        alert_cfg: AlertConfig,
+        compact: bool = True,
+        history_per_node: int = 2000,
+    ) -> None:
+        self.shards = max(1, shards)
+        ctx = mp.get_context("spawn")  # no fork with the API's threads running
+        self._requests = [ctx.Queue() for _ in range(self.shards)]
+        # One response queue per shard: a shared one has a cross-process write
+        # lock, and a worker killed while holding it would stall every shard.
+        self._responses = [ctx.Queue() for _ in range(self.shards)]
+        self._procs = [
+            ctx.Process(
+                target=_worker_main,
+                args=(self._requests[i], self._responses[i], forecast_cfg, alert_cfg, compact, history_per_node),
+                name=f"ingest-shard-{i}",
+                daemon=True,
+            )
+            for i in range(self.shards)
+        ]
+        self._pending: Dict[int, Tuple[int, Future]] = {}
+        self._dead: Set[int] = set()
+        self._ids = itertools.count()
+        self._lock = Lock()
+        self._collectors: List[Thread] = []
+        self._stopping = Event()
+
+    def start(self) -> "ShardedPipeline":
+        for proc in self._procs:
+            proc.start()
+        self._collectors = [
+            Thread(target=self._collect, args=(q,), name=f"shard-collector-{i}", daemon=True)
+            for i, q in enumerate(self._responses)
+        ]
+        for thread in self._collectors:
+            thread.start()
+        return self
+
+    def stop(self) -> None:
+        if not self._collectors:
+            return
+        for q in self._requests:
+            q.put(None)
+        for proc in self._procs:
+            proc.join(timeout=5)
+        # A flag rather than a sentinel: a killed worker can leave its response queue's write lock held.
+        self._stopping.set()
+        for thread in self._collectors:
+            thread.join(timeout=REAP_INTERVAL_S + 5)
+        self._collectors = []
+
+    def shard_for(self, air_node_id: str) -> int:
+        return shard_for(air_node_id, self.shards)
+
+    def _call(self, shard: int, op: str, *args: Any) -> Future:
+        fut: Future = Future()
+        req_id = next(self._ids)
+        with self._lock:
+            if shard in self._dead:
+                fut.set_exception(RuntimeError(f"ingest shard {shard} is not running"))
+                return fut
+            self._pending[req_id] = (shard, fut)
+        self._requests[shard].put((req_id, op, args))
+        return fut
+
+    def _collect(self, responses: "mp.Queue") -> None:
+        last_reap = time.monotonic()
+        while not self._stopping.is_set():
+            # On a clock rather than only when no reply comes for a while: a busy
+            # queue must not delay failing the calls of a shard that died.
+            if time.monotonic() - last_reap >= REAP_INTERVAL_S:
+                self._reap()
+                last_reap = time.monotonic()
+            try:
+                msg = responses.get(timeout=REAP_INTERVAL_S)
+            except queue.Empty:
+                continue
+            req_id, ok, value = msg
+            with self._lock:
+                _, fut = self._pending.pop(req_id, (None, None))
+            if fut is None:
+                continue
+            if ok:
+                fut.set_result(value)
+            else:
+                fut.set_exception(RuntimeError(value))
+
+    def _reap(self) -> None:
+        # Fail calls waiting on a shard whose process has exited.
+        failed = []
+        with self._lock:
+            for shard, proc in enumerate(self._procs):
+                if shard not in self._dead and not proc.is_alive():
+                    self._dead.add(shard)
+                    # Nobody reads these requests any more; don't block interpreter exit flushing them.
+                    self._requests[shard].cancel_join_thread()
+            for req_id, (shard, fut) in list(self._pending.items()):
+                if shard in self._dead:
+                    failed.append(fut)
+                    del self._pending[req_id]
+        for fut in failed:
+            fut.set_exception(RuntimeError("ingest shard exited"))
+
+    def submit(self, payload: Dict[str, Any]) -> Future:
+        """Non-blocking ``run``; async callers await it with ``asyncio.wrap_future``."""
+        return self._call(self.shard_for(payload["air_node_id"]), "run", payload)
+
+    def run(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return self.submit(payload).result()
+
+    def run_batch(self, payloads: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        by_shard: Dict[int, List[int]] = {}
+        for i, payload in enumerate(payloads):
+            by_shard.setdefault(self.shard_for(payload["air_node_id"]), []).append(i)
+        futures = [
+            (indices, self._call(shard, "batch", [payloads[i] for i in indices]))
+            for shard, indices in by_shard.items()
+        ]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(payloads)
+        for indices, fut in futures:
+            for i, result in zip(indices, fut.result()):
+                results[i] = result
+        return results  # type: ignore[return-value]
+
+    def latest(self, air_node_id: str) -> Optional[dict]:
+        return self._call(self.shard_for(air_node_id), "latest", air_node_id).result()
+
+    def history(self, air_node_id: str, minutes: float, fmt: str, fields: Optional[List[str]]) -> Any:
+        return self._call(self.shard_for(air_node_id), "history", air_node_id, minutes, fmt, fields).result()
+
+    def stats(self) -> Dict[str, int]:
+        parts = [self._call(shard, "stats").result() for shard in range(self.shards)]
+        return {key: sum(p[key] for p in parts) for key in ("nodes_seen", "history_rows")}
+
+
+_SHARDED: Optional[ShardedPipeline] = None
+_SHARDED_LOCK = Lock()
+
+
+def get_sharded(
+    shards: int,
+    forecast_cfg: ForecastConfig,
+    alert_cfg: AlertConfig,
+    compact: bool = True,
+    history_per_node: int = 2000,
+) -> Optional[ShardedPipeline]:
+    """The process-wide sharded pipeline, started on first use; None when ``shards`` <= 0."""
+    global _SHARDED
+    if shards <= 0:
+        return None
+    if _SHARDED is None:
+        with _SHARDED_LOCK:
+            if _SHARDED is None:
+                sharded = ShardedPipeline(shards, forecast_cfg, alert_cfg, compact, history_per_node).start()
+                atexit.register(sharded.stop)
+                _SHARDED = sharded
+    return _SHARDED
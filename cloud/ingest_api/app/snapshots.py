@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Any, Dict, Optional, Tuple, Union
+
+
+def write_json_atomic(path: Path, blob: Any, indent: Optional[int] = 2) -> None:
+    # Write to a sibling temp file and rename so readers never see a partial file.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(blob, indent=indent, default=str))
+    os.replace(tmp, path)
+
+
+class SnapshotWriter:
+    """Coalescing background writer for JSON snapshot files.
+
+    ``submit`` only records the newest blob per path (latest wins); a daemon
+    thread serializes and writes pending snapshots every ``flush_interval_s``.
+    An interval <= 0 writes synchronously in the caller.
+    """
+
+    def __init__(self, flush_interval_s: float = 0.5) -> None:
+        self.flush_interval_s = flush_interval_s
+        self._pending: Dict[Path, Tuple[Any, Optional[int]]] = {}
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    def submit(self, path: Union[str, Path], blob: Any, indent: Optional[int] = 2) -> None:
+        path = Path(path)
+        if self.flush_interval_s <= 0:
+            self._write(path, blob, indent)
+            return
+        with self._lock:
+            self._pending[path] = (blob, indent)
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name="snapshot-writer", daemon=True)
+                self._thread.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for path, (blob, indent) in pending.items():
+            self._write(path, blob, indent)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._stop.clear()
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval_s):
+            self.flush()
+
+    @staticmethod
+    def _write(path: Path, blob: Any, indent: Optional[int]) -> None:
+        try:
+            write_json_atomic(path, blob, indent)
+        except Exception:
+            pass
+
+
+snapshot_writer = SnapshotWriter(float(os.getenv("SNAPSHOT_FLUSH_S", "0.5")))
+atexit.register(snapshot_writer.flush)
@@ -2,11 +2,22 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Deque, Dict, Optional, Tuple
+from threading import Lock
+from typing import Dict, Optional, Sequence
 
-from collections import deque
+from .history import HistoryStore
+from .snapshots import snapshot_writer
+from .rolling import FrameColumn, RingBuffer, RollingFrame, RollingWindow
 
-from .rolling import RollingWindow
+
+# Air metrics always arrive together, so they share one timestamp column.
+AIR_WINDOW_KEYS = ("air_rh_pct", "air_temp_c", "dew_point_c", "dew_margin_c")
+AIR_LAG_KEYS = ("air_rh_pct", "air_temp_c", "dew_margin_c")
+# Thresholds behind rh_time_above_70_w (>=) and dew_margin_time_below_0_w (<=)
+RH_HIGH_PCT = 70.0
+DEW_MARGIN_LOW_C = 0.0
+MOLD_LAG_KEYS = ("idx_mold_now",)
+LAG_MAXLEN = 800
 
 
 def _utc_ts_s(ts: datetime) -> float:
@@ -15,64 +26,143 @@ def _utc_ts_s(ts: datetime) -> float:
     return ts.timestamp()
 
 
+class LagBuffer:
+    """Bounded, time-sorted (ts, value...) history used for t-minus-N lag features.
+
+    Rows live in a RingBuffer so lookups can bisect on the timestamp column.
+    A per-lag cursor remembers the last match; with monotonic timestamps the
+    next lookup only steps forward from it (amortized O(1)). A sample older
+    than the newest row (late delivery, clock resync) is ignored for lag
+    purposes so the buffer stays sorted and the newer rows are kept.
+    """
+
+    def __init__(self, keys: Sequence[str], maxlen: int = LAG_MAXLEN) -> None:
+        self.keys = tuple(keys)
+        self._cols = {key: i + 1 for i, key in enumerate(self.keys)}
+        self._points = RingBuffer(len(self.keys) + 1, maxlen=maxlen)
+        # lag_min -> absolute position (RingBuffer.dropped + index) of last match
+        self._cursors: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def append(self, ts_s: float, values: Sequence[float]) -> None:
+        points = self._points
+        if points and points.get(-1, 0) > ts_s:
+            return
+        points.append((ts_s, *values))
+
+    def index_at_or_before(self, target_ts_s: float, lag_min: Optional[int] = None) -> Optional[int]:
+        points = self._points
+        n = len(points)
+        if n == 0 or points.get(0, 0) > target_ts_s:
+            return None
+        i = -1
+        if lag_min is not None and lag_min in self._cursors:
+            i = self._cursors[lag_min] - points.dropped
+        if 0 <= i < n and points.get(i, 0) <= target_ts_s:
+            while i + 1 < n and points.get(i + 1, 0) <= target_ts_s:
+                i += 1
+        else:
+            # Rightmost row with ts <= target (bisect_right - 1)
+            lo, hi = 0, n
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if points.get(mid, 0) <= target_ts_s:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            i = lo - 1
+        if lag_min is not None:
+            self._cursors[lag_min] = points.dropped + i
+        return i
+
+    def lookup(self, key: str, lag_min: int) -> Optional[float]:
+        if not self._points:
+            return None
+        target = self._points.get(-1, 0) - lag_min * 60.0
+        i = self.index_at_or_before(target, lag_min)
+        if i is None:
+            return None
+        return self._points.get(i, self._cols[key])
+
+
 @dataclass
 class NodeCache:
+    compact: bool = True
     last_seen_ts: Optional[datetime] = None
+    # Held while a sample of this node runs through the pipeline
+    lock: Lock = field(default_factory=Lock, init=False, repr=False, compare=False)
     last_values: Dict[str, float] = field(default_factory=dict)
     last_value_ts: Dict[str, datetime] = field(default_factory=dict)
 
-    rh_window: RollingWindow = field(default_factory=lambda: RollingWindow(window_s=300))
-    temp_window: RollingWindow = field(default_factory=lambda: RollingWindow(window_s=300))
-    dew_point_window: RollingWindow = field(default_factory=lambda: RollingWindow(window_s=300))
-    dew_margin_window: RollingWindow = field(default_factory=lambda: RollingWindow(window_s=300))
-    mold_idx_window: RollingWindow = field(default_factory=lambda: RollingWindow(window_s=300))
-    lag_buffers: Dict[str, Deque[Tuple[float, float]]] = field(default_factory=dict)
+    air_window: RollingFrame = field(init=False)
+    rh_window: FrameColumn = field(init=False)
+    temp_window: FrameColumn = field(init=False)
+    dew_point_window: FrameColumn = field(init=False)
+    dew_margin_window: FrameColumn = field(init=False)
+    mold_idx_window: RollingWindow = field(init=False)
+    air_lags: LagBuffer = field(init=False)
+    mold_lags: LagBuffer = field(init=False)
+    lag_buffers: Dict[str, LagBuffer] = field(init=False)
 
     pred_above_count: int = 0
     pred_below_count: int = 0
     alert_open: bool = False
     last_pred: Optional[float] = None
+    last_preds: Dict[int, float] = field(default_factory=dict)  # extra forecast horizons
     last_episode_id: Optional[str] = None
     pred_cross_ts: Optional[datetime] = None
     pred_resolve_ts: Optional[datetime] = None
     actual_cross_ts: Optional[datetime] = None
     actual_resolve_ts: Optional[datetime] = None
 
+    def __post_init__(self) -> None:
+        self.air_window = RollingFrame(window_s=300, columns=len(AIR_WINDOW_KEYS), compact=self.compact)
+        self.rh_window = self.air_window.column(AIR_WINDOW_KEYS.index("air_rh_pct"))
+        self.temp_window = self.air_window.column(AIR_WINDOW_KEYS.index("air_temp_c"))
+        self.dew_point_window = self.air_window.column(AIR_WINDOW_KEYS.index("dew_point_c"))
+        self.dew_margin_window = self.air_window.column(AIR_WINDOW_KEYS.index("dew_margin_c"))
+        self.rh_window.track_threshold(RH_HIGH_PCT)
+        self.dew_margin_window.track_threshold(DEW_MARGIN_LOW_C, at_least=False)
+        self.mold_idx_window = RollingWindow(window_s=300, compact=self.compact)
+
+        self.air_lags = LagBuffer(AIR_LAG_KEYS)
+        self.mold_lags = LagBuffer(MOLD_LAG_KEYS)
+        self.lag_buffers = {key: self.air_lags for key in AIR_LAG_KEYS}
+        self.lag_buffers.update({key: self.mold_lags for key in MOLD_LAG_KEYS})
+
 
 @dataclass
 class GlobalState:
     nodes: Dict[str, NodeCache] = field(default_factory=dict)
     latest_response: Optional[dict] = None
-    history: Deque[dict] = field(default_factory=lambda: deque(maxlen=2000))
+    history: HistoryStore = field(default_factory=HistoryStore)
     latest_air_raw: Optional[dict] = None
     latest_water_raw: Optional[dict] = None
     latest_live_path: Optional[str] = None
+    compact: bool = True
+    # Guards node creation only; per-node work is serialized by NodeCache.lock
+    _nodes_lock: Lock = field(default_factory=Lock, init=False, repr=False, compare=False)
 
     def get_node(self, air_node_id: str) -> NodeCache:
-        if air_node_id not in self.nodes:
-            self.nodes[air_node_id] = NodeCache()
-        return self.nodes[air_node_id]
+        node = self.nodes.get(air_node_id)
+        if node is None:
+            with self._nodes_lock:
+                node = self.nodes.get(air_node_id)
+                if node is None:
+                    node = self.nodes[air_node_id] = NodeCache(compact=self.compact)
+        return node
 
     def add_history(self, payload: dict) -> None:
         self.latest_response = payload
-        self.history.append(payload)
+        normalized = payload["normalized"]
+        self.history.append(normalized["air_node_id"], _utc_ts_s(normalized["ts"]), payload)
         if self.latest_live_path:
-            try:
-                import json
-                from pathlib import Path
-
-                Path(self.latest_live_path).parent.mkdir(parents=True, exist_ok=True)
-                Path(self.latest_live_path).write_text(json.dumps(payload, default=str, indent=2))
-            except Exception:
-                pass
+            snapshot_writer.submit(self.latest_live_path, payload)
 
     def get_latest_for_node(self, air_node_id: str) -> Optional[dict]:
-        if not self.history:
-            return None
-        for item in reversed(self.history):
-            if item["normalized"]["air_node_id"] == air_node_id:
-                return item
-        return None
+        return self.history.latest(air_node_id)
 
     def add_air_rolling(
         self,
@@ -84,35 +174,16 @@ class GlobalState:
         dew_margin_c: float,
     ) -> None:
         ts_s = _utc_ts_s(ts)
-        node.rh_window.add(ts_s, air_rh_pct)
-        node.temp_window.add(ts_s, air_temp_c)
-        node.dew_point_window.add(ts_s, dew_point_c)
-        node.dew_margin_window.add(ts_s, dew_margin_c)
-        _add_lag(node, "air_rh_pct", ts_s, air_rh_pct)
-        _add_lag(node, "air_temp_c", ts_s, air_temp_c)
-        _add_lag(node, "dew_margin_c", ts_s, dew_margin_c)
+        node.air_window.add_row(ts_s, (air_rh_pct, air_temp_c, dew_point_c, dew_margin_c))
+        node.air_lags.append(ts_s, (air_rh_pct, air_temp_c, dew_margin_c))
 
     def add_mold_rolling(self, node: NodeCache, ts: datetime, idx_mold_now: float) -> None:
         ts_s = _utc_ts_s(ts)
         node.mold_idx_window.add(ts_s, idx_mold_now)
-        _add_lag(node, "idx_mold_now", ts_s, idx_mold_now)
-
-
-def _add_lag(node: NodeCache, key: str, ts_s: float, value: float) -> None:
-    if key not in node.lag_buffers:
-        node.lag_buffers[key] = deque(maxlen=800)
-    node.lag_buffers[key].append((ts_s, value))
+        node.mold_lags.append(ts_s, (idx_mold_now,))
 
 
 def get_lag_value(node: NodeCache, key: str, lag_min: int) -> Optional[float]:
     if key not in node.lag_buffers:
         return None
-    buf = node.lag_buffers[key]
-    if not buf:
-        return None
-    target = buf[-1][0] - lag_min * 60.0
-    # Find closest value at or before target
-    for ts_s, val in reversed(buf):
-        if ts_s <= target:
-            return val
-    return None
+    return node.lag_buffers[key].lookup(key, lag_min)
@@ -0,0 +1,78 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from analytics.etl.build_mold_dataset import _build_dataset
+from analytics.etl.dataset_io import dataset_columns, read_dataset, write_dataset
+
+
+@pytest.mark.parametrize("name", ["ds.parquet", "ds.feather", "ds.csv"])
+def test_dataset_round_trip_with_projection(tmp_path, name):
+    df = _build_dataset(["NORMAL", "MOLD_EPISODE"], 3, 30, 30, 5, 2, 0.0)
+    frames = [g for _, g in df.groupby("episode_id", sort=True)]
+    path = tmp_path / name
+    assert write_dataset(path, frames) == len(df)
+
+    assert set(dataset_columns(path)) == set(df.columns)
+    back = read_dataset(path).sort_values(["episode_id", "ts"]).reset_index(drop=True)
+    back = back[list(df.columns)]
+    if name.endswith(".csv"):
+        pd.testing.assert_frame_equal(back, df, check_dtype=False, check_exact=False)
+    else:
+        # Arrow formats are typed and lossless.
+        pd.testing.assert_frame_equal(back, df, check_dtype=False, check_exact=True)
+
+    cols = ["ts", "air_rh_pct", "target_idx_mold_h"]
+    projected = read_dataset(path, columns=cols)
+    assert set(projected.columns) == set(cols)
+    assert len(projected) == len(df)
+
+
+def test_streaming_split_from_partition_metadata(tmp_path):
+    pytest.importorskip("lightgbm")
+    from analytics.etl.dataset_io import scan_fragments, time_cutoffs
+    from analytics.forecasting.train_mold_lgbm import build_streaming_datasets, split_fragments
+
+    df = _build_dataset(["NORMAL", "MOLD_EPISODE"], 3, 30, 30, 5, 2, 0.0)
+    path = tmp_path / "ds.parquet"
+    write_dataset(path, [g for _, g in df.groupby("episode_id", sort=True)])
+
+    fragments = scan_fragments(path)
+    assert sum(f.num_rows for f in fragments) == len(df)
+    cutoffs = time_cutoffs(fragments, (0.7, 0.85))
+    features = ["air_rh_pct", "dew_margin_c", "episode_id"]
+    train, val, test = split_fragments(fragments, cutoffs, features)
+
+    ts_s = df["ts"].astype("int64").to_numpy() / 1e9
+    assert sum(map(len, train)) == int((ts_s < cutoffs[0]).sum())
+    assert sum(map(len, val)) == int(((ts_s >= cutoffs[0]) & (ts_s < cutoffs[1])).sum())
+    assert sum(map(len, train + val + test)) == len(df)
+    # Partition columns come from the directory names.
+    assert set(test[0][0:5][:, 2]) <= set(df["episode_id"].astype(float))
+
+    dtrain, _, _ = build_streaming_datasets(str(path), features, str(tmp_path / "cache"))
+    assert dtrain.construct().num_data() == sum(map(len, train))
+    cached, _, _ = build_streaming_datasets(str(path), features, str(tmp_path / "cache"))
+    assert cached.construct().num_data() == dtrain.num_data()
+
+
+def test_parquet_write_only_replaces_a_dataset_directory(tmp_path):
+    df = _build_dataset(["NORMAL"], 1, 30, 30, 5, 1, 0.0)
+    out = tmp_path / "data"
+    out.mkdir()
+    (out / "keep.txt").write_text("not a partition")
+    with pytest.raises(ValueError):
+        write_dataset(out, iter([df]))
+    assert (out / "keep.txt").exists()
+
+    (tmp_path / "file.parquet").write_text("")
+    with pytest.raises(ValueError):
+        write_dataset(tmp_path / "file.parquet", iter([df]))
+
+    # A previous dataset is replaced; overwrite=True replaces anything
+    dataset = tmp_path / "ds.parquet"
+    write_dataset(dataset, iter([df]))
+    assert write_dataset(dataset, iter([df])) == len(df)
+    assert write_dataset(out, iter([df]), overwrite=True) == len(df)
+    assert not (out / "keep.txt").exists()
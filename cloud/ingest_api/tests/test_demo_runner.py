@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from cloud.ingest_api.app import routes
+from cloud.ingest_api.app.history import HistoryStore
+from cloud.ingest_api.app.jsonl_log import JsonlLog
+from cloud.ingest_api.app.state import GlobalState
+
+
+def test_fast_direct_demo_prerolls_up_to_now(tmp_path, monkeypatch):
+    demo_state = GlobalState(history=HistoryStore(1000))
+    monkeypatch.setattr(routes, "demo_state", demo_state)
+    monkeypatch.setattr(routes, "demo_latest_json_path", tmp_path / "demo_latest.json")
+    monkeypatch.setattr(routes, "demo_history_log", JsonlLog(tmp_path / "demo_history.jsonl", keep_last=50))
+    # Nothing listens here; samples sent over HTTP would never reach demo_state.
+    monkeypatch.setattr(routes, "DEMO_API_URL", "http://127.0.0.1:9")
+
+    # 120 steps of 60 simulated seconds each: two hours of demo data, no sleeping
+    routes._run_demo_sequence([("NORMAL", 40), ("MOLD_EPISODE", 80)], 1.0, 42, 60.0, "direct", fast=True)
+
+    rows = demo_state.history.rows_since("SIM-001", 24 * 60, ["ts", "idx_mold_now"])
+    assert len(rows) == 120
+    gaps = {(b["ts"] - a["ts"]).total_seconds() for a, b in zip(rows, rows[1:])}
+    assert gaps == {60.0}
+    assert abs((datetime.now(timezone.utc) - rows[-1]["ts"]).total_seconds()) < 60
+    assert rows[-1]["idx_mold_now"] > rows[0]["idx_mold_now"]
+    assert [r["normalized"]["ts"] for r in routes.demo_history_log.tail(1)] == [str(rows[-1]["ts"])]
+    assert not routes._demo_running
+
+
+def test_demo_runner_survives_failing_samples(tmp_path, monkeypatch):
+    demo_state = GlobalState(history=HistoryStore(1000))
+    monkeypatch.setattr(routes, "demo_state", demo_state)
+    monkeypatch.setattr(routes, "demo_latest_json_path", tmp_path / "demo_latest.json")
+    monkeypatch.setattr(routes, "demo_history_log", JsonlLog(tmp_path / "demo_history.jsonl", keep_last=50))
+    run_pipeline = routes.run_pipeline
+    calls = []
+
+    def flaky(payload, *args):
+        calls.append(payload["seq_water"])
+        if len(calls) == 2:
+            raise ValueError("bad sample")
+        return run_pipeline(payload, *args)
+
+    monkeypatch.setattr(routes, "run_pipeline", flaky)
+    routes._run_demo_sequence([("NORMAL", 5)], 1.0, 42, 60.0, "direct", fast=True)
+    assert calls == [0, 1, 2, 3, 4]
+    assert len(demo_state.history) == 4
+    assert not routes._demo_running
+
+    # An error outside the per-sample guard still leaves the runner restartable
+    with pytest.raises(ZeroDivisionError):
+        routes._run_demo_sequence([("NORMAL", 5)], 0.0, 42, 60.0, "direct", fast=True)
+    assert not routes._demo_running
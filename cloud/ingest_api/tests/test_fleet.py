@@ -0,0 +1,69 @@
+import asyncio
+import json
+from collections import Counter
+from datetime import datetime, timezone
+
+from analytics.synthetic.fleet import LatencyHistogram, build_fleet, run_fleet
+
+TS = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_build_fleet_spreads_nodes_and_is_reproducible():
+    fleet = build_fleet(40, buildings=4, zones_per_building=5, mix="NORMAL:0.5,MOLD_EPISODE:0.5", episode_steps=10)
+    assert len({n.air_node_id for n in fleet}) == 40
+    assert Counter(n.building_id for n in fleet) == {f"CAMPUS-B{b:02d}": 10 for b in range(4)}
+    assert len({n.building_zone for n in fleet}) == 20
+
+    again = build_fleet(40, buildings=4, zones_per_building=5, mix="NORMAL:0.5,MOLD_EPISODE:0.5", episode_steps=10)
+    assert fleet[3].payload(25, TS) == again[3].payload(25, TS)
+    # Nodes draw their own noise and their own scenario sequence
+    sensors = ("air_temp_c", "air_rh_pct", "water_tds_ppm", "battery_mv")
+    assert len({tuple(n.payload(4, TS)[k] for k in sensors) for n in fleet}) > 30
+    # build_payload seeds with seed + step: neighbouring nodes must not replay each other shifted by a step
+    assert tuple(fleet[0].payload(5, TS)[k] for k in sensors) != tuple(fleet[1].payload(4, TS)[k] for k in sensors)
+    sequences = {tuple(n.scenario_at(e) for e in range(8)) for n in fleet}
+    assert len(sequences) > 1
+    assert {s for seq in sequences for s in seq} == {"NORMAL", "MOLD_EPISODE"}
+
+
+def test_latency_histogram_buckets_and_percentiles():
+    hist = LatencyHistogram(bounds_ms=(1, 10))
+    for ms in (0.5, 5, 5, 50):
+        hist.add(ms / 1000)
+    assert hist.counts == [1, 2, 1]
+    assert hist.summary()["p50_ms"] == 5
+    assert hist.summary()["max_ms"] == 50
+
+
+def test_run_fleet_hits_rate_and_keeps_node_order():
+    received = []
+
+    async def handle(reader, writer):
+        while True:
+            if not await reader.readline():
+                break
+            length = 0
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.partition(b":")
+                if name.lower() == b"content-length":
+                    length = int(value)
+            received.append(json.loads(await reader.readexactly(length)))
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n{}")
+        writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await run_fleet(f"http://127.0.0.1:{port}", build_fleet(20), rate=400, duration_s=0.5, connections=4)
+
+    report = asyncio.run(main())
+    assert report.completed == report.scheduled == 200
+    assert report.errors == 0
+    assert report.elapsed_s < 2.0
+    ts_by_node = {}
+    for payload in received:
+        ts = datetime.fromisoformat(payload["ts"].replace("Z", "+00:00"))
+        ts_by_node.setdefault(payload["air_node_id"], []).append(ts)
+    assert len(ts_by_node) == 20
+    assert all(ts == sorted(ts) and len(ts) == 10 for ts in ts_by_node.values())
@@ -0,0 +1,48 @@
+from cloud.ingest_api.app.history import HistoryStore
+
+
+def _item(node_id: str, ts_s: float) -> dict:
+    return {
+        "normalized": {"air_node_id": node_id, "ts": ts_s, "air_rh_pct": 45.0},
+        "features": {"idx_mold_now": ts_s / 1000.0},
+        "prediction": {"yhat": 0.5, "model_name": "trend_extrap_v1"},
+    }
+
+
+def test_history_is_per_node_and_bounded():
+    store = HistoryStore(maxlen_per_node=50)
+    for i in range(200):
+        for n in range(20):
+            store.append(f"AIR-{n}", 60.0 * i, _item(f"AIR-{n}", 60.0 * i))
+
+    assert len(store) == 20 * 50
+    assert store.latest("AIR-3")["normalized"]["ts"] == 60.0 * 199
+    assert store.latest("missing") is None
+
+    rows = store.rows_since("AIR-3", minutes=10)
+    assert [r["ts"] for r in rows] == [60.0 * i for i in range(189, 200)]
+    assert len(store.rows_since("AIR-3", minutes=10_000)) == 50
+
+
+def test_history_keeps_time_order_for_late_samples():
+    store = HistoryStore()
+    for ts_s in (0.0, 60.0, 180.0, 120.0):
+        store.append("AIR-1", ts_s, _item("AIR-1", ts_s))
+
+    node = store.node("AIR-1")
+    assert [r["ts"] for r in node.rows(60.0, 150.0)] == [60.0, 120.0]
+    assert store.latest("AIR-1")["normalized"]["ts"] == 120.0
+
+
+def test_history_columnar_projection_matches_rows():
+    store = HistoryStore()
+    for i in range(10):
+        store.append("AIR-1", 60.0 * i, _item("AIR-1", 60.0 * i))
+
+    fields = ["ts", "idx_mold_now", "pred_idx_mold_h"]
+    cols = store.columns_since("AIR-1", minutes=5, fields=fields)
+    rows = store.rows_since("AIR-1", minutes=5, fields=fields)
+    assert list(cols) == fields
+    assert cols["ts"] == [60.0 * i for i in range(4, 10)]
+    assert rows == [dict(zip(fields, values)) for values in zip(*cols.values())]
+    assert store.columns_since("missing", minutes=5, fields=fields) == {name: [] for name in fields}
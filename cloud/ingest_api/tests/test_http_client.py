@@ -0,0 +1,140 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from analytics.synthetic.http_client import AsyncConnection, TelemetryClient
+
+
+@pytest.fixture
+def server():
+    received = []
+    fail_first = [0]
+    garbage_first = [0]
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True  # headers and body are written separately
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with lock:
+                status = 503 if fail_first[0] > 0 else 200
+                fail_first[0] -= 1
+                garbage = status == 200 and garbage_first[0] > 0
+                garbage_first[0] -= garbage
+                if status == 200:
+                    received.append((self.path, body))
+            # e.g. a proxy's HTML page
+            reply = b"<html>oops</html>" if garbage else json.dumps({"rejected": []}).encode()
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(reply)))
+            self.end_headers()
+            self.wfile.write(reply)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}", received, fail_first, garbage_first
+    httpd.shutdown()
+
+
+def _samples(nodes, steps):
+    return [{"air_node_id": f"AIR-{n}", "seq": i} for i in range(steps) for n in range(nodes)]
+
+
+def test_client_keeps_per_node_order_across_lanes(server):
+    url, received, _, _ = server
+    with TelemetryClient(url, lanes=4, backoff_s=0.01) as client:
+        for payload in _samples(8, 50):
+            client.send(payload)
+    assert client.stats()["sent"] == 400
+    by_node = {}
+    for path, body in received:
+        assert path == "/telemetry"
+        by_node.setdefault(body["air_node_id"], []).append(body["seq"])
+    assert by_node == {f"AIR-{n}": list(range(50)) for n in range(8)}
+
+
+def test_client_batches_and_retries(server):
+    url, received, fail_first, _ = server
+    fail_first[0] = 2
+    client = TelemetryClient(url, lanes=1, batch_size=10, batch_flush_s=0.2, backoff_s=0.01)
+    for payload in _samples(1, 25):
+        client.send(payload)
+    client.close()
+
+    stats = client.stats()
+    assert stats["sent"] == 25 and stats["failed"] == 0
+    assert stats["retried"] == 2
+    assert all(path.startswith("/telemetry/batch") for path, _ in received)
+    assert [p["seq"] for _, batch in received for p in batch] == list(range(25))
+    assert max(len(batch) for _, batch in received) == 10
+
+
+def test_client_survives_non_json_batch_reply(server):
+    url, received, _, garbage_first = server
+    garbage_first[0] = 1
+    client = TelemetryClient(url, lanes=1, batch_size=5, batch_flush_s=0.05, backoff_s=0.01)
+    for payload in _samples(1, 5):
+        client.send(payload)
+    assert client.flush(timeout=5)
+    for payload in _samples(1, 5):
+        client.send(payload)
+    client.close(timeout=5)
+
+    stats = client.stats()
+    assert stats["failed"] == 5 and stats["sent"] == 5
+    assert "not JSON" in stats["last_error"]
+    assert all(not t.is_alive() for t in client._threads)
+
+
+def test_async_connection_reconnects_after_idle_close():
+    keep_alive_s = 0.2
+    accepted = []
+
+    async def handle(reader, writer):
+        accepted.append(writer)
+        try:
+            while True:
+                # Close connections idle for longer than the keep-alive timeout
+                line = await asyncio.wait_for(reader.readline(), keep_alive_s)
+                length = 0
+                while line not in (b"\r\n", b""):
+                    line = await reader.readline()
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                body = await reader.readexactly(length)
+                close = body == b"bye"
+                extra = b"Connection: close\r\n" if close else b""
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n" + extra + b"\r\nok")
+                await writer.drain()
+                if close:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+            pass
+        writer.close()
+
+    async def run():
+        srv = await asyncio.start_server(handle, "127.0.0.1", 0)
+        conn = AsyncConnection(f"http://127.0.0.1:{srv.sockets[0].getsockname()[1]}")
+        statuses = [await conn.request("POST", "/telemetry", b"{}")]
+        await asyncio.sleep(keep_alive_s * 3)
+        statuses.append(await conn.request("POST", "/telemetry", b"{}"))
+        statuses.append(await conn.request("POST", "/telemetry", b"bye"))
+        assert conn._writer is None
+        statuses.append(await conn.request("POST", "/telemetry", b"{}"))
+        conn.close()
+        srv.close()
+        await srv.wait_closed()
+        return statuses
+
+    assert asyncio.run(run()) == [200, 200, 200, 200]
+    # idle close -> reconnect, Connection: close -> reconnect
+    assert len(accepted) == 3
@@ -0,0 +1,138 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+lgb = pytest.importorskip("lightgbm")
+
+from cloud.ingest_api.app.ml_model import MicroBatcher, build_feature_vector
+
+MODEL_PATH = Path(__file__).resolve().parents[3] / "models" / "mold_lgbm.txt"
+
+
+def _samples(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        rh = rng.uniform(35.0, 98.0)
+        normalized = {
+            "air_temp_c": rng.uniform(18.0, 26.0),
+            "air_rh_pct": rh,
+            "air_surface_temp_c": rng.uniform(16.0, 25.0),
+            "air_voc_index": rng.choice([None, rng.uniform(50, 300)]),
+            "episode_id": None,
+        }
+        features = {
+            key: rng.uniform(-2.0, 2.0)
+            for key in (
+                "dew_point_c",
+                "dew_margin_c",
+                "rh_std_w",
+                "rh_slope_w",
+                "temp_slope_w",
+                "dew_point_slope_w",
+                "dew_margin_slope_w",
+                "dew_margin_c_t_minus_5",
+            )
+        }
+        features.update(
+            rh_mean_w=rh,
+            rh_time_above_70_w=rng.random(),
+            dew_margin_time_below_0_w=rng.random(),
+            air_rh_pct_t_minus_1=rh,
+            air_rh_pct_t_minus_5=rh,
+            idx_mold_now_t_minus_5=rng.random(),
+        )
+        out.append((normalized, features, rng.random()))
+    return out
+
+
+def test_micro_batcher_matches_single_row_predict():
+    model = lgb.Booster(model_file=str(MODEL_PATH))
+    samples = _samples(300)
+    expected = [float(model.predict([build_feature_vector(model, *s)])[0]) for s in samples]
+
+    batcher = MicroBatcher(max_batch=64, max_wait_s=0.005)
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        got = list(pool.map(lambda s: batcher.predict(model, *s), samples))
+
+    assert got == pytest.approx(expected, rel=0, abs=1e-12)
+    assert batcher.rows == len(samples)
+    assert batcher.batches < len(samples)
+
+
+def test_micro_batcher_isolates_a_failing_row():
+    model = lgb.Booster(model_file=str(MODEL_PATH))
+    samples = _samples(5)
+    samples[2][0]["air_temp_c"] = "not-a-number"
+    batcher = MicroBatcher(max_batch=64, max_wait_s=0.2)  # all five land in one batch
+    futures = [batcher.submit(model, *s) for s in samples]
+
+    with pytest.raises(ValueError):
+        futures[2].result(timeout=5)
+    for i in (0, 1, 3, 4):
+        expected = float(model.predict([build_feature_vector(model, *samples[i])])[0])
+        assert futures[i].result(timeout=5) == pytest.approx(expected, rel=0, abs=1e-12)
+
+
+def test_native_engine_matches_booster_exactly():
+    np = pytest.importorskip("numpy")
+    from cloud.ingest_api.app.ml_model import load_model
+    from cloud.ingest_api.app.tree_model import TreeEnsemble
+
+    booster = lgb.Booster(model_file=str(MODEL_PATH))
+    native = load_model(str(MODEL_PATH), engine="native")
+    assert isinstance(native, TreeEnsemble)
+    assert native.feature_name() == booster.feature_name()
+
+    rng = np.random.default_rng(0)
+    X = np.array([build_feature_vector(booster, *s) for s in _samples(500)])
+    X = np.vstack([X, rng.uniform(-50.0, 150.0, X.shape), np.zeros((5, X.shape[1]))])
+    X[rng.random(X.shape) < 0.05] = np.nan
+
+    expected = booster.predict(X)
+    assert (native.predict(X) == expected).all()
+    assert [native.predict_row(row) for row in X.tolist()] == expected.tolist()
+
+
+def test_registry_hot_swaps_changed_model(tmp_path):
+    import os
+
+    from cloud.ingest_api.app.ml_model import ModelRegistry
+
+    path = tmp_path / "model.txt"
+    booster = lgb.Booster(model_file=str(MODEL_PATH))
+    booster.save_model(str(path), num_iteration=10)
+    registry = ModelRegistry({"default": str(path), "h60": str(tmp_path / "missing.txt")}, engine="native", poll_s=0)
+    registry.preload()
+
+    first = registry.resolve("ENG-1", 60)
+    assert first.key == "default"
+    vec = build_feature_vector(first.model, *_samples(1)[0])
+    before = first.model.predict_row(vec)
+    assert registry.check() == 0
+
+    def bump_mtime():
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    # Half-written file: keep serving the current model
+    path.write_text(MODEL_PATH.read_text()[:5000])
+    bump_mtime()
+    assert registry.check() == 0
+    assert registry.resolve() is first
+
+    booster.save_model(str(path))
+    bump_mtime()
+    assert registry.check() == 1
+    second = registry.resolve()
+    assert second.version != first.version
+    assert second.model.predict_row(vec) == booster.predict([vec])[0]
+    # The old model stays usable by requests that already hold it
+    assert first.model.predict_row(vec) == before
+
+    # Touched without a content change: no reload
+    bump_mtime()
+    assert registry.check() == 0
+    assert registry.resolve() is second
@@ -0,0 +1,65 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from analytics.synthetic.fleet import build_fleet
+from analytics.synthetic.payload_blocks import iter_blocks, iter_payloads, payload_block, quantize_array
+from analytics.synthetic.scenario_generator import _quantize
+from cloud.ingest_api.app.schemas import TelemetryIn
+
+TS = datetime(2026, 1, 1, tzinfo=timezone.utc)
+MIX = "NORMAL:0.4,MOLD_EPISODE:0.3,WATER_EVENT:0.3"
+# Sensor keys whose values come from the noise draws
+NOISY = {
+    "air_temp_c", "air_rh_pct", "water_temp_c", "water_turbidity_ntu", "water_free_chlorine_mgL",
+    "water_tds_ppm", "rssi_ble", "battery_mv", "outdoor_temp_c", "outdoor_rh_pct",
+    "outdoor_dew_point_c", "air_co2_ppm", "air_voc_index", "air_surface_temp_c",
+}
+
+
+def test_quantize_array_matches_scalar_quantize():
+    rng = random.Random(7)
+    values = [rng.uniform(-50, 1000) for _ in range(5000)] + [0.05, 0.15, 0.25, 2.5, 3.5, -0.5]
+    for step in (0.1, 0.01, 1.0):
+        assert quantize_array(np.array(values), step).tolist() == [_quantize(v, step) for v in values]
+
+
+def test_block_matches_fleet_payload_layout_and_ranges():
+    fleet = build_fleet(6, mix=MIX, episode_steps=10)
+    period_s = 30.0
+    payloads = list(iter_payloads([payload_block(fleet, 0, 40, TS, period_s)]))
+    assert len(payloads) == 240
+
+    for i, payload in enumerate(payloads):
+        step, n = divmod(i, len(fleet))
+        scalar = fleet[n].payload(step, TS + timedelta(seconds=step * period_s))
+        assert list(payload) == list(scalar)
+        assert {k: v for k, v in payload.items() if k not in NOISY} == {k: v for k, v in scalar.items() if k not in NOISY}
+        TelemetryIn(**payload)
+        assert 15.0 <= payload["air_temp_c"] <= 30.0 and 20.0 <= payload["air_rh_pct"] <= 98.0
+        assert payload["air_co2_ppm"] == _quantize(payload["air_co2_ppm"], 1.0)
+        assert payload["water_free_chlorine_mgL"] == _quantize(payload["water_free_chlorine_mgL"], 0.01)
+        assert isinstance(payload["rssi_ble"], int) and -64 <= payload["rssi_ble"] <= -55
+
+    # Scenario shapes carry over: mold RH ramps up, water events push turbidity up
+    by_scenario = {}
+    for payload in payloads:
+        by_scenario.setdefault(payload["scenario"], []).append(payload)
+    assert set(by_scenario) == {"NORMAL", "MOLD_EPISODE", "WATER_EVENT"}
+    assert all(40.0 <= p["air_rh_pct"] <= 50.0 for p in by_scenario["NORMAL"])
+    assert max(p["air_rh_pct"] for p in by_scenario["MOLD_EPISODE"] if p["seq_water"] == 9) > 70.0
+    assert min(p["water_turbidity_ntu"] for p in by_scenario["WATER_EVENT"]) >= 3.0
+
+
+def test_blocks_are_reproducible_and_independent_of_block_size():
+    fleet = build_fleet(5, mix=MIX, episode_steps=7)
+
+    def run(block_steps, seed=42):
+        blocks = list(iter_blocks(fleet, 30, block_steps, TS, 60.0, seed))
+        return {key: np.concatenate([b[key] for b in blocks]) for key in blocks[0]}
+
+    whole, split = run(30), run(4)
+    assert all(np.array_equal(whole[key], split[key]) for key in whole)
+    other = run(30, seed=43)
+    assert not np.array_equal(whole["air_temp_c"], other["air_temp_c"])
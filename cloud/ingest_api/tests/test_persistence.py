@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, event, func, select
+
+from analytics.synthetic.scenario_generator import build_payload
+from cloud.ingest_api.app.models import Feature, Prediction, RawTelemetry
+from cloud.ingest_api.app.persistence import PersistenceWriter, prune
+from cloud.ingest_api.app.pipeline import AlertConfig, ForecastConfig, run_pipeline
+from cloud.ingest_api.app.queries import node_last_minutes
+from cloud.ingest_api.app.settings import Settings
+from cloud.ingest_api.app.state import GlobalState
+
+
+def _count(engine, model) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(model)).scalar_one()
+
+
+def test_persistence_writer_bulk_inserts_and_prunes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'db' / 'test.db'}")
+    cfg = Settings()
+    cfg.persist_batch_size = 16
+    cfg.persist_flush_s = 0.05
+    cfg.prune_interval_s = 3600
+    cfg.retention_days = 7
+    cfg.retention_max_rows = 30
+    cfg.prune_chunk_rows = 25
+    writer = PersistenceWriter(engine, cfg)
+
+    state = GlobalState()
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for i in range(40):
+        payload = build_payload(base + timedelta(minutes=i), "MOLD_EPISODE", i, 1, "ep-1", "AIR-1", "W", "B", "S", "Z")
+        writer.submit(run_pipeline(payload, state, ForecastConfig(), AlertConfig()))
+    writer.stop()
+
+    assert writer.dropped == 0
+    assert _count(engine, RawTelemetry) == 40
+    assert _count(engine, Feature) == 40
+    with engine.connect() as conn:
+        row = conn.execute(select(Prediction).order_by(Prediction.id)).first()
+    assert row.ts == datetime(2026, 1, 1)
+    assert row.ts_target - row.ts == timedelta(minutes=ForecastConfig().horizon_min)
+
+    # 40 rows are past retention_days; each prune pass deletes at most one chunk.
+    now = base + timedelta(days=8, minutes=20)
+    assert prune(engine, cfg, now=now) >= 25
+    assert _count(engine, RawTelemetry) == 15
+    prune(engine, cfg, now=now)
+    assert _count(engine, RawTelemetry) == 0
+
+
+def test_node_last_minutes_joins_on_sample_id(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    cfg = Settings()
+    cfg.prune_interval_s = 3600
+    cfg.retention_days = 10000
+    writer = PersistenceWriter(engine, cfg)
+
+    state = GlobalState()
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for i in range(120):
+        for node in ("AIR-1", "AIR-2"):
+            payload = build_payload(base + timedelta(minutes=i), "MOLD_EPISODE", i, 1, "ep-1", node, "W", "B", "S", "Z")
+            writer.submit(run_pipeline(payload, state, ForecastConfig(), AlertConfig()))
+    writer.stop()
+
+    with engine.connect() as conn:
+        rows = node_last_minutes(conn, "AIR-2", 30)
+        assert node_last_minutes(conn, "AIR-9", 30) == []
+    # Inclusive window relative to the node's newest row; one feature/prediction per sample.
+    assert len(rows) == 31
+    assert rows[-1]["ts"] == datetime(2026, 1, 1, 1, 59)
+    assert all(r["idx_mold_now"] is not None and r["pred_idx_mold_h"] is not None for r in rows)
+
+
+def test_multi_horizon_prediction_rows(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    cfg = Settings()
+    cfg.prune_interval_s = 3600
+    cfg.retention_days = 10000
+    writer = PersistenceWriter(engine, cfg)
+
+    state = GlobalState()
+    forecast = ForecastConfig(horizon_min=30, horizons=(15, 60))
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for i in range(20):
+        payload = build_payload(base + timedelta(minutes=i), "MOLD_EPISODE", i, 1, "ep-1", "AIR-1", "W", "B", "S", "Z")
+        writer.submit(run_pipeline(payload, state, forecast, AlertConfig()))
+    writer.stop()
+
+    assert _count(engine, RawTelemetry) == 20
+    assert _count(engine, Prediction) == 60
+    with engine.connect() as conn:
+        rows = conn.execute(select(Prediction).where(Prediction.horizon_min == 60)).all()
+        window = node_last_minutes(conn, "AIR-1", 5, horizon_min=15)
+        primary = node_last_minutes(conn, "AIR-1", 5)
+        every = node_last_minutes(conn, "AIR-1", 5, all_horizons=True)
+    assert len(rows) == 20
+    assert all(r.ts_target - r.ts == timedelta(minutes=60) for r in rows)
+    assert len(window) == 6
+    # One row per sample unless every horizon is asked for
+    assert len(primary) == 6 and all(r["pred_idx_mold_h"] is not None for r in primary)
+    assert len(every) == 18
+    assert [r["horizon_min"] for r in every[:3]] == [15, 30, 60]
+
+
+def test_prune_removes_whole_samples_and_caps_raw_rows_only(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+
+    @event.listens_for(engine, "connect")
+    def _fk(dbapi_conn, _record):
+        dbapi_conn.execute("PRAGMA foreign_keys=ON")
+
+    cfg = Settings()
+    cfg.prune_interval_s = 3600
+    cfg.retention_days = 7
+    cfg.retention_max_rows = 10
+    cfg.prune_chunk_rows = 1000
+    writer = PersistenceWriter(engine, cfg)
+
+    state = GlobalState()
+    forecast = ForecastConfig(horizon_min=30, horizons=(15, 60))
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for i in range(25):
+        payload = build_payload(base + timedelta(minutes=i), "MOLD_EPISODE", i, 1, "ep-1", "AIR-1", "W", "B", "S", "Z")
+        writer.submit(run_pipeline(payload, state, forecast, AlertConfig()))
+    writer.stop()
+
+    # Nothing is past retention_days: only the 15 oldest samples beyond max_rows go
+    prune(engine, cfg, now=base + timedelta(days=1))
+    assert _count(engine, RawTelemetry) == 10
+    assert _count(engine, Feature) == 10
+    # Three horizons per sample; max_rows counts samples, not prediction rows
+    assert _count(engine, Prediction) == 30
+    with engine.connect() as conn:
+        raw_ids = set(conn.execute(select(RawTelemetry.sample_id)).scalars())
+        assert set(conn.execute(select(Prediction.sample_id)).scalars()) == raw_ids
+        assert set(conn.execute(select(Feature.sample_id)).scalars()) == raw_ids
+
+    prune(engine, cfg, now=base + timedelta(days=8))
+    assert _count(engine, RawTelemetry) == _count(engine, Feature) == _count(engine, Prediction) == 0
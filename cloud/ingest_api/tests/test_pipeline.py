@@ -1,10 +1,20 @@
-from datetime import datetime, timezone
+import random
+from collections import deque
+from datetime import datetime, timedelta, timezone
 
 from analytics.indices.physics import dew_point_c
 
-from cloud.ingest_api.app.pipeline import AlertConfig, ForecastConfig, forecast_mold_index, update_alerts
+from analytics.synthetic.scenario_generator import build_payload
+from cloud.ingest_api.app.pipeline import (
+    AlertConfig,
+    ForecastConfig,
+    forecast_mold_index,
+    run_pipeline,
+    run_pipeline_batch,
+    update_alerts,
+)
 from cloud.ingest_api.app.rolling import RollingWindow
-from cloud.ingest_api.app.state import NodeCache
+from cloud.ingest_api.app.state import GlobalState, NodeCache, get_lag_value
 
 
 def test_dew_point_basic():
@@ -23,6 +33,95 @@ def test_rolling_stats_slope():
     assert abs(window.slope_per_min() - 10.0) < 1e-6
 
 
+def test_rolling_stats_match_full_recompute():
+    rng = random.Random(7)
+    window = RollingWindow(window_s=300)
+    ts = 1.77e9
+    for _ in range(5000):
+        ts += rng.uniform(0.5, 3.0)
+        window.add(ts, 45.0 + rng.uniform(-2.0, 2.0))
+
+    times = window.timestamps()
+    vals = window.values()
+    mu = sum(vals) / len(vals)
+    std = (sum((v - mu) ** 2 for v in vals) / (len(vals) - 1)) ** 0.5
+    xs = [(t - times[0]) / 60.0 for t in times]
+    x_mean = sum(xs) / len(xs)
+    slope = sum((x - x_mean) * (v - mu) for x, v in zip(xs, vals)) / sum((x - x_mean) ** 2 for x in xs)
+
+    assert abs(window.mean() - mu) < 1e-9
+    assert abs(window.std() - std) < 1e-9
+    assert abs(window.slope_per_min() - slope) < 1e-9
+    assert window.last() == vals[-1]
+
+
+def test_threshold_counts_match_full_recount():
+    rng = random.Random(5)
+    ts = 1.77e9
+    for compact in (True, False):
+        node = NodeCache(compact=compact)
+        for _ in range(3000):
+            ts += rng.uniform(0.5, 3.0)
+            # Land exactly on the thresholds now and then
+            rh = rng.choice([70.0, 68.0 + rng.uniform(0.0, 4.0)])
+            margin = rng.choice([0.0, rng.uniform(-1.0, 1.0)])
+            node.air_window.add_row(ts, (rh, 22.0, 9.5, margin))
+
+            rh_vals = node.rh_window.values()
+            dew_vals = node.dew_margin_window.values()
+            assert node.rh_window.count_at_least(70.0) == sum(1 for v in rh_vals if v >= 70.0)
+            assert node.dew_margin_window.count_at_most(0.0) == sum(1 for v in dew_vals if v <= 0.0)
+
+
+def test_compact_node_cache_matches_deque_layout():
+    rng = random.Random(11)
+    compact, legacy = NodeCache(compact=True), NodeCache(compact=False)
+    ts = 1.77e9
+    for _ in range(1200):
+        ts += 1.0
+        row = (45.0 + rng.uniform(-2.0, 2.0), 22.0 + rng.uniform(-0.3, 0.3), 9.5, 1.2)
+        for node in (compact, legacy):
+            node.air_window.add_row(ts, row)
+            node.air_lags.append(ts, (row[0], row[1], row[3]))
+
+    assert len(compact.air_lags) == len(legacy.air_lags) == 800
+    assert compact.rh_window.values() == legacy.rh_window.values()
+    assert compact.temp_window.slope_per_min() == legacy.temp_window.slope_per_min()
+    assert get_lag_value(compact, "air_rh_pct", 5) == get_lag_value(legacy, "air_rh_pct", 5)
+
+
+def _baseline_lag(buf, lag_min):
+    # Reverse linear scan from the original get_lag_value
+    if not buf:
+        return None
+    target = buf[-1][0] - lag_min * 60.0
+    for ts_s, val in reversed(buf):
+        if ts_s <= target:
+            return val
+    return None
+
+
+def test_lag_lookup_matches_linear_scan():
+    rng = random.Random(3)
+    node = NodeCache()
+    reference = deque(maxlen=800)
+    ts = 1.77e9
+    for step in range(2000):
+        # Mostly monotonic with an occasional late sample (clock resync)
+        late = step % 500 == 0 and step > 0
+        sample_ts = ts - 90.0 if late else ts + rng.uniform(0.5, 4.0)
+        size = len(node.mold_lags)
+        node.mold_lags.append(sample_ts, (float(step),))
+        if late:
+            # Ignored for lag purposes: nothing newer is dropped
+            assert len(node.mold_lags) == size
+        else:
+            ts = sample_ts
+            reference.append((ts, float(step)))
+        for lag_min in (1, 5):
+            assert get_lag_value(node, "idx_mold_now", lag_min) == _baseline_lag(reference, lag_min)
+
+
 def test_forecast_trend_increases():
     node = NodeCache()
     # Seed a positive slope: 0.2 -> 0.4 over 2 minutes
@@ -51,3 +150,45 @@ def test_alert_persistence_open_and_resolve():
         event = update_alerts(node, 0.6, cfg, now, "ep-1", 30)
     assert node.alert_open is False
     assert event is not None and event["status"] == "RESOLVED"
+
+
+def test_batch_pipeline_orders_per_node_and_matches_sequential():
+    start = datetime(2026, 2, 27, 12, 0, tzinfo=timezone.utc)
+    payloads = [
+        build_payload(start + timedelta(minutes=step), "MOLD_EPISODE", step, 42, "ep-1", node, "W", "B", "S", "Z")
+        for step in range(40)
+        for node in ("AIR-1", "AIR-2")
+    ]
+    shuffled = payloads[::-1]
+
+    seq_state = GlobalState(compact=True)
+    expected = [run_pipeline(p, seq_state, ForecastConfig(), AlertConfig()) for p in payloads]
+    batch_state = GlobalState(compact=True)
+    results = run_pipeline_batch(shuffled, batch_state, ForecastConfig(), AlertConfig())
+
+    assert len(results) == len(shuffled)
+    for payload, result in zip(shuffled, results):
+        assert result["normalized"]["air_node_id"] == payload["air_node_id"]
+    by_key = {(r["normalized"]["air_node_id"], r["normalized"]["ts"]): r for r in results}
+    for r in expected:
+        got = by_key[(r["normalized"]["air_node_id"], r["normalized"]["ts"])]
+        assert got["features"]["rh_mean_w"] == r["features"]["rh_mean_w"]
+        assert got["prediction"]["yhat"] == r["prediction"]["yhat"]
+
+
+def test_multi_horizon_matches_single_horizon_runs():
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    payloads = [
+        build_payload(base + timedelta(seconds=10 * i), "MOLD_EPISODE", i, 3, "ep-1", "AIR-1", "W", "B", "S", "Z")
+        for i in range(120)
+    ]
+    multi_state = GlobalState()
+    single_states = {h: GlobalState() for h in (15, 30, 60)}
+    for payload in payloads:
+        multi = run_pipeline(dict(payload), multi_state, ForecastConfig(horizon_min=30, horizons=(15, 60)), AlertConfig())
+        by_h = {p["horizon_min"]: p["yhat"] for p in multi["prediction"]["horizons"]}
+        assert list(by_h) == [30, 15, 60]
+        assert multi["prediction"]["yhat"] == by_h[30]
+        for h, st in single_states.items():
+            single = run_pipeline(dict(payload), st, ForecastConfig(horizon_min=h), AlertConfig())
+            assert single["prediction"]["yhat"] == by_h[h]
@@ -0,0 +1,80 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+from analytics.synthetic.scenario_generator import build_payload
+from cloud.ingest_api.app.pipeline import AlertConfig, ForecastConfig, run_pipeline
+from cloud.ingest_api.app.sharding import ShardedPipeline, shard_for
+from cloud.ingest_api.app.state import GlobalState
+
+
+def _payloads(nodes, steps):
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        build_payload(base + timedelta(seconds=10 * i), "MOLD_EPISODE", i, 5, "ep-1", node, "W", "B", "S", "Z")
+        for i in range(steps)
+        for node in nodes
+    ]
+
+
+def test_shard_for_is_stable():
+    assert shard_for("AIR-1", 4) == shard_for("AIR-1", 4)
+    assert {shard_for(f"AIR-{i}", 4) for i in range(50)} == {0, 1, 2, 3}
+
+
+def test_sharded_pipeline_matches_in_process():
+    nodes = [f"AIR-{i}" for i in range(6)]
+    payloads = _payloads(nodes, 40)
+    forecast, alerts = ForecastConfig(horizons=(60,)), AlertConfig()
+
+    local = GlobalState()
+    expected = [run_pipeline(dict(p), local, forecast, alerts) for p in payloads]
+
+    sharded = ShardedPipeline(3, forecast, alerts).start()
+    try:
+        half = len(payloads) // 2
+        got = [sharded.run(dict(p)) for p in payloads[:half]]
+        got += sharded.run_batch([dict(p) for p in payloads[half:]])
+        latest = sharded.latest("AIR-4")
+        history = sharded.history("AIR-4", 60, "columnar", ["ts", "idx_mold_now"])
+        stats = sharded.stats()
+    finally:
+        sharded.stop()
+
+    for exp, res in zip(expected, got):
+        assert res["normalized"]["air_node_id"] == exp["normalized"]["air_node_id"]
+        assert res["features"] == exp["features"]
+        assert res["prediction"] == exp["prediction"]
+        assert res["alert_state"] == exp["alert_state"]
+    assert latest["prediction"] == local.get_latest_for_node("AIR-4")["prediction"]
+    assert history == local.history.columns_since("AIR-4", 60, ["ts", "idx_mold_now"])
+    assert stats == {"nodes_seen": len(nodes), "history_rows": len(payloads)}
+
+
+def test_dead_shard_fails_calls_while_other_shards_stay_busy():
+    sharded = ShardedPipeline(2, ForecastConfig(), AlertConfig()).start()
+    busy_node = next(f"AIR-{i}" for i in range(50) if shard_for(f"AIR-{i}", 2) == 0)
+    dead_node = next(f"AIR-{i}" for i in range(50) if shard_for(f"AIR-{i}", 2) == 1)
+    stop = threading.Event()
+
+    def traffic():
+        # Keeps replies flowing from shard 0 so the response queue never goes quiet
+        base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        i = 0
+        while not stop.is_set():
+            sharded.run(build_payload(base + timedelta(seconds=i), "NORMAL", i, 5, None, busy_node, "W", "B", "S", "Z"))
+            i += 1
+
+    thread = threading.Thread(target=traffic, daemon=True)
+    try:
+        sharded.run(_payloads([dead_node], 1)[0])
+        thread.start()
+        sharded._procs[1].terminate()
+        sharded._procs[1].join()
+        fut = sharded.submit(_payloads([dead_node], 2)[-1])
+        assert isinstance(fut.exception(timeout=5), RuntimeError)
+        assert isinstance(sharded.submit(_payloads([dead_node], 3)[-1]).exception(timeout=1), RuntimeError)
+        assert thread.is_alive()
+    finally:
+        stop.set()
+        thread.join(timeout=5)
+        sharded.stop()
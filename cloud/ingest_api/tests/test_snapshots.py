@@ -0,0 +1,76 @@
+import json
+import threading
+
+from cloud.ingest_api.app.background_io import BackgroundIO
+from cloud.ingest_api.app.jsonl_log import JsonlLog, tail_lines
+from cloud.ingest_api.app.snapshots import SnapshotWriter
+
+
+def test_snapshot_writer_coalesces_latest_wins(tmp_path):
+    writer = SnapshotWriter(flush_interval_s=60.0)
+    path = tmp_path / "nested" / "latest.json"
+    for i in range(100):
+        writer.submit(path, {"seq": i})
+    assert not path.exists()
+
+    writer.flush()
+    assert json.loads(path.read_text()) == {"seq": 99}
+    assert [p.name for p in path.parent.iterdir()] == ["latest.json"]
+    writer.stop()
+
+
+def test_snapshot_writer_sync_mode_writes_immediately(tmp_path):
+    writer = SnapshotWriter(flush_interval_s=0)
+    path = tmp_path / "latest.json"
+    writer.submit(path, {"ok": True}, indent=None)
+    assert path.read_text() == '{"ok": true}'
+
+
+def test_jsonl_log_appends_compacts_and_tails(tmp_path):
+    log = JsonlLog(tmp_path / "demo_history.jsonl", keep_last=10)
+    for i in range(25):
+        log.append({"seq": i})
+
+    lines = (tmp_path / "demo_history.jsonl").read_text().splitlines()
+    assert 10 <= len(lines) < 20
+    assert [r["seq"] for r in log.tail(3)] == [22, 23, 24]
+    assert [r["seq"] for r in log.tail()] == list(range(15, 25))
+    log.close()
+
+    # Reopening picks up the existing line count and keeps appending.
+    log = JsonlLog(tmp_path / "demo_history.jsonl", keep_last=10)
+    log.append({"seq": 25})
+    assert log.tail(1) == [{"seq": 25}]
+    log.close()
+
+
+def test_tail_lines_spans_blocks(tmp_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text("".join(f'{{"seq": {i}}}\n' for i in range(1000)))
+    assert tail_lines(path, 2, block_size=7) == [b'{"seq": 998}', b'{"seq": 999}']
+
+
+def test_background_io_runs_jobs_in_order_and_counts_drops(tmp_path):
+    io = BackgroundIO(maxsize=2)
+    path = tmp_path / "log.csv"
+    gate = threading.Event()
+    io.submit(gate.wait)  # hold the worker so the queue fills up
+    for i in range(5):
+        io.submit(lambda i=i: path.open("a").write(f"{i}\n"))
+    gate.set()
+    io.flush()
+    lines = path.read_text().splitlines()
+    assert lines == [str(i) for i in range(len(lines))]
+    assert io.dropped == 5 - len(lines) > 0
+
+    io.submit(lambda: 1 / 0)
+    io.flush()
+    assert io.failed == 1
+
+    # A bounded flush gives up on a backlog instead of waiting it out
+    gate.clear()
+    io.submit(gate.wait)
+    assert io.flush(timeout=0.05) is False
+    gate.set()
+    assert io.flush(timeout=5) is True
+    io.stop()
@@ -0,0 +1,177 @@
+import asyncio
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from analytics.synthetic.scenario_generator import build_payload
+from cloud.ingest_api.app.pipeline import AlertConfig, ForecastConfig, run_pipeline, run_pipeline_batch, try_run_pipeline
+from cloud.ingest_api.app.state import GlobalState
+
+BASE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def _frequent_thread_switches():
+    # Switch threads every few bytecodes so unsynchronized updates would interleave.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def _node_payloads(node, steps, scenario="MOLD_EPISODE"):
+    return [
+        build_payload(BASE + timedelta(seconds=10 * i), scenario, i, 9, "ep-1", node, "W", "B", "S", "Z")
+        for i in range(steps)
+    ]
+
+
+def _window_state(state, node_id):
+    node = state.nodes[node_id]
+    return (
+        node.rh_window.values(),
+        node.dew_margin_window.values(),
+        node.mold_idx_window.values(),
+        node.rh_window.mean(),
+        node.rh_window.slope_per_min(),
+        node.mold_idx_window.slope_per_min(),
+        len(node.air_lags),
+        node.last_pred,
+        node.pred_above_count,
+        node.alert_open,
+    )
+
+
+def test_concurrent_nodes_match_sequential_run():
+    nodes = [f"AIR-{i}" for i in range(16)]
+    sequences = {n: _node_payloads(n, 120) for n in nodes}
+    forecast, alerts = ForecastConfig(horizons=(60,)), AlertConfig()
+
+    expected = GlobalState()
+    for n in nodes:
+        for p in sequences[n]:
+            run_pipeline(dict(p), expected, forecast, alerts)
+
+    state = GlobalState()
+    stop = threading.Event()
+    errors = []
+
+    def feed(node_id):
+        # One caller per node keeps its samples ordered; different nodes overlap freely.
+        half = len(sequences[node_id]) // 2
+        for p in sequences[node_id][:half]:
+            run_pipeline(dict(p), state, forecast, alerts)
+        run_pipeline_batch([dict(p) for p in sequences[node_id][half:]], state, forecast, alerts)
+
+    def read():
+        while not stop.is_set():
+            try:
+                for n in nodes:
+                    cols = state.history.columns_since(n, 30, ["ts", "idx_mold_now", "pred_idx_mold_h"])
+                    assert len({len(v) for v in cols.values()}) == 1
+                    state.history.rows_since(n, 5)
+                len(state.history)
+                list(state.history)
+            except Exception as exc:  # pragma: no cover - reported below
+                errors.append(exc)
+                return
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for t in readers:
+        t.start()
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(feed, nodes))
+    stop.set()
+    for t in readers:
+        t.join()
+
+    assert not errors
+    assert len(state.history) == len(expected.history)
+    for n in nodes:
+        assert _window_state(state, n) == _window_state(expected, n)
+        assert state.history.columns_since(n, 60) == expected.history.columns_since(n, 60)
+
+
+def test_same_node_requests_are_serialized():
+    payloads = _node_payloads("AIR-X", 400, scenario="NORMAL")
+    by_ts = {BASE + timedelta(seconds=10 * i): p for i, p in enumerate(payloads)}
+    state = GlobalState()
+    forecast, alerts = ForecastConfig(), AlertConfig()
+    order = []
+    in_flight = [0]
+    overlap = []
+    guard = threading.Lock()
+    original = state.add_mold_rolling
+
+    def tracked(node, ts, idx):
+        with guard:
+            in_flight[0] += 1
+            overlap.append(in_flight[0] > 1)
+            order.append(ts)
+        try:
+            original(node, ts, idx)
+        finally:
+            with guard:
+                in_flight[0] -= 1
+
+    state.add_mold_rolling = tracked
+    # Arrival order across threads is arbitrary, but each sample must run alone.
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        list(pool.map(lambda p: run_pipeline(dict(p), state, forecast, alerts), payloads))
+
+    assert not any(overlap)
+    assert len(state.history) == len(payloads)
+    # Same end state as a sequential run in the order the samples were applied
+    replay = GlobalState()
+    for ts in order:
+        run_pipeline(dict(by_ts[ts]), replay, forecast, alerts)
+    assert _window_state(state, "AIR-X") == _window_state(replay, "AIR-X")
+
+
+def test_try_run_pipeline_skips_busy_node():
+    payload = _node_payloads("AIR-B", 1)[0]
+    state = GlobalState()
+    forecast, alerts = ForecastConfig(), AlertConfig()
+    with state.get_node("AIR-B").lock:
+        assert try_run_pipeline(dict(payload), state, forecast, alerts) is None
+    assert len(state.history) == 0
+    result = try_run_pipeline(dict(payload), state, forecast, alerts)
+    assert result["normalized"]["air_node_id"] == "AIR-B"
+    assert not state.get_node("AIR-B").lock.locked()
+
+
+def test_async_fallback_keeps_node_order(monkeypatch):
+    from cloud.ingest_api.app import routes
+
+    run_in_threadpool = routes.run_in_threadpool
+
+    async def busy_threadpool(*args):
+        await asyncio.sleep(0.1)  # every worker thread is taken for a while
+        return await run_in_threadpool(*args)
+
+    monkeypatch.setattr(routes, "run_in_threadpool", busy_threadpool)
+    payloads = _node_payloads("AIR-Q", 12)
+    state = GlobalState()
+    forecast, alerts = ForecastConfig(), AlertConfig()
+    lock = state.get_node("AIR-Q").lock
+
+    async def main():
+        lock.acquire()  # a batch request holds the node
+        first = asyncio.ensure_future(routes._run_async(dict(payloads[0]), state, forecast))
+        await asyncio.sleep(0)  # the first sample is queued for the threadpool
+        lock.release()
+        rest = [asyncio.ensure_future(routes._run_async(dict(p), state, forecast)) for p in payloads[1:]]
+        await asyncio.gather(first, *rest)
+
+    asyncio.run(main())
+    # Later samples must not run inline ahead of the queued one
+    reference = GlobalState()
+    for payload in payloads:
+        run_pipeline(dict(payload), reference, forecast, alerts)
+    assert _window_state(state, "AIR-Q") == _window_state(reference, "AIR-Q")
+    assert not routes._threadpool_tails
+    # lgbm waits on the micro-batcher, so it never runs on the event loop
+    assert not routes._inline_ok(ForecastConfig(model_mode="lgbm"))
@@ -0,0 +1,53 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from analytics.etl.build_mold_dataset import EpisodeConfig, _build_episode, _compute_idx
+from analytics.indices.mold_index import mold_risk_index
+from analytics.indices.physics import dew_point_c
+from analytics.indices.vectorized import dew_point_c_array, trailing_mean
+
+
+def _compute_idx_rowwise(df, window):
+    # Previous _compute_idx implementation
+    idx_vals = []
+    history = []
+    for _, row in df.iterrows():
+        history.append((row["air_temp_c"], row["air_rh_pct"]))
+        history = history[-window:]
+        idx_vals.append(mold_risk_index(row["air_temp_c"], row["air_rh_pct"], history))
+    return np.array(idx_vals)
+
+
+@pytest.mark.parametrize("scenario", ["NORMAL", "MOLD_EPISODE"])
+def test_vectorized_mold_features_match_scalar(scenario):
+    df = _build_episode(EpisodeConfig(scenario=scenario, hours=6, seed=7, episode_id=0))
+    expected_dp = np.array([dew_point_c(t, rh) for t, rh in zip(df["air_temp_c"], df["air_rh_pct"])])
+    np.testing.assert_array_equal(df["dew_point_c"].to_numpy(), expected_dp)
+
+    for window in (1, 15, 60):
+        np.testing.assert_array_equal(_compute_idx(df, window).to_numpy(), _compute_idx_rowwise(df, window))
+
+
+def test_vectorized_edge_values():
+    rng = np.random.default_rng(3)
+    temp = rng.uniform(-5.0, 40.0, 500)
+    rh = np.concatenate([[0.0, -3.0, 100.0, 120.0], rng.uniform(0.0, 100.0, 496)])
+    expected = np.array([dew_point_c(t, h) for t, h in zip(temp, rh)])
+    np.testing.assert_array_equal(dew_point_c_array(temp, rh), expected)
+
+    # Window longer than the series is an expanding mean throughout.
+    values = rng.uniform(40.0, 95.0, 50)
+    expected_mean = [sum(values[max(0, i - 79) : i + 1]) / len(values[max(0, i - 79) : i + 1]) for i in range(50)]
+    np.testing.assert_array_equal(trailing_mean(values, 80), expected_mean)
+
+
+def test_parallel_episodes_are_deterministic_and_ordered():
+    from analytics.etl.build_mold_dataset import _build_dataset
+
+    args = (["NORMAL", "MOLD_EPISODE"], 3, 30, 30, 5, 2, 0.05)
+    serial = _build_dataset(*args, workers=1)
+    parallel = _build_dataset(*args, workers=2)
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert list(serial["episode_id"].drop_duplicates()) == [0, 1, 2, 3]
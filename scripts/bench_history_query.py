@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+# Ensure repo root is on sys.path when running as a script
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from sqlalchemy import create_engine
+
+from cloud.ingest_api.app.db import init_db
+from cloud.ingest_api.app.queries import node_last_minutes, node_window_stmt
+
+
+def populate(db_path: str, rows: int, nodes: int, interval_s: float, chunk: int = 50000) -> None:
+    engine = create_engine(f"sqlite:///{db_path}")
+    init_db(engine)
+    engine.dispose()
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    rng = random.Random(0)
+    start = datetime(2026, 1, 1)
+    per_node = rows // nodes
+    t0 = time.perf_counter()
+    written = 0
+    # Interleave nodes in time order, the way live ingest arrives.
+    for base in range(0, per_node, max(1, chunk // nodes)):
+        raw, feat, pred = [], [], []
+        for step in range(base, min(per_node, base + max(1, chunk // nodes))):
+            ts = start + timedelta(seconds=step * interval_s)
+            ts_s = ts.strftime("%Y-%m-%d %H:%M:%S.%f")
+            target = (ts + timedelta(minutes=30)).strftime("%Y-%m-%d %H:%M:%S.%f")
+            for n in range(nodes):
+                sid = uuid.uuid4().hex
+                node = f"AIR-{n:03d}"
+                raw.append((sid, ts_s, "B", node, "W", 22.0, rng.uniform(40, 95), 20.0, 1.0, 0.5, "NORMAL", "EMULATED"))
+                feat.append((sid, ts_s, node, "W", "[]", 1.0, rng.random(), 0.0))
+                pred.append((sid, ts_s, target, node, 30, rng.random()))
+        conn.executemany(
+            "INSERT INTO raw_telemetry (sample_id, ts, building_id, air_node_id, water_node_id, air_temp_c, air_rh_pct,"
+            " water_temp_c, water_turbidity_ntu, water_free_chlorine_mgL, scenario, data_source)"
+            " VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+            raw,
+        )
+        conn.executemany(
+            "INSERT INTO features (sample_id, ts, air_node_id, water_node_id, qc_flags_json, sensor_health_score,"
+            " idx_mold_now, idx_water_event_now) VALUES (?,?,?,?,?,?,?,?)",
+            feat,
+        )
+        conn.executemany(
+            "INSERT INTO predictions (sample_id, ts, ts_target, air_node_id, horizon_min, pred_idx_mold_h)"
+            " VALUES (?,?,?,?,?,?)",
+            pred,
+        )
+        conn.commit()
+        written += len(raw)
+        print(f"\rpopulated {written:,}/{per_node * nodes:,} samples ({time.perf_counter() - t0:.0f}s)", end="")
+    print()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+def timed(fn, iters: int):
+    samples = []
+    for _ in range(iters):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1e3)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Last-N-minutes node query latency on a large raw_telemetry table")
+    parser.add_argument("--db", default="data/bench_history_query.db")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="raw_telemetry rows (features/predictions match)")
+    parser.add_argument("--nodes", type=int, default=100)
+    parser.add_argument("--interval-s", type=float, default=60.0)
+    parser.add_argument("--minutes", type=float, default=60.0)
+    parser.add_argument("--iters", type=int, default=200)
+    parser.add_argument("--reuse", action="store_true", help="Reuse an existing --db instead of rebuilding it")
+    args = parser.parse_args()
+
+    if not (args.reuse and os.path.exists(args.db)):
+        os.makedirs(os.path.dirname(os.path.abspath(args.db)), exist_ok=True)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+        populate(args.db, args.rows, args.nodes, args.interval_s)
+
+    engine = create_engine(f"sqlite:///{args.db}")
+    nodes = [f"AIR-{n:03d}" for n in range(args.nodes)]
+    rng = random.Random(1)
+    with engine.connect() as conn:
+        count = conn.exec_driver_sql("SELECT count(*) FROM raw_telemetry").scalar_one()
+        sample = node_last_minutes(conn, nodes[0], args.minutes)
+        print(f"rows={count:,} nodes={args.nodes} window={args.minutes:g} min -> {len(sample)} rows/query")
+        stmt = node_window_stmt(nodes[0], datetime(2026, 1, 1), datetime(2026, 1, 2))
+        sql = str(stmt.compile(engine, compile_kwargs={"literal_binds": True}))
+        for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").fetchall():
+            print(f"  plan: {row[-1]}")
+
+        p50, p99 = timed(lambda: node_last_minutes(conn, rng.choice(nodes), args.minutes), args.iters)
+        print(f"node_last_minutes: p50={p50:7.2f} ms  p99={p99:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Ensure repo root is on sys.path when running as a script
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from cloud.ingest_api.app.ml_model import MicroBatcher, build_feature_vector, load_model
+from cloud.ingest_api.app.tree_model import TreeEnsemble
+
+
+def make_samples(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(n):
+        rh = rng.uniform(35.0, 98.0)
+        normalized = {"air_temp_c": rng.uniform(18.0, 26.0), "air_rh_pct": rh, "air_surface_temp_c": 20.0}
+        features = {
+            "dew_point_c": rng.uniform(5.0, 20.0),
+            "dew_margin_c": rng.uniform(-2.0, 6.0),
+            "rh_mean_w": rh,
+            "rh_std_w": rng.random(),
+            "rh_slope_w": rng.uniform(-1.0, 1.0),
+            "temp_slope_w": rng.uniform(-0.2, 0.2),
+            "dew_point_slope_w": rng.uniform(-0.2, 0.2),
+            "dew_margin_slope_w": rng.uniform(-0.2, 0.2),
+            "rh_time_above_70_w": rng.random(),
+            "dew_margin_time_below_0_w": rng.random(),
+            "air_rh_pct_t_minus_1": rh,
+            "air_rh_pct_t_minus_5": rh,
+            "dew_margin_c_t_minus_5": rng.uniform(-2.0, 6.0),
+            "idx_mold_now_t_minus_5": rng.random(),
+        }
+        samples.append((normalized, features, rng.random()))
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mold model: single-row vs micro-batched predict, LightGBM or native engine")
+    parser.add_argument("--model", default=os.path.join(REPO_ROOT, "models", "mold_lgbm.txt"))
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=40, help="concurrent callers (FastAPI threadpool size)")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--wait-ms", type=float, default=0.0)
+    parser.add_argument("--engine", default="lightgbm", choices=["lightgbm", "native"])
+    args = parser.parse_args()
+
+    model = load_model(args.model, engine=args.engine)
+    samples = make_samples(args.requests)
+
+    def single(s):
+        vec = build_feature_vector(model, *s)
+        if isinstance(model, TreeEnsemble):
+            return model.predict_row(vec)
+        return float(model.predict([vec])[0])
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(single, samples))
+    dt = time.perf_counter() - t0
+    print(f"{'single-row':>12}: {args.requests / dt:9.0f} preds/s")
+
+    batcher = MicroBatcher(max_batch=args.max_batch, max_wait_s=args.wait_ms / 1000.0)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(lambda s: batcher.predict(model, *s), samples))
+    dt = time.perf_counter() - t0
+    print(
+        f"{'batched':>12}: {args.requests / dt:9.0f} preds/s "
+        f"({batcher.batches} predict calls, mean batch {batcher.rows / max(1, batcher.batches):.1f})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+# Ensure repo root is on sys.path when running as a script
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from analytics.synthetic.http_client import AsyncConnection
+from analytics.synthetic.scenario_generator import build_payload
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(server_root: str, port: int, data_dir: str, extra_env: dict) -> subprocess.Popen:
+    # Keep the benchmark's snapshots, logs and database out of data/.
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{data_dir}/bench.db",
+        "LATEST_LIVE_PATH": f"{data_dir}/latest_merged.json",
+        "LATEST_JSON_PATH": f"{data_dir}/latest_telemetry.json",
+        "LIVE_NODES_JSON_PATH": f"{data_dir}/latest_live_nodes.json",
+        "WATER_LOG_PATH": f"{data_dir}/live_water_log.csv",
+        "DEMO_LATEST_JSON_PATH": f"{data_dir}/demo_latest.json",
+        "DEMO_HISTORY_LOG_PATH": f"{data_dir}/demo_history.jsonl",
+        **extra_env,
+    }
+    cmd = [
+        sys.executable, "-m", "uvicorn", "cloud.ingest_api.app.main:app",
+        "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", "--no-access-log",
+    ]
+    return subprocess.Popen(cmd, cwd=server_root, env=env)
+
+
+async def wait_ready(url: str, timeout_s: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        conn = AsyncConnection(url)
+        try:
+            if await conn.request("GET", "/health") == 200:
+                return
+        except OSError:
+            pass
+        finally:
+            conn.close()
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not come up")
+
+
+def _payload(endpoint: str, node: int, step: int) -> dict:
+    ts = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=5 * step)
+    if endpoint == "/telemetry/water":
+        return {"ts": ts.isoformat(), "surface_temp_c": 18.0, "turbidity_raw": 1.2, "tds_raw": 310, "seq": step}
+    payload = build_payload(ts, "MOLD_EPISODE", step, 1, "bench", f"AIR-{node:04d}", "W", "B", "S", "Z")
+    payload["ts"] = ts.isoformat().replace("+00:00", "Z")
+    return payload
+
+
+async def run_load(url: str, endpoint: str, nodes: int, requests: int, concurrency: int, start_step: int = 0) -> dict:
+    # Requests go round-robin over nodes, so each node's samples arrive in time order.
+    bodies = [json.dumps(_payload(endpoint, i % nodes, start_step + i // nodes)).encode() for i in range(requests)]
+    counter = itertools.count()
+    latencies = []
+    errors = 0
+
+    async def worker() -> None:
+        nonlocal errors
+        conn = AsyncConnection(url)
+        try:
+            while True:
+                i = next(counter)
+                if i >= requests:
+                    return
+                t0 = time.perf_counter()
+                try:
+                    ok = await conn.request("POST", endpoint, bodies[i]) == 200
+                except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+                    conn.close()
+                    ok = False
+                latencies.append(time.perf_counter() - t0)
+                errors += not ok
+        finally:
+            conn.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+
+    def pct(q: float) -> float:
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+
+    return {
+        "req_s": requests / elapsed,
+        "p50_ms": pct(0.50),
+        "p99_ms": pct(0.99),
+        "max_ms": latencies[-1] * 1000,
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HTTP load generator for the ingest API: requests/s and latency percentiles")
+    parser.add_argument("--url", default="", help="benchmark a running server instead of starting one")
+    parser.add_argument("--server-root", default=REPO_ROOT, help="checkout to start the server from (compare branches)")
+    parser.add_argument("--endpoint", default="/telemetry", choices=["/telemetry", "/telemetry/water", "/demo/telemetry"])
+    parser.add_argument("--nodes", type=int, default=300)
+    parser.add_argument("--requests", type=int, default=6000)
+    parser.add_argument("--concurrency", default="16,64,256", help="comma-separated client concurrency levels")
+    parser.add_argument("--warmup", type=int, default=500)
+    parser.add_argument("--env", action="append", default=[], help="extra server env, e.g. --env INGEST_SHARDS=2")
+    args = parser.parse_args()
+
+    proc = None
+    url = args.url
+    with tempfile.TemporaryDirectory() as data_dir:
+        if not url:
+            port = _free_port()
+            url = f"http://127.0.0.1:{port}"
+            extra_env = dict(item.split("=", 1) for item in args.env)
+            proc = start_server(args.server_root, port, data_dir, extra_env)
+        try:
+            asyncio.run(wait_ready(url))
+            print(f"{url}{args.endpoint}: {args.nodes} nodes, {args.requests} requests, {os.cpu_count()} CPUs")
+            asyncio.run(run_load(url, args.endpoint, args.nodes, args.warmup, 16))
+            step = args.warmup // args.nodes + 1
+            for c in [int(c) for c in args.concurrency.split(",") if c.strip()]:
+                r = asyncio.run(run_load(url, args.endpoint, args.nodes, args.requests, c, step))
+                step += args.requests // args.nodes + 1
+                print(
+                    f"concurrency {c:4d}: {r['req_s']:7.0f} req/s  p50 {r['p50_ms']:7.1f} ms  "
+                    f"p99 {r['p99_ms']:7.1f} ms  max {r['max_ms']:7.1f} ms  errors {r['errors']}"
+                )
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
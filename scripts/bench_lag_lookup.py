@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+# Ensure repo root is on sys.path when running as a script
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from cloud.ingest_api.app.state import LAG_MAXLEN, LagBuffer
+
+
+def linear_lag_value(buf: Deque[Tuple[float, float]], lag_min: int) -> Optional[float]:
+    # Previous implementation: walk the deque backwards from the newest sample.
+    target = buf[-1][0] - lag_min * 60.0
+    for ts_s, val in reversed(buf):
+        if ts_s <= target:
+            return val
+    return None
+
+
+def bench(label: str, fn, iters: int) -> None:
+    t0 = time.perf_counter()
+    for i in range(iters):
+        fn(i)
+    dt = time.perf_counter() - t0
+    print(f"{label:>18}: {dt / iters * 1e6:8.2f} us/payload")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lag lookup micro-benchmark at full buffer occupancy")
+    parser.add_argument("--interval-s", type=float, default=1.0)
+    parser.add_argument("--iters", type=int, default=20000)
+    args = parser.parse_args()
+
+    lags = (1, 5, 5, 5)  # the four lookups compute_features does per payload
+    legacy: Deque[Tuple[float, float]] = deque(maxlen=LAG_MAXLEN)
+    indexed = LagBuffer(("v",))
+    uncached = LagBuffer(("v",))
+    ts = 0.0
+    for i in range(LAG_MAXLEN):
+        ts = i * args.interval_s
+        legacy.append((ts, float(i)))
+        indexed.append(ts, (float(i),))
+        uncached.append(ts, (float(i),))
+
+    def step(i: int) -> float:
+        return ts + (i + 1) * args.interval_s
+
+    def run_linear(i: int) -> None:
+        t = step(i)
+        legacy.append((t, float(i)))
+        for lag in lags:
+            linear_lag_value(legacy, lag)
+
+    def run_bisect(i: int) -> None:
+        t = step(i)
+        uncached.append(t, (float(i),))
+        target_base = t
+        for lag in lags:
+            uncached.index_at_or_before(target_base - lag * 60.0)
+
+    def run_cursor(i: int) -> None:
+        indexed.append(step(i), (float(i),))
+        for lag in lags:
+            indexed.lookup("v", lag)
+
+    print(f"buffer={LAG_MAXLEN} rows, interval={args.interval_s}s, lookups/payload={len(lags)}")
+    bench("linear scan", run_linear, args.iters)
+    bench("bisect", run_bisect, args.iters)
+    bench("bisect + cursor", run_cursor, args.iters)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Ensure repo root is on sys.path when running as a script
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from analytics.etl.build_mold_dataset import EpisodeConfig, _build_episode, _compute_idx
+from analytics.indices.mold_index import mold_risk_index
+from analytics.indices.physics import dew_point_c
+from analytics.indices.vectorized import dew_point_c_array
+
+
+def rowwise(df, window: int):
+    # Previous implementation: df.apply for dew point, iterrows + list slicing for the index
+    dp = df.apply(lambda r: dew_point_c(r["air_temp_c"], r["air_rh_pct"]), axis=1)
+    idx_vals = []
+    history = []
+    for _, row in df.iterrows():
+        history.append((row["air_temp_c"], row["air_rh_pct"]))
+        history = history[-window:]
+        idx_vals.append(mold_risk_index(row["air_temp_c"], row["air_rh_pct"], history))
+    return dp.to_numpy(), np.array(idx_vals)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Dew point + mold index computation: row-wise vs vectorized")
+    parser.add_argument("--hours", type=int, default=24 * 30, help="episode length (default: one month)")
+    parser.add_argument("--window-min", type=int, default=60)
+    parser.add_argument("--skip-rowwise", action="store_true", help="only time the vectorized path")
+    args = parser.parse_args()
+
+    df = _build_episode(EpisodeConfig(scenario="MOLD_EPISODE", hours=args.hours, seed=42, episode_id=0))
+    print(f"rows={len(df):,} window={args.window_min}")
+
+    t0 = time.perf_counter()
+    idx = _compute_idx(df, args.window_min).to_numpy()
+    t_vec = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    dp = dew_point_c_array(df["air_temp_c"].to_numpy(), df["air_rh_pct"].to_numpy())
+    t_vec += time.perf_counter() - t0
+    print(f"{'vectorized':>10}: {t_vec:8.3f} s")
+
+    if args.skip_rowwise:
+        return
+    t0 = time.perf_counter()
+    dp_ref, idx_ref = rowwise(df, args.window_min)
+    t_row = time.perf_counter() - t0
+    print(f"{'row-wise':>10}: {t_row:8.3f} s  ({t_row / t_vec:.0f}x)")
+    print(f"identical: dew_point={np.array_equal(dp, dp_ref)} idx_mold_now={np.array_equal(idx, idx_ref)}")
+
+
+if __name__ == "__main__":
+    main()
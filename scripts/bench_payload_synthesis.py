@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+# Ensure repo root is on sys.path when running as a script
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from analytics.synthetic.fleet import DEFAULT_MIX, build_fleet
+from analytics.synthetic.payload_blocks import iter_blocks, iter_payloads
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fleet payload synthesis: scalar build_payload vs vectorized blocks")
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--steps", type=int, default=250, help="samples per node")
+    parser.add_argument("--block-steps", type=int, default=256)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    args = parser.parse_args()
+
+    fleet = build_fleet(args.nodes, mix=args.mix)
+    start_ts = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    period_s = 60.0
+    total = args.nodes * args.steps
+    print(f"nodes={args.nodes} steps={args.steps} samples={total:,}")
+
+    def report(label: str, elapsed: float, base: float) -> None:
+        print(f"{label:>22}: {elapsed:8.3f} s  {total / elapsed:>12,.0f} samples/s  ({base / elapsed:.1f}x)")
+
+    t0 = time.perf_counter()
+    for step in range(args.steps):
+        ts = start_ts + timedelta(seconds=step * period_s)
+        for node in fleet:
+            node.payload(step, ts)
+    t_scalar = time.perf_counter() - t0
+    report("scalar dicts", t_scalar, t_scalar)
+
+    t0 = time.perf_counter()
+    for _ in iter_blocks(fleet, args.steps, args.block_steps, start_ts, period_s):
+        pass
+    report("vectorized columns", time.perf_counter() - t0, t_scalar)
+
+    t0 = time.perf_counter()
+    for _ in iter_payloads(iter_blocks(fleet, args.steps, args.block_steps, start_ts, period_s)):
+        pass
+    report("vectorized dicts", time.perf_counter() - t0, t_scalar)
+
+    # Replay files are NDJSON: serialization cost is the same for both paths
+    blocks = iter_blocks(fleet, min(args.steps, 25), args.block_steps, start_ts, period_s)
+    payloads = list(iter_payloads(blocks))
+    t0 = time.perf_counter()
+    for payload in payloads:
+        json.dumps(payload)
+    per_sample = (time.perf_counter() - t0) / len(payloads)
+    print(f"{'json.dumps per sample':>22}: {per_sample * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+# Ensure repo root is on sys.path when running as a script
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from analytics.synthetic.scenario_generator import build_payload
+from cloud.ingest_api.app.pipeline import AlertConfig, ForecastConfig, run_pipeline_batch
+from cloud.ingest_api.app.sharding import ShardedPipeline
+from cloud.ingest_api.app.state import GlobalState
+
+
+def make_batches(nodes: int, steps: int, batch: int):
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    payloads = [
+        build_payload(base + timedelta(seconds=10 * i), "MOLD_EPISODE", i, 1, "ep-1", f"AIR-{n:04d}", "W", "B", "S", "Z")
+        for i in range(steps)
+        for n in range(nodes)
+    ]
+    return [payloads[i : i + batch] for i in range(0, len(payloads), batch)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest throughput: in-process pipeline vs sharded worker processes")
+    parser.add_argument("--nodes", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=500, help="samples per /telemetry/batch call")
+    parser.add_argument("--shards", default="2,4", help="comma-separated shard counts to compare")
+    args = parser.parse_args()
+
+    batches = make_batches(args.nodes, args.steps, args.batch)
+    total = sum(len(b) for b in batches)
+    forecast, alerts = ForecastConfig(), AlertConfig()
+    print(f"{total} samples, {args.nodes} nodes, {os.cpu_count()} CPUs")
+
+    state = GlobalState()
+    t0 = time.perf_counter()
+    for b in batches:
+        run_pipeline_batch(b, state, forecast, alerts)
+    dt = time.perf_counter() - t0
+    print(f"{'in-process':>12}: {total / dt:9.0f} samples/s")
+
+    for shards in [int(s) for s in args.shards.split(",") if s.strip()]:
+        sharded = ShardedPipeline(shards, forecast, alerts).start()
+        try:
+            sharded.stats()  # wait for workers to come up
+            t0 = time.perf_counter()
+            for b in batches:
+                sharded.run_batch(b)
+            dt = time.perf_counter() - t0
+        finally:
+            sharded.stop()
+        print(f"{f'{shards} shards':>12}: {total / dt:9.0f} samples/s")
+
+
+if __name__ == "__main__":
+    main()
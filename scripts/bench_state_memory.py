@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+# Ensure repo root is on sys.path when running as a script
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from cloud.ingest_api.app.state import GlobalState
+
+
+def fill_state(compact: bool, nodes: int, samples: int, interval_s: float) -> GlobalState:
+    state = GlobalState(compact=compact)
+    rng = random.Random(42)
+    start = datetime(2026, 2, 27, 12, 0, tzinfo=timezone.utc)
+    for n in range(nodes):
+        node = state.get_node(f"AIR-{n:05d}")
+        for i in range(samples):
+            ts = start + timedelta(seconds=i * interval_s)
+            rh = 45.0 + rng.uniform(-2.0, 2.0)
+            temp = 22.0 + rng.uniform(-0.3, 0.3)
+            state.add_air_rolling(node, ts, rh, temp, 9.5, 1.2)
+            state.add_mold_rolling(node, ts, 0.2)
+    return state
+
+
+def measure(compact: bool, nodes: int, samples: int, interval_s: float) -> None:
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    state = fill_state(compact, nodes, samples, interval_s)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    gc.collect()
+    gc_ms = (time.perf_counter() - t0) * 1000.0
+
+    label = "compact" if compact else "deque"
+    per_node = (current - base) / nodes
+    print(
+        f"{label:>8}: total={(current - base) / 1e6:8.2f} MB  per_node={per_node / 1024:8.1f} KiB  "
+        f"gc.collect={gc_ms:7.1f} ms"
+    )
+    del state
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-node memory footprint of ingest rolling state")
+    parser.add_argument("--nodes", type=int, default=1000)
+    parser.add_argument("--samples", type=int, default=900, help="Samples per node (fills lag buffers at >=800)")
+    parser.add_argument("--interval-s", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"nodes={args.nodes} samples/node={args.samples} interval={args.interval_s}s")
+    measure(False, args.nodes, args.samples, args.interval_s)
+    measure(True, args.nodes, args.samples, args.interval_s)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 import argparse
+import os
 import sqlite3
 import time
 from datetime import datetime
 
+# The ingest pipeline's primary forecast horizon
+PRIMARY_HORIZON_MIN = int(os.getenv("FORECAST_HORIZON_MIN", "30"))
+
 
 def fetch_latest(db_path: str):
     conn = sqlite3.connect(db_path)
@@ -25,21 +29,47 @@ def fetch_latest(db_path: str):
     return raw, feat, pred, alert
 
 
-def fetch_series(db_path: str, limit: int = 300):
+def fetch_series(
+    db_path: str, limit: int = 300, air_node_id: str = "", minutes: float = 0.0, horizon_min: int = PRIMARY_HORIZON_MIN
+):
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     cur = conn.cursor()
-    cur.execute(
-        """
-        SELECT r.ts, r.air_rh_pct, f.idx_mold_now, p.pred_idx_mold_h
-        FROM raw_telemetry r
-        LEFT JOIN features f ON r.ts = f.ts
-        LEFT JOIN predictions p ON r.ts = p.ts
-        ORDER BY r.ts DESC
-        LIMIT ?
-        """,
-        (limit,),
-    )
+    if not air_node_id:
+        cur.execute("SELECT air_node_id FROM raw_telemetry ORDER BY ts DESC LIMIT 1")
+        row = cur.fetchone()
+        air_node_id = row["air_node_id"] if row else ""
+    # (air_node_id, ts) index range scan; features/predictions joined on sample_id.
+    # One prediction per sample: the requested horizon (0 = one row per stored horizon).
+    pred_join = "p.sample_id = r.sample_id" + (" AND p.horizon_min = ?" if horizon_min > 0 else "")
+    pred_args = (horizon_min,) if horizon_min > 0 else ()
+    if minutes > 0:
+        cur.execute(
+            """
+            SELECT r.ts, r.air_rh_pct, f.idx_mold_now, p.pred_idx_mold_h
+            FROM raw_telemetry r
+            LEFT JOIN features f ON f.sample_id = r.sample_id
+            LEFT JOIN predictions p ON {pred_join}
+            WHERE r.air_node_id = ?
+              AND r.ts >= datetime((SELECT max(ts) FROM raw_telemetry WHERE air_node_id = ?), ?)
+            ORDER BY r.ts DESC
+            LIMIT ?
+            """.format(pred_join=pred_join),
+            (*pred_args, air_node_id, air_node_id, f"-{minutes} minutes", limit),
+        )
+    else:
+        cur.execute(
+            """
+            SELECT r.ts, r.air_rh_pct, f.idx_mold_now, p.pred_idx_mold_h
+            FROM raw_telemetry r
+            LEFT JOIN features f ON f.sample_id = r.sample_id
+            LEFT JOIN predictions p ON {pred_join}
+            WHERE r.air_node_id = ?
+            ORDER BY r.ts DESC
+            LIMIT ?
+            """.format(pred_join=pred_join),
+            (*pred_args, air_node_id, limit),
+        )
     rows = cur.fetchall()
     conn.close()
     return list(reversed(rows))
@@ -64,7 +94,14 @@ def run_console(db_path: str, interval: float):
         time.sleep(interval)
 
 
-def run_plot(db_path: str, interval: float, limit: int):
+def run_plot(
+    db_path: str,
+    interval: float,
+    limit: int,
+    air_node_id: str = "",
+    minutes: float = 0.0,
+    horizon_min: int = PRIMARY_HORIZON_MIN,
+):
     try:
         import plotext as plt
     except ImportError as exc:  # pragma: no cover
@@ -78,7 +115,7 @@ def run_plot(db_path: str, interval: float, limit: int):
 
     last_ts = None
     while True:
-        rows = fetch_series(db_path, limit=limit)
+        rows = fetch_series(db_path, limit=limit, air_node_id=air_node_id, minutes=minutes, horizon_min=horizon_min)
         if rows:
             rh = [r["air_rh_pct"] or 0.0 for r in rows]
             mold = [r["idx_mold_now"] or 0.0 for r in rows]
@@ -106,10 +143,18 @@ def main() -> None:
     parser.add_argument("--interval", type=float, default=2.0)
     parser.add_argument("--mode", choices=["console", "plot"], default="console")
     parser.add_argument("--limit", type=int, default=300)
+    parser.add_argument("--air-node-id", default="", help="Node to plot (default: node of the newest row)")
+    parser.add_argument("--minutes", type=float, default=0.0, help="Plot the node's last N minutes (0 = last --limit rows)")
+    parser.add_argument(
+        "--horizon-min",
+        type=int,
+        default=PRIMARY_HORIZON_MIN,
+        help="Forecast horizon to plot (default: FORECAST_HORIZON_MIN; 0 = every stored horizon)",
+    )
     args = parser.parse_args()
 
     if args.mode == "plot":
-        run_plot(args.db, args.interval, args.limit)
+        run_plot(args.db, args.interval, args.limit, args.air_node_id, args.minutes, args.horizon_min)
     else:
         run_console(args.db, args.interval)
 
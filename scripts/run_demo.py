@@ -57,6 +57,13 @@ def _wait_for_api(api_url: str, timeout_s: float = 15.0) -> None:
     raise RuntimeError("API did not become ready in time")
 
 
+def _preroll_demo(api_url: str, sequence: str) -> None:
+    # Replays the sequence in-process with no pacing, ending at the current time.
+    requests.post(f"{api_url}/demo/start", params={"sequence": sequence, "fast": True}, timeout=5)
+    while requests.get(f"{api_url}/demo/status", timeout=5).json().get("running"):
+        time.sleep(0.2)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run full Smart Campus demo (API + Streamlit + generator)")
     parser.add_argument("--api-host", default="0.0.0.0")
@@ -72,6 +79,12 @@ def main() -> None:
     parser.add_argument("--model", default="baseline", choices=["baseline", "lgbm"])
     parser.add_argument("--model-path", default="models/mold_lgbm.txt")
     parser.add_argument("--keep-alive", action="store_true")
+    parser.add_argument("--horizons", default="", help="Extra forecast horizons in minutes, e.g. 15,60 (one pass)")
+    parser.add_argument(
+        "--preroll",
+        default="",
+        help="Fill the demo stream (SIM-001) with this sequence before starting, e.g. NORMAL:120,MOLD_EPISODE:60",
+    )
     args = parser.parse_args()
 
     if args.api_url:
@@ -87,6 +100,9 @@ def main() -> None:
         os.environ["DEMO_FORECAST_HORIZON_MIN"] = "30"
     if args.model == "lgbm" and "FORECAST_HORIZON_MIN" not in os.environ:
         os.environ["FORECAST_HORIZON_MIN"] = "60"
+    if args.horizons:
+        os.environ.setdefault("FORECAST_HORIZONS", args.horizons)
+        os.environ.setdefault("DEMO_FORECAST_HORIZONS", args.horizons)
 
     api_thread = _start_api(args.api_host, args.api_port)
     streamlit_proc = None
@@ -94,6 +110,8 @@ def main() -> None:
         streamlit_proc = _start_streamlit(api_url, args.streamlit_port)
 
     _wait_for_api(api_url, timeout_s=15.0)
+    if args.preroll:
+        _preroll_demo(api_url, args.preroll)
 
     try:
         if not args.no_demo:
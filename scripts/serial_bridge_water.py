@@ -1,11 +1,19 @@
 import argparse
+import os
 import re
+import sys
 import time
 from datetime import datetime, timezone
 
-import requests
 import serial
 
+# Ensure repo root is on sys.path when running as a script
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from analytics.synthetic.http_client import TelemetryClient
+
 
 LINE_RE = re.compile(
     r"Surface Temp:\s*(?P<temp>[-0-9.]+)\s*C\s*\|\s*"
@@ -27,31 +35,8 @@ def parse_line(line: str) -> dict | None:
     }
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Serial bridge for water node -> ingest API")
-    parser.add_argument("--port", required=True, help="Serial port (e.g., COM10)")
-    parser.add_argument("--baud", type=int, default=9600)
-    parser.add_argument("--api-url", default="http://localhost:8000")
-    parser.add_argument("--building-id", default="RUTGERS-ENG-1")
-    parser.add_argument("--site-id", default="RUTGERS")
-    parser.add_argument("--building-zone", default="ENG-1-BASEMENT")
-    parser.add_argument("--air-node-id", default="LIVE-001")
-    parser.add_argument("--water-node-id", default="WATER-LIVE-001")
-    parser.add_argument("--scenario", default="NORMAL")
-    parser.add_argument("--data-source", default="LIVE")
-    parser.add_argument("--air-temp-c", type=float, default=22.0)
-    parser.add_argument("--air-rh-pct", type=float, default=45.0)
-    parser.add_argument("--air-surface-temp-c", type=float, default=21.5)
-    parser.add_argument("--air-co2-ppm", type=float, default=600.0)
-    parser.add_argument("--air-voc-index", type=float, default=120.0)
-    parser.add_argument("--turbidity-scale", type=float, default=1.0)
-    parser.add_argument("--tds-scale", type=float, default=1.0)
-    args = parser.parse_args()
-
-    ser = serial.Serial(args.port, args.baud, timeout=1)
+def _bridge(ser: "serial.Serial", client: TelemetryClient, args: argparse.Namespace) -> None:
     seq = 0
-    print(f"Listening on {args.port} @ {args.baud}...")
-
     while True:
         line = ser.readline().decode(errors="ignore").strip()
         if not line:
@@ -85,14 +70,48 @@ def main() -> None:
             "seq_water": seq,
         }
 
-        try:
-            requests.post(f"{args.api_url}/telemetry", json=payload, timeout=3)
-        except Exception:
-            pass
+        client.send(payload)
 
         seq += 1
         time.sleep(0.05)
 
 
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serial bridge for water node -> ingest API")
+    parser.add_argument("--port", required=True, help="Serial port (e.g., COM10)")
+    parser.add_argument("--baud", type=int, default=9600)
+    parser.add_argument("--api-url", default="http://localhost:8000")
+    parser.add_argument("--building-id", default="RUTGERS-ENG-1")
+    parser.add_argument("--site-id", default="RUTGERS")
+    parser.add_argument("--building-zone", default="ENG-1-BASEMENT")
+    parser.add_argument("--air-node-id", default="LIVE-001")
+    parser.add_argument("--water-node-id", default="WATER-LIVE-001")
+    parser.add_argument("--scenario", default="NORMAL")
+    parser.add_argument("--data-source", default="LIVE")
+    parser.add_argument("--air-temp-c", type=float, default=22.0)
+    parser.add_argument("--air-rh-pct", type=float, default=45.0)
+    parser.add_argument("--air-surface-temp-c", type=float, default=21.5)
+    parser.add_argument("--air-co2-ppm", type=float, default=600.0)
+    parser.add_argument("--air-voc-index", type=float, default=120.0)
+    parser.add_argument("--turbidity-scale", type=float, default=1.0)
+    parser.add_argument("--tds-scale", type=float, default=1.0)
+    parser.add_argument("--retries", type=int, default=3)
+    args = parser.parse_args()
+
+    ser = serial.Serial(args.port, args.baud, timeout=1)
+    # Posts from a background lane over one keep-alive connection, so a slow
+    # API does not stall reading the serial port.
+    client = TelemetryClient(args.api_url, lanes=1, retries=args.retries, timeout_s=3.0)
+    print(f"Listening on {args.port} @ {args.baud}...")
+
+    try:
+        _bridge(ser, client, args)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.close()
+        print(client.stats())
+
+
 if __name__ == "__main__":
     main()
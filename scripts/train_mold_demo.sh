@@ -3,7 +3,7 @@ set -euo pipefail
 
 # Build synthetic dataset
 python -m analytics.etl.build_mold_dataset \
-  --out /home/amrik/code/smart-campus/data/mold_dataset.csv \
+  --out /home/amrik/code/smart-campus/data/mold_dataset.parquet \
   --hours 12 \
   --horizon-min 60 \
   --window-min 60 \
@@ -12,12 +12,12 @@ python -m analytics.etl.build_mold_dataset \
 
 # Train model
 python -m analytics.forecasting.train_mold_lgbm \
-  --data /home/amrik/code/smart-campus/data/mold_dataset.csv \
+  --data /home/amrik/code/smart-campus/data/mold_dataset.parquet \
   --out-model /home/amrik/code/smart-campus/models/mold_lgbm.txt
 
 # Evaluate model
 python -m analytics.forecasting.eval_mold_demo \
-  --data /home/amrik/code/smart-campus/data/mold_dataset.csv \
+  --data /home/amrik/code/smart-campus/data/mold_dataset.parquet \
   --model /home/amrik/code/smart-campus/models/mold_lgbm.txt \
   --out /home/amrik/code/smart-campus/data/mold_eval.csv \
   --threshold 0.6 \